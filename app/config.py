@@ -1,6 +1,8 @@
 ﻿"""
 Configuration, constants, and category-specific rules
 """
+import os
+import tempfile
 
 # OpenAI Configuration
 OPENAI_MODEL = "gpt-4o-mini"
@@ -96,3 +98,225 @@ URL_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 # Text Processing
 TEXT_MIN_LENGTH = 10
 TEXT_MAX_LENGTH = 10000
+
+# PDF Text Layer Detection
+# Pages below these thresholds are treated as scanned and sent through OCR
+TEXT_LAYER_MIN_CHARS = 50
+TEXT_LAYER_MIN_COVERAGE = 0.01
+TEXT_LAYER_MAX_GARBAGE_RATIO = 0.1
+
+# Docling Pipeline Profiles
+# Each profile keeps its own warm converter; pages with a usable text layer
+# run the same profile with OCR switched off
+PDF_PIPELINE_PROFILES = {
+    "fast": {
+        "do_ocr": False,
+        "do_table_structure": False,
+        "table_mode": "fast",
+        "do_cell_matching": False,
+        "generate_images": False
+    },
+    "balanced": {
+        "do_ocr": True,
+        "do_table_structure": True,
+        "table_mode": "fast",
+        "do_cell_matching": True,
+        "generate_images": False
+    },
+    "accurate": {
+        "do_ocr": True,
+        "do_table_structure": True,
+        "table_mode": "accurate",
+        "do_cell_matching": True,
+        "generate_images": True
+    }
+}
+DEFAULT_PDF_PROFILE = "balanced"
+
+# PDF Staging
+# With in-process conversion (PDF_WORKER_PROCESSES=0), PDFs up to this size
+# are handed to Docling as in-memory streams. Larger ones, and every PDF
+# converted on the worker pool (the default), are spooled to a tmpfs-backed
+# directory instead of the container disk: pool workers read the file
+# rather than receive a copy of it for each page run
+PDF_STREAM_MAX_BYTES = int(os.getenv("PDF_STREAM_MAX_MB", "50")) * 1024 * 1024
+PDF_SPOOL_DIR = os.getenv("PDF_SPOOL_DIR") or (
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+
+# PDF Export Limits
+# Docling converts at most PDF_MAX_PAGES_PER_RUN pages at a time and each
+# document is released once its exports are taken; async job exports
+# (markdown, document JSON) are written to JOB_OUTPUT_DIR, not kept in memory
+PDF_MAX_PAGES_PER_RUN = int(os.getenv("PDF_MAX_PAGES_PER_RUN", "20"))
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR") or os.path.join(tempfile.gettempdir(), "pdf-jobs")
+
+# Remote Downloads
+# file_url downloads share one pooled HTTP client. Each must connect within
+# DOWNLOAD_CONNECT_TIMEOUT_SEC, never stall longer than DOWNLOAD_READ_TIMEOUT_SEC,
+# finish within DOWNLOAD_DEADLINE_SEC and stay under DOWNLOAD_MAX_MB; a
+# dropped connection is resumed with a Range request up to DOWNLOAD_RETRIES
+# times. Files served with an ETag or Last-Modified are kept in
+# DOWNLOAD_CACHE_DIR (least recently used first out past DOWNLOAD_CACHE_MAX_MB,
+# 0 disables it) and revalidated with conditional requests
+DOWNLOAD_CONNECT_TIMEOUT_SEC = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT_SEC", "10"))
+DOWNLOAD_READ_TIMEOUT_SEC = float(os.getenv("DOWNLOAD_READ_TIMEOUT_SEC", "60"))
+DOWNLOAD_DEADLINE_SEC = float(os.getenv("DOWNLOAD_DEADLINE_SEC", "600"))
+DOWNLOAD_MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_MB", "500")) * 1024 * 1024
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_MAX_CONNECTIONS = int(os.getenv("DOWNLOAD_MAX_CONNECTIONS", "20"))
+DOWNLOAD_CACHE_DIR = os.getenv("DOWNLOAD_CACHE_DIR") or os.path.join(JOB_OUTPUT_DIR, "downloads")
+DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv("DOWNLOAD_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+# Job Store
+# Async jobs live in a SQLite database shared by every uvicorn worker, so
+# status polling works behind a load balancer and survives restarts.
+# Finished jobs (and their exports in JOB_OUTPUT_DIR) are evicted after JOB_TTL_SEC
+JOB_DB_PATH = os.getenv("JOB_DB_PATH") or os.path.join(JOB_OUTPUT_DIR, "jobs.db")
+JOB_TTL_SEC = int(os.getenv("JOB_TTL_SEC", str(24 * 3600)))
+JOB_EVICT_INTERVAL_SEC = int(os.getenv("JOB_EVICT_INTERVAL_SEC", "300"))
+
+# Job De-duplication
+# A submission identical to an in-flight job, or to one completed within
+# JOB_DEDUP_WINDOW_SEC (same file_url and output options), is attached to
+# that job instead of queueing new work; after download, a job whose
+# document content and options match another reuses its result.
+# Requests opt out with "dedupe": false
+JOB_DEDUP_WINDOW_SEC = int(os.getenv("JOB_DEDUP_WINDOW_SEC", "600"))
+
+# Job Queue
+# Web workers only enqueue; `python -m app.worker` claims pending jobs
+# (highest priority first, FIFO within a priority) and runs up to
+# JOB_WORKER_CONCURRENCY at a time on its own conversion pool. A job whose
+# worker stops heartbeating for JOB_STALE_SEC is put back in the queue
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL_SEC = float(os.getenv("JOB_POLL_INTERVAL_SEC", "1"))
+JOB_HEARTBEAT_SEC = int(os.getenv("JOB_HEARTBEAT_SEC", "15"))
+JOB_STALE_SEC = int(os.getenv("JOB_STALE_SEC", "120"))
+# Running jobs are checked for cancellation this often
+JOB_CANCEL_POLL_SEC = float(os.getenv("JOB_CANCEL_POLL_SEC", "1"))
+
+# Job Progress Events
+# /convert/events/{job_id} streams each job's progress as Server-Sent Events,
+# reading new events from the job store every JOB_EVENTS_POLL_SEC (the
+# worker writing them may be another process) and sending a keep-alive
+# comment when nothing changed for SSE_KEEPALIVE_SEC
+JOB_EVENTS_POLL_SEC = float(os.getenv("JOB_EVENTS_POLL_SEC", "0.5"))
+SSE_KEEPALIVE_SEC = int(os.getenv("SSE_KEEPALIVE_SEC", "15"))
+
+# Job Results
+# Status responses carry a result summary; products are paged from
+# /jobs/{job_id}/result (JOB_RESULT_PAGE_SIZE by default, at most
+# JOB_RESULT_MAX_PAGE_SIZE). Results and exports are gzipped for clients
+# that accept it once larger than JOB_RESULT_GZIP_MIN_BYTES. Products are
+# stored in compressed chunks of JOB_RESULT_CHUNK_SIZE, so a page only
+# decompresses the chunks it covers
+JOB_RESULT_PAGE_SIZE = int(os.getenv("JOB_RESULT_PAGE_SIZE", "50"))
+JOB_RESULT_MAX_PAGE_SIZE = int(os.getenv("JOB_RESULT_MAX_PAGE_SIZE", "500"))
+JOB_RESULT_GZIP_MIN_BYTES = int(os.getenv("JOB_RESULT_GZIP_MIN_BYTES", "1024"))
+JOB_RESULT_CHUNK_SIZE = int(os.getenv("JOB_RESULT_CHUNK_SIZE", "100"))
+
+# Job Webhooks
+# Async jobs may pass a callback_url; when the job completes or fails the job
+# worker POSTs a result summary signed with WEBHOOK_SECRET (HMAC-SHA256 over
+# "<timestamp>.<body>", sent as X-Webhook-Signature: t=<timestamp>,v1=<hex>).
+# Failed deliveries (timeouts, 5xx, 408, 429) are retried with exponential
+# backoff from WEBHOOK_BACKOFF_SEC up to WEBHOOK_MAX_ATTEMPTS attempts
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_TIMEOUT_SEC = int(os.getenv("WEBHOOK_TIMEOUT_SEC", "10"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "6"))
+WEBHOOK_BACKOFF_SEC = int(os.getenv("WEBHOOK_BACKOFF_SEC", "10"))
+WEBHOOK_BACKOFF_MAX_SEC = int(os.getenv("WEBHOOK_BACKOFF_MAX_SEC", "900"))
+WEBHOOK_POLL_SEC = float(os.getenv("WEBHOOK_POLL_SEC", "2"))
+
+# PDF Conversion Workers
+# Page runs are converted in separate worker processes so a run that misses
+# its deadline can be killed; 0 converts in-process with no deadline.
+# A worker is recycled after MAX_TASKS runs or once its private (unshared) RSS passes MAX_RSS_MB
+PDF_WORKER_PROCESSES = int(os.getenv("PDF_WORKER_PROCESSES", "2"))
+PDF_RUN_TIMEOUT_SEC = int(os.getenv("PDF_RUN_TIMEOUT_SEC", "120"))
+PDF_WORKER_MAX_TASKS = int(os.getenv("PDF_WORKER_MAX_TASKS", "200"))
+PDF_WORKER_MAX_RSS_MB = int(os.getenv("PDF_WORKER_MAX_RSS_MB", "3072"))
+
+# Worker Start Method
+# "forkserver" imports Docling and preloads PDF_PRELOAD_PROFILES once, then
+# forks every pool worker from that process so model weights are shared
+# copy-on-write; "spawn" starts each worker from a clean interpreter
+WORKER_START_METHOD = os.getenv("WORKER_START_METHOD", "forkserver")
+PDF_PRELOAD_PROFILES = [
+    name.strip() for name in os.getenv("PDF_PRELOAD_PROFILES", "balanced").split(",") if name.strip()
+]
+
+# CPU Thread Budget
+# Each conversion worker gets (cores - CPU_RESERVED_CORES) / workers intra-op
+# threads for torch/OpenMP/BLAS; set CONVERSION_THREADS_PER_WORKER to override
+CPU_RESERVED_CORES = int(os.getenv("CPU_RESERVED_CORES", "1"))
+CONVERSION_THREADS_PER_WORKER = int(os.getenv("CONVERSION_THREADS_PER_WORKER", "0"))
+
+# Docling Model Artifacts
+# Local model bundle (baked into the image) so no model is downloaded at
+# request time; readiness fails if any REQUIRED entry is missing from it
+DOCLING_ARTIFACTS_PATH = os.getenv("DOCLING_ARTIFACTS_PATH", "")
+DOCLING_REQUIRED_ARTIFACTS = [
+    name.strip()
+    for name in os.getenv("DOCLING_REQUIRED_ARTIFACTS", "ds4sd--docling-models,EasyOcr").split(",")
+    if name.strip()
+]
+
+# HTML Parsing Workers
+# Scraped pages are parsed (BeautifulSoup + extractors) in their own pool
+PARSE_WORKER_PROCESSES = int(os.getenv("PARSE_WORKER_PROCESSES", "1"))
+PARSE_TIMEOUT_SEC = int(os.getenv("PARSE_TIMEOUT_SEC", "30"))
+PARSE_WORKER_MAX_TASKS = int(os.getenv("PARSE_WORKER_MAX_TASKS", "500"))
+PARSE_WORKER_MAX_RSS_MB = int(os.getenv("PARSE_WORKER_MAX_RSS_MB", "512"))
+
+# PDF Batch Conversion
+# Documents in one batch request converted at the same time (they share the
+# warm profile converters) and the most documents a single batch may carry
+PDF_BATCH_CONCURRENCY = int(os.getenv("PDF_BATCH_CONCURRENCY", "2"))
+PDF_BATCH_MAX_DOCUMENTS = 50
+
+# Office/HTML Documents
+# File extensions converted by Docling's simple (model-free) pipeline
+DOCUMENT_FORMATS = {
+    ".docx": "docx",
+    ".pptx": "pptx",
+    ".html": "html",
+    ".htm": "html"
+}
+
+# PDF Table Extraction
+# Header cell keywords mapped to product fields (matched case-insensitively)
+# Fields are tried in order, so "EAN Code" maps to barcode before sku sees "code"
+TABLE_HEADER_KEYWORDS = {
+    "barcode": ["ean", "barcode", "gtin", "upc"],
+    "sku": ["sku", "product code", "item code", "code", "model", "part no", "part number", "article", "ref"],
+    "name": ["description", "product name", "product", "name", "item", "title"],
+    "brand": ["brand", "manufacturer"],
+    "dimensions": ["dimensions", "dimension", "size", "h x w x d", "hxwxd", "dims"],
+    "powerW": ["power", "wattage", "watts"],
+    "weight": ["weight"],
+    "capacity": ["capacity", "volume"],
+    "price": ["price", "rrp", "cost"]
+}
+
+# Keyword Dictionaries
+# Shared brand/colour/material matcher; KEYWORD_DICTIONARY_PATH may point to a
+# JSON file of {"brand": [...], "colour": [...], "material": [...]} to extend these
+KEYWORD_DICTIONARY_PATH = os.getenv("KEYWORD_DICTIONARY_PATH", "")
+BRAND_KEYWORDS = [
+    "Sage", "Breville", "KitchenAid", "Kenwood", "Smeg", "Dualit",
+    "Cuisinart", "Magimix", "Russell Hobbs", "Morphy Richards",
+    "De'Longhi", "Nespresso", "Bosch", "Siemens", "Miele",
+    "Le Creuset", "Tramontina", "Zwilling", "Wusthof", "CASO"
+]
+COLOUR_KEYWORDS = [
+    "black", "white", "silver", "grey", "gray", "red", "blue", "green",
+    "gold", "rose gold", "bronze", "copper", "cream", "stainless steel"
+]
+MATERIAL_KEYWORDS = [
+    "stainless steel", "carbon steel", "cast iron", "aluminium", "aluminum",
+    "copper", "ceramic", "porcelain", "stoneware", "earthenware", "bone china",
+    "glass", "borosilicate glass", "enamel", "silicone", "bamboo", "wood",
+    "acacia", "olive wood", "marble", "slate", "melamine", "cotton", "linen"
+]
@@ -0,0 +1,917 @@
+"""
+Async job tracking
+SQLite job store and queue shared by the async processing endpoints, every
+uvicorn worker and the job workers (app/worker.py); a result's summary is
+kept on its job row and its products in compressed chunks beside it, and
+finished jobs are evicted after JOB_TTL_SEC
+"""
+import os
+import json
+import time
+import uuid
+import zlib
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    JOB_DB_PATH,
+    JOB_OUTPUT_DIR,
+    JOB_TTL_SEC,
+    JOB_STALE_SEC,
+    JOB_DEDUP_WINDOW_SEC,
+    JOB_RESULT_CHUNK_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Job Status Enum
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+# Only unfinished jobs take updates, so a worker cannot overwrite a cancellation
+_UNFINISHED = f"status IN ('{JobStatus.PENDING.value}', '{JobStatus.PROCESSING.value}')"
+
+# What a job ingests; the job worker picks the processing step by kind
+JOB_KINDS = ("pdf", "csv", "image", "text", "url")
+
+# Job exports written to JOB_OUTPUT_DIR: name -> (file suffix, media type)
+JOB_EXPORTS = {
+    "markdown": (".md", "text/markdown"),
+    "document": (".json", "application/json"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'pdf',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    fingerprint TEXT,
+    options_fingerprint TEXT,
+    content_hash TEXT,
+    duplicates INTEGER NOT NULL DEFAULT 0,
+    progress INTEGER NOT NULL DEFAULT 0,
+    progress_message TEXT NOT NULL DEFAULT '',
+    error TEXT,
+    products_count INTEGER,
+    summary TEXT,
+    request TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_fingerprint ON jobs (fingerprint);
+CREATE INDEX IF NOT EXISTS idx_jobs_content_hash ON jobs (content_hash);
+CREATE TABLE IF NOT EXISTS job_result_chunks (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    chunk INTEGER NOT NULL,
+    products BLOB NOT NULL,
+    PRIMARY KEY (job_id, chunk)
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS webhook_deliveries (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    event TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_status_code INTEGER,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    delivered_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_due ON webhook_deliveries (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_job ON webhook_deliveries (job_id);
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    key TEXT NOT NULL,
+    item BLOB NOT NULL,
+    PRIMARY KEY (job_id, step, key)
+);
+CREATE TABLE IF NOT EXISTS job_callbacks (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    PRIMARY KEY (job_id, url)
+);
+"""
+
+# One connection per thread (endpoints, to_thread workers and background tasks all touch the store)
+_local = threading.local()
+# Request fields that do not change a job's output (left out of its fingerprint)
+_UNFINGERPRINTED_FIELDS = {"priority", "callback_url", "dedupe", "upload_path"}
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _connection() -> sqlite3.Connection:
+    """This thread's connection, creating the database on first use"""
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(JOB_DB_PATH)), exist_ok=True)
+        # Autocommit; busy_timeout covers writers in other uvicorn workers
+        conn = sqlite3.connect(JOB_DB_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not _schema_ready:
+            with _schema_lock:
+                conn.executescript(_SCHEMA)
+                _schema_ready = True
+        _local.conn = conn
+    return conn
+
+
+@contextmanager
+def _transaction():
+    """Write transaction; IMMEDIATE takes the write lock up front so read-then-write steps cannot race"""
+    conn = _connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+def _record_event(conn: sqlite3.Connection, job_id: str):
+    """
+    Append the job's current state to its event log (streamed by /convert/events/{job_id})
+    Event ids count up per job, so clients resume with Last-Event-ID
+    """
+    row = conn.execute(
+        "SELECT status, progress, progress_message, error FROM jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    if row is None:
+        return
+    event = row['status'] if JobStatus(row['status']) in FINISHED_STATUSES else "progress"
+    conn.execute(
+        "INSERT INTO job_events (job_id, seq, event, data, created_at) "
+        "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?), ?, ?, ?)",
+        (job_id, job_id, event, json.dumps(dict(row)), time.time())
+    )
+
+
+def _queue_webhook(conn: sqlite3.Connection, job_id: str, urls: List[str] = None):
+    """
+    Queue the completion webhooks of a finished job, if it asked for any
+    Written in the job's own transaction, so a finished job never loses its callbacks
+    Args:
+        conn: Connection inside the transaction
+        job_id: Finished job (completed ones send their stored result summary)
+        urls: Only these callbacks (defaults to the job's own plus those of attached duplicates)
+    """
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return
+    if urls is None:
+        urls = [json.loads(row['request']).get('callback_url')]
+        urls += [callback['url'] for callback in conn.execute("SELECT url FROM job_callbacks WHERE job_id = ?", (job_id,))]
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return
+
+    event = f"job.{row['status']}"
+    payload = {
+        "event": event,
+        "job_id": job_id,
+        "status": row['status'],
+        "created_at": datetime.fromtimestamp(row['created_at']).isoformat(),
+        "finished_at": datetime.fromtimestamp(row['finished_at']).isoformat(),
+        "error": row['error'],
+        "status_url": f"/convert/status/{job_id}",
+        "summary": json.loads(row['summary']) if row['summary'] else None
+    }
+
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO webhook_deliveries (id, job_id, url, event, payload, status, next_attempt_at, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), job_id, url, event, json.dumps(payload), "pending", now, now) for url in urls]
+    )
+
+
+def _load_products(conn: sqlite3.Connection, job_id: str, first: int = 0, last: int = None) -> List[Dict[str, Any]]:
+    """Products of a completed job's result, from chunk first through last (all when last is None)"""
+    rows = conn.execute(
+        "SELECT products FROM job_result_chunks WHERE job_id = ? AND chunk >= ? AND (? IS NULL OR chunk <= ?) "
+        "ORDER BY chunk",
+        (job_id, first, last, last)
+    )
+    return [product for row in rows for product in json.loads(zlib.decompress(row['products']))]
+
+
+def _load_result(conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+    """Full result of a completed job: its stored summary with the products put back"""
+    row = conn.execute("SELECT summary FROM jobs WHERE id = ? AND summary IS NOT NULL", (job_id,)).fetchone()
+    if row is None:
+        return None
+    return {**json.loads(row['summary']), 'products': _load_products(conn, job_id)}
+
+
+def request_fingerprint(request: Dict[str, Any], include_source: bool = True) -> str:
+    """
+    Identify the work a job request asks for
+    Args:
+        request: Job request parameters
+        include_source: Include file_url (leave it out to match on content hash plus options)
+    Returns:
+        Hex SHA-256 of the output-affecting options
+    """
+    ignored = _UNFINGERPRINTED_FIELDS if include_source else _UNFINGERPRINTED_FIELDS | {"file_url"}
+    options = {key: value for key, value in request.items() if key not in ignored}
+    return hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def result_summary(job_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A job result without its products, for status responses, events and webhooks
+    Args:
+        job_id: Completed job
+        result: Its full result
+    Returns:
+        Counts, timings and export URLs; products are paged from products_url
+    """
+    summary = {key: value for key, value in result.items() if key != "products"}
+    summary["products_count"] = len(result.get("products") or [])
+    summary["products_url"] = f"/jobs/{job_id}/result"
+    return summary
+
+
+def result_products(
+    job_id: str,
+    offset: int = 0,
+    limit: int = 50,
+    fields: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    One page of a completed job's products, decompressing only the chunks it covers
+    Args:
+        job_id: Completed job
+        offset: Index of the first product
+        limit: Products per page
+        fields: Only these product fields (all when None)
+    Returns:
+        Dict with total, offset, limit, next_offset (None on the last page) and
+        products; None when the job has no stored result
+    """
+    conn = _connection()
+    row = conn.execute(
+        "SELECT products_count, summary FROM jobs WHERE id = ? AND status = ?", (job_id, JobStatus.COMPLETED.value)
+    ).fetchone()
+    if row is None:
+        return None
+    total = row['products_count']
+    first = offset // JOB_RESULT_CHUNK_SIZE
+    products = _load_products(conn, job_id, first, (offset + limit - 1) // JOB_RESULT_CHUNK_SIZE)
+    start = offset - first * JOB_RESULT_CHUNK_SIZE
+    page = products[start:start + limit]
+    if fields:
+        page = [{field: product[field] for field in fields if field in product} for product in page]
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < total else None,
+        "products": page,
+    }
+
+
+def _find_duplicate(conn: sqlite3.Connection, match: Dict[str, str], exclude: str = None) -> Optional[sqlite3.Row]:
+    """
+    Job matching on the given fingerprint columns that is in flight or
+    completed within JOB_DEDUP_WINDOW_SEC (completed ones preferred)
+    """
+    conditions = " AND ".join(f"{column} = ?" for column in match)
+    return conn.execute(
+        f"SELECT * FROM jobs WHERE {conditions} AND id IS NOT ? AND "
+        "(status IN (?, ?) OR (status = ? AND finished_at >= ?)) "
+        "ORDER BY status = ? DESC, created_at DESC LIMIT 1",
+        (*match.values(), exclude, JobStatus.PENDING.value, JobStatus.PROCESSING.value,
+         JobStatus.COMPLETED.value, time.time() - JOB_DEDUP_WINDOW_SEC, JobStatus.COMPLETED.value)
+    ).fetchone()
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value else None
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    return {
+        'id': row['id'],
+        'status': JobStatus(row['status']),
+        'kind': row['kind'],
+        'priority': row['priority'],
+        'created_at': datetime.fromtimestamp(row['created_at']),
+        'started_at': _timestamp(row['started_at']),
+        'finished_at': _timestamp(row['finished_at']),
+        'worker': row['worker'],
+        'duplicates': row['duplicates'],
+        'progress': row['progress'],
+        'progress_message': row['progress_message'],
+        'result': None,
+        'error': row['error'],
+        'products_count': row['products_count'],
+        'summary': json.loads(row['summary']) if row['summary'] else None,
+        'request': json.loads(row['request'])
+    }
+
+
+def create_job(request: Dict[str, Any], priority: int = 0, dedupe: bool = False, kind: str = "pdf") -> dict:
+    """
+    Queue a new pending job
+    Args:
+        request: Request parameters the job runner needs
+        priority: Higher runs first; FIFO within the same priority
+        dedupe: Attach to an identical in-flight job, or one completed within
+            JOB_DEDUP_WINDOW_SEC, instead of queueing new work
+        kind: Source type, one of JOB_KINDS
+    Returns:
+        Job dict ('deduplicated' is True when it is an existing job)
+    """
+    job_id = str(uuid.uuid4())
+    now = time.time()
+    message = "Job created, waiting to start..."
+    # Kind is part of the work: the same options on another source type are a different job
+    fingerprinted = {**request, "kind": kind}
+    fingerprint = request_fingerprint(fingerprinted)
+    with _transaction() as conn:
+        # Checked under the write lock, so simultaneous identical submissions still share one job
+        duplicate = _find_duplicate(conn, {"fingerprint": fingerprint}) if dedupe else None
+        if duplicate is not None:
+            _attach_duplicate(conn, duplicate, request.get('callback_url'))
+            job = _row_to_job(duplicate)
+            job['deduplicated'] = True
+            return job
+
+        conn.execute(
+            "INSERT INTO jobs (id, status, kind, priority, created_at, updated_at, progress_message, request, "
+            "fingerprint, options_fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, JobStatus.PENDING.value, kind, priority, now, now, message, json.dumps(request),
+             fingerprint, request_fingerprint(fingerprinted, include_source=False))
+        )
+        _record_event(conn, job_id)
+    return {
+        'deduplicated': False,
+        'id': job_id,
+        'status': JobStatus.PENDING,
+        'kind': kind,
+        'priority': priority,
+        'created_at': datetime.fromtimestamp(now),
+        'started_at': None,
+        'finished_at': None,
+        'worker': None,
+        'duplicates': 0,
+        'progress': 0,
+        'progress_message': message,
+        'result': None,
+        'error': None,
+        'request': request
+    }
+
+
+def _attach_duplicate(conn: sqlite3.Connection, job: sqlite3.Row, callback_url: Optional[str]):
+    """Count a duplicate submission against an existing job and subscribe its callback"""
+    conn.execute("UPDATE jobs SET duplicates = duplicates + 1 WHERE id = ?", (job['id'],))
+    if not callback_url:
+        return
+    if job['status'] == JobStatus.COMPLETED.value:
+        _queue_webhook(conn, job['id'], urls=[callback_url])
+    else:
+        conn.execute("INSERT OR IGNORE INTO job_callbacks (job_id, url) VALUES (?, ?)", (job['id'], callback_url))
+
+
+def find_job_by_content(job_id: str, content_hash: str) -> Optional[dict]:
+    """
+    Record a job's downloaded content hash and look for the same work done elsewhere
+    Args:
+        job_id: Job that just downloaded its source
+        content_hash: Hex SHA-256 of the source document
+    Returns:
+        In-flight or recently completed job with the same content and options, or None
+    """
+    with _transaction() as conn:
+        conn.execute("UPDATE jobs SET content_hash = ? WHERE id = ?", (content_hash, job_id))
+        job = conn.execute("SELECT options_fingerprint FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        duplicate = _find_duplicate(
+            conn, {"content_hash": content_hash, "options_fingerprint": job['options_fingerprint']}, exclude=job_id
+        )
+        return get_job(duplicate['id'], with_result=True) if duplicate else None
+
+
+def get_job(job_id: str, with_result: bool = False) -> Optional[dict]:
+    """
+    Look up a job by id
+    Args:
+        job_id: Job id
+        with_result: Also load the full result of a completed job (status
+            responses only need the summary stored on the row)
+    Returns:
+        Job dict, or None when unknown or evicted
+    """
+    conn = _connection()
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+
+    job = _row_to_job(row)
+    if with_result and job['status'] == JobStatus.COMPLETED:
+        job['result'] = _load_result(conn, job_id)
+    return job
+
+
+def update_job(job_id: str, status: JobStatus = None, progress: int = None, progress_message: str = None):
+    """
+    Record progress of a running job
+    Args:
+        job_id: Job id
+        status: New status (optional)
+        progress: Percent complete (optional)
+        progress_message: Human readable step (optional)
+    """
+    fields = {"updated_at": time.time()}
+    if status is not None:
+        fields["status"] = JobStatus(status).value
+    if progress is not None:
+        fields["progress"] = progress
+    if progress_message is not None:
+        fields["progress_message"] = progress_message
+
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with _transaction() as conn:
+        if conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ? AND {_UNFINISHED}", (*fields.values(), job_id)
+        ).rowcount:
+            _record_event(conn, job_id)
+
+
+def claim_next_job(worker: str) -> Optional[dict]:
+    """
+    Take the next pending job off the queue
+    Args:
+        worker: Id of the claiming job worker
+    Returns:
+        Job dict now in PROCESSING, or None when the queue is empty
+    """
+    now = time.time()
+    # The write lock is held from the SELECT on, so two workers never claim the same job
+    with _transaction() as conn:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY priority DESC, created_at LIMIT 1",
+            (JobStatus.PENDING.value,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker = ?, started_at = ?, updated_at = ?, "
+            "progress_message = ? WHERE id = ?",
+            (JobStatus.PROCESSING.value, worker, now, now, "Job started", row['id'])
+        )
+        _record_event(conn, row['id'])
+        return _row_to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+
+
+def heartbeat(job_ids: List[str]):
+    """Mark running jobs as still alive (see requeue_stale_jobs)"""
+    if job_ids:
+        now = time.time()
+        _connection().executemany("UPDATE jobs SET updated_at = ? WHERE id = ?", [(now, job_id) for job_id in job_ids])
+
+
+def requeue_stale_jobs(stale_sec: int = None) -> int:
+    """
+    Put jobs whose worker stopped heartbeating back in the queue
+    Args:
+        stale_sec: Seconds without a heartbeat (defaults to JOB_STALE_SEC)
+    Returns:
+        Number of jobs requeued
+    """
+    cutoff = time.time() - (JOB_STALE_SEC if stale_sec is None else stale_sec)
+    with _transaction() as conn:
+        job_ids = [
+            row['id'] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND updated_at < ?", (JobStatus.PROCESSING.value, cutoff)
+            )
+        ]
+        for job_id in job_ids:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL, progress = 0, "
+                "progress_message = ? WHERE id = ?",
+                (JobStatus.PENDING.value, "Worker lost, job requeued", job_id)
+            )
+            _record_event(conn, job_id)
+    if job_ids:
+        logger.warning(f"Requeued {len(job_ids)} jobs from unresponsive workers")
+    return len(job_ids)
+
+
+def queue_position(job_id: str) -> int:
+    """Pending jobs that will be claimed before this one"""
+    return _connection().execute(
+        "SELECT COUNT(*) FROM jobs AS other, (SELECT priority, created_at FROM jobs WHERE id = ?) AS job "
+        "WHERE other.status = ? AND (other.priority > job.priority OR "
+        "(other.priority = job.priority AND other.created_at < job.created_at))",
+        (job_id, JobStatus.PENDING.value)
+    ).fetchone()[0]
+
+
+def queue_stats() -> Dict[str, Any]:
+    """
+    Queue depth and wait times
+    Returns:
+        Dict with depth, depth_by_priority, depth_by_kind, processing,
+        oldest_wait_seconds and avg_wait_seconds (over the last 100 started jobs)
+    """
+    conn = _connection()
+    now = time.time()
+    by_priority = {
+        row['priority']: row['n'] for row in conn.execute(
+            "SELECT priority, COUNT(*) AS n FROM jobs WHERE status = ? GROUP BY priority ORDER BY priority DESC",
+            (JobStatus.PENDING.value,)
+        )
+    }
+    by_kind = {
+        row['kind']: row['n'] for row in conn.execute(
+            "SELECT kind, COUNT(*) AS n FROM jobs WHERE status = ? GROUP BY kind", (JobStatus.PENDING.value,)
+        )
+    }
+    oldest = conn.execute(
+        "SELECT MIN(created_at) FROM jobs WHERE status = ?", (JobStatus.PENDING.value,)
+    ).fetchone()[0]
+    processing = conn.execute(
+        "SELECT COUNT(*) FROM jobs WHERE status = ?", (JobStatus.PROCESSING.value,)
+    ).fetchone()[0]
+    avg_wait = conn.execute(
+        "SELECT AVG(started_at - created_at) FROM "
+        "(SELECT started_at, created_at FROM jobs WHERE started_at IS NOT NULL ORDER BY started_at DESC LIMIT 100)"
+    ).fetchone()[0]
+    return {
+        "depth": sum(by_priority.values()),
+        "depth_by_priority": by_priority,
+        "depth_by_kind": by_kind,
+        "processing": processing,
+        "oldest_wait_seconds": round(now - oldest, 1) if oldest else 0.0,
+        "avg_wait_seconds": round(avg_wait, 1) if avg_wait is not None else None,
+    }
+
+
+def complete_job(job_id: str, result: Dict[str, Any]):
+    """
+    Store a job's result and mark it completed
+    Args:
+        job_id: Job id
+        result: Result payload (its summary is stored on the job row, its
+            products as compressed chunks of JOB_RESULT_CHUNK_SIZE)
+    """
+    now = time.time()
+    summary = result_summary(job_id, result)
+    products = result.get("products") or []
+    chunks = [
+        (job_id, start // JOB_RESULT_CHUNK_SIZE,
+         zlib.compress(json.dumps(products[start:start + JOB_RESULT_CHUNK_SIZE]).encode("utf-8")))
+        for start in range(0, len(products), JOB_RESULT_CHUNK_SIZE)
+    ]
+    with _transaction() as conn:
+        if not conn.execute(
+            "UPDATE jobs SET status = ?, progress = 100, progress_message = ?, updated_at = ?, finished_at = ?, "
+            f"products_count = ?, summary = ? WHERE id = ? AND {_UNFINISHED}",
+            (JobStatus.COMPLETED.value, "Processing complete!", now, now, len(products), json.dumps(summary), job_id)
+        ).rowcount:
+            return
+        conn.executemany("INSERT OR REPLACE INTO job_result_chunks (job_id, chunk, products) VALUES (?, ?, ?)", chunks)
+        # The result now holds everything the checkpoints did
+        conn.execute("DELETE FROM job_checkpoints WHERE job_id = ?", (job_id,))
+        _record_event(conn, job_id)
+        _queue_webhook(conn, job_id)
+
+
+def save_checkpoint(job_id: str, step: str, key: str, item: Any):
+    """
+    Record one finished item of a long job step, so a resumed job can skip it
+    Args:
+        job_id: Running job
+        step: Step name (e.g. "brand_voice")
+        key: Identifies the item's input within the step
+        item: Its output (stored as a compressed JSON blob)
+    """
+    _connection().execute(
+        "INSERT OR REPLACE INTO job_checkpoints (job_id, step, key, item) VALUES (?, ?, ?, ?)",
+        (job_id, step, key, zlib.compress(json.dumps(item).encode("utf-8")))
+    )
+
+
+def load_checkpoints(job_id: str, step: str) -> Dict[str, Any]:
+    """Items of a job step finished by an earlier run of the job: key -> output"""
+    return {
+        row['key']: json.loads(zlib.decompress(row['item'])) for row in _connection().execute(
+            "SELECT key, item FROM job_checkpoints WHERE job_id = ? AND step = ?", (job_id, step)
+        )
+    }
+
+
+def fail_job(job_id: str, error: str):
+    """
+    Mark a job failed
+    Args:
+        job_id: Job id
+        error: Error message
+    """
+    now = time.time()
+    with _transaction() as conn:
+        if not conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, progress_message = ?, updated_at = ?, finished_at = ? "
+            f"WHERE id = ? AND {_UNFINISHED}",
+            (JobStatus.FAILED.value, error, f"Processing failed: {error}", now, now, job_id)
+        ).rowcount:
+            return
+        _record_event(conn, job_id)
+        _queue_webhook(conn, job_id)
+
+
+def cancel_job(job_id: str, callback_url: Optional[str] = None) -> Optional[dict]:
+    """
+    Cancel a pending or running job on behalf of one of its submitters
+    When identical submissions were coalesced onto the job (duplicates > 0)
+    only the caller is detached and the work goes on for the others.
+    Otherwise a pending job is never claimed, and the worker running a
+    processing job sees the status change and aborts it (see cancelled_jobs)
+    Args:
+        job_id: Job id
+        callback_url: The caller's callback, unsubscribed when it is detached
+    Returns:
+        Job dict after the change, with 'cancelled' (this call cancelled it) and
+        'detached' (this call only detached a duplicate submission); None when unknown
+    """
+    now = time.time()
+    cancelled = detached = False
+    with _transaction() as conn:
+        row = conn.execute("SELECT status, request, duplicates FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        request = json.loads(row['request'])
+        if JobStatus(row['status']) in FINISHED_STATUSES:
+            pass
+        elif row['duplicates'] > 0:
+            conn.execute("UPDATE jobs SET duplicates = duplicates - 1, updated_at = ? WHERE id = ?", (now, job_id))
+            if callback_url:
+                conn.execute("DELETE FROM job_callbacks WHERE job_id = ? AND url = ?", (job_id, callback_url))
+                if request.get('callback_url') == callback_url:
+                    request['callback_url'] = None
+                    conn.execute("UPDATE jobs SET request = ? WHERE id = ?", (json.dumps(request), job_id))
+            detached = True
+        else:
+            cancelled = bool(conn.execute(
+                "UPDATE jobs SET status = ?, progress_message = ?, updated_at = ?, finished_at = ? "
+                f"WHERE id = ? AND {_UNFINISHED}",
+                (JobStatus.CANCELLED.value, "Cancelled", now, now, job_id)
+            ).rowcount)
+            if cancelled:
+                _record_event(conn, job_id)
+                _queue_webhook(conn, job_id)
+
+    upload_path = request.get('upload_path')
+    if cancelled and row['status'] == JobStatus.PENDING.value and upload_path:
+        # Never claimed, so no worker will clean it up
+        try:
+            os.remove(upload_path)
+        except OSError:
+            pass
+    job = get_job(job_id)
+    job['cancelled'] = cancelled
+    job['detached'] = detached
+    return job
+
+
+def cancelled_jobs(job_ids: List[str]) -> List[str]:
+    """Which of these jobs have been cancelled (polled by the worker running them)"""
+    if not job_ids:
+        return []
+    placeholders = ", ".join("?" for _ in job_ids)
+    return [
+        row['id'] for row in _connection().execute(
+            f"SELECT id FROM jobs WHERE status = ? AND id IN ({placeholders})",
+            (JobStatus.CANCELLED.value, *job_ids)
+        )
+    ]
+
+
+def job_export_path(job_id: str, export: str) -> str:
+    """Path of a job's export file in JOB_OUTPUT_DIR"""
+    return os.path.join(JOB_OUTPUT_DIR, f"{job_id}{JOB_EXPORTS[export][0]}")
+
+
+def save_job_upload(file_content: bytes, suffix: str = ".pdf") -> str:
+    """
+    Keep an uploaded file on disk until a job worker picks it up
+    Args:
+        file_content: Uploaded bytes
+        suffix: File extension to keep
+    Returns:
+        Path to pass as the job request's upload_path (the worker removes it)
+    """
+    upload_dir = os.path.join(JOB_OUTPUT_DIR, "uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{uuid.uuid4()}{suffix}")
+    with open(path, "wb") as f:
+        f.write(file_content)
+    return path
+
+
+def remove_job_exports(job_id: str):
+    """Delete a job's export files, if any"""
+    for export in JOB_EXPORTS:
+        try:
+            os.remove(job_export_path(job_id, export))
+        except OSError:
+            pass
+
+
+def evict_expired_jobs(ttl_sec: int = None) -> int:
+    """
+    Delete finished jobs older than the TTL, with their results and export files
+    Args:
+        ttl_sec: Seconds a finished job is kept (defaults to JOB_TTL_SEC)
+    Returns:
+        Number of jobs evicted
+    """
+    cutoff = time.time() - (JOB_TTL_SEC if ttl_sec is None else ttl_sec)
+    conn = _connection()
+    job_ids = [
+        row['id'] for row in conn.execute(
+            f"SELECT id FROM jobs WHERE NOT {_UNFINISHED} AND finished_at < ?", (cutoff,)
+        )
+    ]
+    if not job_ids:
+        return 0
+
+    for job_id in job_ids:
+        remove_job_exports(job_id)
+    with _transaction() as conn:
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    logger.info(f"Evicted {len(job_ids)} expired jobs")
+    return len(job_ids)
+
+
+def job_events(job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+    """
+    Events recorded for a job since an event id
+    Args:
+        job_id: Job id
+        after: Last event id the client has seen (0 for all)
+    Returns:
+        List of dicts with id, event and data (decoded), oldest first
+    """
+    rows = _connection().execute(
+        "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+        (job_id, after)
+    )
+    return [{"id": row['seq'], "event": row['event'], "data": json.loads(row['data'])} for row in rows]
+
+
+def claim_webhook_deliveries(limit: int, lease_sec: float) -> List[Dict[str, Any]]:
+    """
+    Take webhook deliveries that are due
+    Args:
+        limit: Most deliveries to take
+        lease_sec: Hide the taken deliveries from other workers for this long
+    Returns:
+        List of delivery dicts (id, job_id, url, event, payload, attempts)
+    """
+    now = time.time()
+    with _transaction() as conn:
+        rows = conn.execute(
+            "SELECT id, job_id, url, event, payload, attempts FROM webhook_deliveries "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (now, limit)
+        ).fetchall()
+        conn.executemany(
+            "UPDATE webhook_deliveries SET next_attempt_at = ? WHERE id = ?",
+            [(now + lease_sec, row['id']) for row in rows]
+        )
+    return [dict(row) for row in rows]
+
+
+def record_webhook_attempt(
+    delivery_id: str,
+    delivered: bool,
+    status_code: Optional[int] = None,
+    error: Optional[str] = None,
+    retry_at: Optional[float] = None
+):
+    """
+    Record the outcome of one delivery attempt
+    Args:
+        delivery_id: Delivery id
+        delivered: Receiver accepted it (2xx)
+        status_code: HTTP status returned, if any
+        error: Error text for a failed attempt
+        retry_at: When to try again (None gives up on a failed attempt)
+    """
+    now = time.time()
+    if delivered:
+        status = "delivered"
+    else:
+        status = "pending" if retry_at is not None else "failed"
+    _connection().execute(
+        "UPDATE webhook_deliveries SET status = ?, attempts = attempts + 1, last_status_code = ?, "
+        "last_error = ?, next_attempt_at = ?, delivered_at = ? WHERE id = ?",
+        (status, status_code, error, retry_at or now, now if delivered else None, delivery_id)
+    )
+
+
+def webhook_deliveries(job_id: str) -> List[Dict[str, Any]]:
+    """
+    Webhook deliveries of a job
+    Args:
+        job_id: Job id
+    Returns:
+        List of dicts with id, url, event, status, attempts, last_status_code,
+        last_error, next_attempt_at, created_at and delivered_at (ISO times)
+    """
+    rows = _connection().execute(
+        "SELECT id, url, event, status, attempts, last_status_code, last_error, next_attempt_at, "
+        "created_at, delivered_at FROM webhook_deliveries WHERE job_id = ? ORDER BY created_at",
+        (job_id,)
+    )
+    deliveries = []
+    for row in rows:
+        delivery = dict(row)
+        for key in ("next_attempt_at", "created_at", "delivered_at"):
+            delivery[key] = datetime.fromtimestamp(delivery[key]).isoformat() if delivery[key] else None
+        if delivery["status"] != "pending":
+            delivery["next_attempt_at"] = None
+        deliveries.append(delivery)
+    return deliveries
+
+
+def job_counts() -> Dict[str, int]:
+    """Number of stored jobs per status"""
+    rows = _connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+    return {row['status']: row['n'] for row in rows}
+
+
+def job_status_response(job: dict) -> Dict[str, Any]:
+    """
+    Build the public status payload for a job
+    Args:
+        job: Job dict
+    Returns:
+        Status dict (includes the result summary or error once finished)
+    """
+    response = {
+        "job_id": job['id'],
+        "status": job['status'],
+        "kind": job['kind'],
+        "progress": job['progress'],
+        "progress_message": job.get('progress_message', ''),
+        "created_at": job['created_at'].isoformat(),
+        "priority": job['priority'],
+        "duplicates": job['duplicates']
+    }
+
+    # Time spent in the queue (so far, while still pending)
+    started_at = job['started_at'] or datetime.now()
+    response['wait_seconds'] = round((started_at - job['created_at']).total_seconds(), 1)
+    if job['status'] == JobStatus.PENDING:
+        response['queue_position'] = queue_position(job['id'])
+
+    # If completed, include the result summary (products are paged from /jobs/{job_id}/result)
+    if job['status'] == JobStatus.COMPLETED:
+        response['result'] = job['summary']
+
+    # If failed, include error
+    elif job['status'] == JobStatus.FAILED:
+        response['error'] = job['error']
+
+    return response
@@ -1,10 +1,15 @@
 ﻿# app/main.py - Complete Universal API with React Frontend
 import os
+import json
+import time
+import hashlib
+import asyncio
 import logging
 from pathlib import Path
+from urllib.parse import urlparse
 from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Query, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -24,7 +29,60 @@ except ImportError as e:
     logger.error(f"❌ Failed to import service modules: {e}")
     csv_parser = image_processor = text_processor = product_search = url_scraper = brand_voice = None
 
-from app.config import ALLOWED_CATEGORIES
+# PDF processor depends on Docling - keep the other services usable without it
+try:
+    from app.services import pdf_processor
+    logger.info("✅ PDF processor imported successfully")
+except ImportError as e:
+    logger.error(f"❌ Failed to import PDF processor: {e}")
+    pdf_processor = None
+
+# DOCX/PPTX/HTML go through Docling too
+try:
+    from app.services import document_processor
+    logger.info("✅ Document processor imported successfully")
+except ImportError as e:
+    logger.error(f"❌ Failed to import document processor: {e}")
+    document_processor = None
+
+from app.config import (
+    ALLOWED_CATEGORIES,
+    DOCUMENT_FORMATS,
+    PDF_PIPELINE_PROFILES,
+    DEFAULT_PDF_PROFILE,
+    JOB_EVICT_INTERVAL_SEC,
+    JOB_EVENTS_POLL_SEC,
+    JOB_RESULT_PAGE_SIZE,
+    JOB_RESULT_MAX_PAGE_SIZE,
+    SSE_KEEPALIVE_SEC,
+    WEBHOOK_SECRET,
+    PDF_BATCH_CONCURRENCY,
+    PDF_BATCH_MAX_DOCUMENTS
+)
+from app.models import ExtractRequest, TextJobRequest, URLJobRequest
+from app.jobs import (
+    JobStatus,
+    FINISHED_STATUSES,
+    JOB_EXPORTS,
+    create_job,
+    get_job,
+    cancel_job,
+    job_events,
+    webhook_deliveries,
+    job_export_path,
+    save_job_upload,
+    evict_expired_jobs,
+    job_counts,
+    queue_position,
+    queue_stats,
+    result_products,
+    job_status_response
+)
+from app.utils.memory import memory_stats
+from app.utils.responses import json_response, file_response
+from app.utils import downloads
+from app.utils.threads import thread_budget
+from app.services import worker_pool, readiness
 
 # Configuration
 API_KEY = os.getenv("DOCLING_API_KEY", "")
@@ -46,16 +104,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def load_docling_models():
+    """Verify the model bundle and preload converters in the background (see /readyz)"""
+    if pdf_processor:
+        asyncio.create_task(readiness.startup())
+
+@app.on_event("startup")
+async def start_job_eviction():
+    """Evict finished jobs past JOB_TTL_SEC, every JOB_EVICT_INTERVAL_SEC"""
+    async def evict_loop():
+        while True:
+            try:
+                await asyncio.to_thread(evict_expired_jobs)
+            except Exception as e:
+                logger.warning(f"⚠️ Job eviction failed: {e}")
+            await asyncio.sleep(JOB_EVICT_INTERVAL_SEC)
+    
+    asyncio.create_task(evict_loop())
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    """Stop the conversion and parsing worker processes and close pooled download connections"""
+    worker_pool.shutdown_pools()
+    await downloads.close_client()
+
 def check_key(x_api_key: Optional[str]):
     """Validate API key if configured"""
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
+def check_callback_url(callback_url: Optional[str]):
+    """Validate a job's webhook callback URL, if one was given"""
+    if not callback_url:
+        return
+    if not WEBHOOK_SECRET:
+        raise HTTPException(status_code=400, detail="Webhooks are not configured (WEBHOOK_SECRET is not set)")
+    parsed = urlparse(callback_url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise HTTPException(status_code=400, detail="callback_url must be an http(s) URL")
+
 # Models
 class ProcessingResponse(BaseModel):
     success: bool
     products: List[dict]
     message: Optional[str] = None
+    job_id: Optional[str] = None
 
 class TextProcessorRequest(BaseModel):
     text: str
@@ -81,7 +175,8 @@ async def healthz():
         "status": "ok",
         "version": "2.0.0",
         "openai_configured": bool(os.getenv("OPENAI_API_KEY")),
-        "frontend_available": FRONTEND_BUILD_DIR.exists()
+        "frontend_available": FRONTEND_BUILD_DIR.exists(),
+        "thread_budget": thread_budget()
     }
 
 @app.post("/api/parse-csv")
@@ -232,67 +327,608 @@ async def scrape_url_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/readyz")
+async def readyz():
+    """Readiness check - 503 until the Docling models are loaded"""
+    if not pdf_processor:
+        return JSONResponse(status_code=503, content={"ready": False, "error": "PDF processor not available"})
+    state = readiness.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+@app.get("/metrics")
+async def metrics():
+    """Process memory, conversion peak RSS, worker pool counters, stored jobs per status and queue depth"""
+    return {
+        "memory": memory_stats(),
+        "worker_pools": worker_pool.pool_stats(),
+        "jobs": await asyncio.to_thread(job_counts),
+        "queue": await asyncio.to_thread(queue_stats),
+    }
+
 @app.get("/api/categories")
 async def get_categories():
     """Get list of allowed categories"""
     return {"categories": sorted(list(ALLOWED_CATEGORIES))}
 
+@app.get("/api/pdf-profiles")
+async def get_pdf_profiles():
+    """Get available Docling pipeline profiles"""
+    return {"default": DEFAULT_PDF_PROFILE, "profiles": PDF_PIPELINE_PROFILES}
+
 @app.post("/api/extract-pdf-products")
 async def extract_pdf_products_endpoint(
     file: UploadFile = File(...),
     category: str = Form(default="Electricals"),
+    force_full_ocr: bool = Form(default=False),
+    profile: str = Form(default=DEFAULT_PDF_PROFILE),
+    two_phase: bool = Form(default=False),
+    callback_url: Optional[str] = Form(default=None),
     x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
 ):
-    """Extract products from PDF using Docling"""
+    """
+    Extract products from PDF using Docling
+
+    With two_phase=true, returns a text-layer preview straight away and runs
+    the full Docling extraction as a queued job (poll /convert/status/{job_id},
+    or pass callback_url to be notified when it finishes)
+    """
     check_key(x_api_key)
+    check_callback_url(callback_url if two_phase else None)
     
     try:
         if category not in ALLOWED_CATEGORIES:
             raise HTTPException(status_code=400, detail="Invalid category")
         
+        if profile not in PDF_PIPELINE_PROFILES:
+            raise HTTPException(status_code=400, detail="Invalid pipeline profile")
+        
         logger.info(f"📄 Processing PDF for category: {category}")
         
-        # Save uploaded file temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        if not pdf_processor:
+            raise HTTPException(status_code=503, detail="PDF processor not available")
         
-        try:
-            from docling.document_converter import DocumentConverter
-            
-            converter = DocumentConverter()
-            result = converter.convert(tmp_path)
-            markdown = result.document.export_to_markdown()
-            
-            # Extract product info from markdown
-            products = [{
-                "name": "Product from PDF",
-                "brand": "",
-                "sku": "",
-                "category": category,
-                "rawExtractedContent": markdown,
-                "descriptions": {
-                    "shortDescription": markdown[:200],
-                    "metaDescription": markdown[:160],
-                    "longDescription": markdown
-                }
-            }]
+        file_content = await file.read()
+        
+        if two_phase:
+            preview = await asyncio.to_thread(pdf_processor.preview_products, file_content, category)
             
-            # Generate brand voice
-            if brand_voice:
-                products = await brand_voice.generate(products, category)
+            upload_path = await asyncio.to_thread(save_job_upload, file_content)
+            request = ExtractRequest(
+                category=category,
+                force_full_ocr=force_full_ocr,
+                profile=profile,
+                callback_url=callback_url
+            ).dict()
+            job = await asyncio.to_thread(
+                create_job, {**request, "upload_path": upload_path}, priority=request["priority"]
+            )
             
-            return ProcessingResponse(success=True, products=products)
+            logger.info(f"⚡ Preview returned {len(preview)} products, full extraction job {job['id']}")
             
-        finally:
-            import os
-            os.unlink(tmp_path)
+            return ProcessingResponse(
+                success=True,
+                products=preview,
+                message="Preview from PDF text layer. Poll /convert/status/{job_id} for the full extraction.",
+                job_id=job['id']
+            )
+        
+        products = await pdf_processor.process(
+            file_content,
+            category,
+            force_full_ocr=force_full_ocr,
+            profile=profile
+        )
+        
+        logger.info(f"✅ Extracted {len(products)} products from PDF")
+        
+        return ProcessingResponse(success=True, products=products)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PDF error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/extract-document-products")
+async def extract_document_products_endpoint(
+    file: UploadFile = File(...),
+    category: str = Form(default="Electricals"),
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Extract products from a Word, PowerPoint or HTML document using Docling"""
+    check_key(x_api_key)
+    
+    try:
+        if category not in ALLOWED_CATEGORIES:
+            raise HTTPException(status_code=400, detail="Invalid category")
+        
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        if extension not in DOCUMENT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported document type. Choose one of: {', '.join(sorted(DOCUMENT_FORMATS))}"
+            )
+        
+        logger.info(f"📝 Processing {extension} document for category: {category}")
+        
+        if not document_processor:
+            raise HTTPException(status_code=503, detail="Document processor not available")
+        
+        file_content = await file.read()
+        products = await document_processor.process(file_content, file.filename, category)
+        
+        logger.info(f"✅ Extracted {len(products)} products from {file.filename}")
+        
+        return ProcessingResponse(success=True, products=products)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Document error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/extract-pdf-products/batch")
+async def extract_pdf_products_batch_endpoint(
+    files: List[UploadFile] = File(default=[]),
+    urls: List[str] = Form(default=[]),
+    category: str = Form(default="Electricals"),
+    force_full_ocr: bool = Form(default=False),
+    profile: str = Form(default=DEFAULT_PDF_PROFILE),
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """
+    Extract products from many PDFs (uploads and/or URLs) in one request
+
+    Documents are converted PDF_BATCH_CONCURRENCY at a time and streamed back
+    as NDJSON, one line per document in completion order, followed by a
+    summary line. A failed document is reported on its own line and does not
+    stop the rest of the batch. Uploaded DOCX/PPTX/HTML files are accepted
+    alongside PDFs and converted by the document processor.
+    """
+    check_key(x_api_key)
+    
+    if category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if profile not in PDF_PIPELINE_PROFILES:
+        raise HTTPException(status_code=400, detail="Invalid pipeline profile")
+    
+    if not pdf_processor:
+        raise HTTPException(status_code=503, detail="PDF processor not available")
+    
+    urls = [url.strip() for url in urls if url.strip()]
+    if not files and not urls:
+        raise HTTPException(status_code=400, detail="Provide at least one file or URL")
+    
+    if len(files) + len(urls) > PDF_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {PDF_BATCH_MAX_DOCUMENTS} documents per batch")
+    
+    # Uploads are read now - the request body is gone once streaming starts
+    documents = [{"name": file.filename, "content": await file.read()} for file in files]
+    documents += [{"name": url, "url": url} for url in urls]
+    
+    logger.info(f"📚 Batch of {len(documents)} PDFs for category: {category}")
+    
+    semaphore = asyncio.Semaphore(PDF_BATCH_CONCURRENCY)
+    
+    async def convert_document(index: int, document: dict) -> dict:
+        async with semaphore:
+            start_time = time.time()
+            try:
+                if "url" in document:
+                    extraction = await pdf_processor.process_url(document["url"], category, force_full_ocr, profile)
+                elif os.path.splitext(document["name"] or "")[1].lower() in DOCUMENT_FORMATS:
+                    if not document_processor:
+                        raise RuntimeError("Document processor not available")
+                    extraction = await document_processor.process_content(
+                        document.pop("content"), document["name"], category
+                    )
+                else:
+                    extraction = await pdf_processor.process_content(
+                        document.pop("content"), category, force_full_ocr, profile
+                    )
+                logger.info(f"✅ [{index}] {document['name']}: {len(extraction['products'])} products")
+                return {
+                    "index": index,
+                    "name": document["name"],
+                    "success": True,
+                    "products": extraction["products"],
+                    "pages_processed": extraction["pages_processed"],
+                    "ocr_pages": extraction.get("ocr_pages", 0),
+                    "timed_out_pages": extraction.get("timed_out_pages", []),
+                    "processing_time_seconds": round(time.time() - start_time, 1),
+                }
+            except Exception as e:
+                logger.error(f"❌ [{index}] {document['name']}: {e}", exc_info=True)
+                return {
+                    "index": index,
+                    "name": document["name"],
+                    "success": False,
+                    "error": str(e),
+                    "processing_time_seconds": round(time.time() - start_time, 1),
+                }
+    
+    async def stream_results():
+        tasks = [asyncio.create_task(convert_document(i, doc)) for i, doc in enumerate(documents)]
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                succeeded += result["success"]
+                yield json.dumps(result) + "\n"
+        finally:
+            # Client went away - stop converting what is left
+            for task in tasks:
+                task.cancel()
+        
+        yield json.dumps({
+            "done": True,
+            "documents": len(documents),
+            "succeeded": succeeded,
+            "failed": len(documents) - succeeded,
+        }) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+# ============================================================
+# ASYNC JOBS
+# ============================================================
+
+def queue_job(kind: str, request: dict, priority: int = 0, dedupe: bool = True) -> dict:
+    """
+    Queue a job for the job workers
+    Args:
+        kind: Source type (see JOB_KINDS)
+        request: Request parameters the worker needs
+        priority: Higher runs first
+        dedupe: Attach to an identical recent job instead of queueing new work
+    Returns:
+        Submission response with job_id
+    """
+    job = create_job(request, priority=priority, dedupe=dedupe, kind=kind)
+
+    if job['deduplicated']:
+        logger.info(f"[ASYNC] Duplicate {kind} submission attached to job {job['id']} ({job['status'].value})")
+        return {
+            "success": True,
+            "job_id": job['id'],
+            "kind": kind,
+            "status": job['status'],
+            "deduplicated": True,
+            "message": "Identical job already submitted. Poll /jobs/{job_id} for its result."
+        }
+
+    logger.info(f"[ASYNC] Queued {kind} job {job['id']} (priority {priority})")
+
+    return {
+        "success": True,
+        "job_id": job['id'],
+        "kind": kind,
+        "status": JobStatus.PENDING,
+        "deduplicated": False,
+        "queue_position": queue_position(job['id']),
+        "message": "Job queued. Follow /jobs/{job_id}/events (SSE) or poll /jobs/{job_id} for updates."
+    }
+
+
+async def queue_upload_job(
+    kind: str,
+    file: UploadFile,
+    request: dict,
+    priority: int,
+    dedupe: bool
+) -> dict:
+    """
+    Store an uploaded file and queue a job for it
+    Args:
+        kind: Source type
+        file: Uploaded file (kept on disk until the worker picks the job up)
+        request: Other request parameters
+        priority: Higher runs first
+        dedupe: Attach to an identical recent job (same bytes and options)
+    Returns:
+        Submission response with job_id
+    """
+    file_content = await file.read()
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    upload_path = await asyncio.to_thread(save_job_upload, file_content, suffix)
+    request = {
+        **request,
+        "filename": file.filename,
+        "content_sha256": hashlib.sha256(file_content).hexdigest(),
+        "upload_path": upload_path,
+    }
+
+    response = await asyncio.to_thread(queue_job, kind, request, priority, dedupe)
+    if response["deduplicated"]:
+        os.remove(upload_path)
+    return response
+
+
+@app.post("/convert/async")
+@app.post("/jobs/pdf")
+async def start_conversion(
+    req: ExtractRequest,
+    x_api_key_dash: Optional[str] = Header(default=None, alias="x-api-key"),
+    x_api_key_under: Optional[str] = Header(default=None, alias="x_api_key", convert_underscores=False),
+):
+    """Queue async PDF processing for the job workers - returns job_id immediately"""
+    x_api_key = x_api_key_dash or x_api_key_under
+    check_key(x_api_key)
+
+    if not req.file_url:
+        raise HTTPException(status_code=400, detail="file_url is required")
+
+    if req.profile is not None and req.profile not in PDF_PIPELINE_PROFILES:
+        raise HTTPException(status_code=400, detail="Invalid pipeline profile")
+
+    check_callback_url(req.callback_url)
+
+    if not pdf_processor:
+        raise HTTPException(status_code=503, detail="PDF processor not available")
+
+    return await asyncio.to_thread(queue_job, "pdf", req.dict(), req.priority, req.dedupe)
+
+
+@app.post("/jobs/csv")
+async def queue_csv_job(
+    file: UploadFile = File(...),
+    category: str = Form(...),
+    priority: int = Form(default=0, ge=0, le=10),
+    callback_url: Optional[str] = Form(default=None),
+    dedupe: bool = Form(default=True),
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Queue a CSV import (parsing and brand voice) - returns job_id immediately"""
+    check_key(x_api_key)
+    check_callback_url(callback_url)
+    
+    if category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if not csv_parser:
+        raise HTTPException(status_code=503, detail="CSV parser not available")
+    
+    return await queue_upload_job(
+        "csv", file, {"category": category, "callback_url": callback_url}, priority, dedupe
+    )
+
+
+@app.post("/jobs/image")
+async def queue_image_job(
+    file: UploadFile = File(...),
+    category: str = Form(...),
+    additional_text: str = Form(default=""),
+    priority: int = Form(default=0, ge=0, le=10),
+    callback_url: Optional[str] = Form(default=None),
+    dedupe: bool = Form(default=True),
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Queue an AI Vision image extraction (and brand voice) - returns job_id immediately"""
+    check_key(x_api_key)
+    check_callback_url(callback_url)
+    
+    if category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if not image_processor:
+        raise HTTPException(status_code=503, detail="Image processor not available")
+    
+    request = {"category": category, "additional_text": additional_text, "callback_url": callback_url}
+    return await queue_upload_job("image", file, request, priority, dedupe)
+
+
+@app.post("/jobs/text")
+async def queue_text_job(
+    req: TextJobRequest,
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Queue free-form text processing (and brand voice) - returns job_id immediately"""
+    check_key(x_api_key)
+    check_callback_url(req.callback_url)
+    
+    if req.category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if not text_processor:
+        raise HTTPException(status_code=503, detail="Text processor not available")
+    
+    return await asyncio.to_thread(queue_job, "text", req.dict(), req.priority, req.dedupe)
+
+
+@app.post("/jobs/url")
+async def queue_url_job(
+    req: URLJobRequest,
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Queue a product page scrape (and brand voice) - returns job_id immediately"""
+    check_key(x_api_key)
+    check_callback_url(req.callback_url)
+    
+    if req.category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if not url_scraper:
+        raise HTTPException(status_code=503, detail="URL scraper not available")
+    
+    return await asyncio.to_thread(queue_job, "url", req.dict(), req.priority, req.dedupe)
+
+
+@app.get("/convert/status/{job_id}")
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Check status of async job"""
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Pending jobs look up their queue position in the store
+    return await asyncio.to_thread(job_status_response, job)
+
+
+@app.get("/convert/events/{job_id}")
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Stream a job's progress as Server-Sent Events
+
+    Sends a "progress" event for each status/progress change, then a final
+    "completed" (with the result summary), "failed" (with the error) or "cancelled"
+    event and closes. Reconnecting clients resume after their Last-Event-ID header
+    (or ?last_event_id=); a fresh connection replays the job's history.
+    """
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        after = int(last_event_id or request.query_params.get("last_event_id") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    
+    async def event_stream():
+        nonlocal after
+        yield f"retry: {int(JOB_EVENTS_POLL_SEC * 4000)}\n\n"
+        idle = 0.0
+        try:
+            while True:
+                events = await asyncio.to_thread(job_events, job_id, after)
+                for event in events:
+                    data = event["data"]
+                    if event["event"] == JobStatus.COMPLETED:
+                        finished = await asyncio.to_thread(get_job, job_id)
+                        data["result"] = finished["summary"] if finished else None
+                    yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(data)}\n\n"
+                    after = event["id"]
+                    if event["event"] in FINISHED_STATUSES:
+                        return
+                
+                if events:
+                    idle = 0.0
+                elif idle >= SSE_KEEPALIVE_SEC:
+                    if not await asyncio.to_thread(get_job, job_id):
+                        # Evicted while we were waiting
+                        return
+                    # Keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    idle = 0.0
+                
+                if await request.is_disconnected():
+                    return
+                await asyncio.sleep(JOB_EVENTS_POLL_SEC)
+                idle += JOB_EVENTS_POLL_SEC
+        finally:
+            logger.info(f"[SSE {job_id}] Stream closed after event {after}")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/convert/cancel/{job_id}")
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_conversion(
+    job_id: str,
+    callback_url: Optional[str] = Query(default=None),
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """
+    Cancel a queued or running job
+
+    A queued job is dropped; a running one stops its download or conversion
+    run within a second or two, skips brand voice and discards its exports.
+    If identical submissions were coalesced onto the job, only this
+    submission is detached (pass its callback_url to stop its webhook) and
+    the job keeps running for the others. 409 once the job has finished.
+    """
+    check_key(x_api_key)
+    
+    job = await asyncio.to_thread(cancel_job, job_id, callback_url)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job['detached']:
+        logger.info(f"[ASYNC] Detached a submission from job {job_id} ({job['duplicates']} others still attached)")
+        return {
+            **await asyncio.to_thread(job_status_response, job),
+            "detached": True,
+            "message": "Other submissions share this job, so it keeps running; yours was detached."
+        }
+    
+    if not job['cancelled']:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status'].value}")
+    
+    logger.info(f"[ASYNC] Cancelled job {job_id}")
+    return await asyncio.to_thread(job_status_response, job)
+
+
+@app.get("/convert/webhooks/{job_id}")
+@app.get("/jobs/{job_id}/webhooks")
+async def get_job_webhooks(
+    job_id: str,
+    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
+):
+    """Webhook deliveries of a job: status, attempts and the last response or error"""
+    check_key(x_api_key)
+    
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {"job_id": job_id, "deliveries": await asyncio.to_thread(webhook_deliveries, job_id)}
+
+
+@app.get("/convert/result/{job_id}")
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    request: Request,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=JOB_RESULT_PAGE_SIZE, ge=1, le=JOB_RESULT_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+):
+    """
+    Page through a completed job's products
+
+    fields is a comma-separated list of product fields to return (e.g.
+    fields=name,sku,brand); follow next_offset until it is null. Gzipped
+    for clients that accept it.
+    """
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    projection = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    page = await asyncio.to_thread(result_products, job_id, offset, limit, projection)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Result not available")
+    return json_response(request, {"job_id": job_id, **page})
+
+
+@app.get("/convert/result/{job_id}/{export}")
+@app.get("/jobs/{job_id}/result/{export}")
+async def get_job_export(job_id: str, export: str, request: Request):
+    """Stream a completed job's markdown or Docling document JSON from disk (gzipped if accepted)"""
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if export not in JOB_EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+
+    path = job_export_path(job_id, export)
+    if job['status'] != JobStatus.COMPLETED or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export not available")
+
+    return file_response(request, path, JOB_EXPORTS[export][1])
+
+
 # ============================================================
 # SERVE REACT FRONTEND
 # ============================================================
@@ -12,6 +12,10 @@ class ExtractRequest(BaseModel):
     return_markdown: bool = True
     return_json: bool = True
     category: Optional[str] = "Electricals"
+    profile: Optional[str] = None
+    priority: int = Field(default=0, ge=0, le=10)
+    callback_url: Optional[str] = None
+    dedupe: bool = True
 
 class ProductFields(BaseModel):
     brand_name: Optional[str] = None
@@ -75,6 +79,20 @@ class TextProcessorRequest(BaseModel):
     text: str
     category: str
 
+# ============ Async Job Models ============
+class JobOptions(BaseModel):
+    priority: int = Field(default=0, ge=0, le=10)
+    callback_url: Optional[str] = None
+    dedupe: bool = True
+
+class TextJobRequest(JobOptions):
+    text: str
+    category: str
+
+class URLJobRequest(JobOptions):
+    url: str
+    category: str
+
 class ExportCSVRequest(BaseModel):
     products: List[Dict[str, Any]]
     prefer_p_tags: bool = True
@@ -6,8 +6,9 @@ import os
 import json
 import logging
 import asyncio
+import hashlib
 import re
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from openai import AsyncOpenAI, APIError, OpenAIError
 
 from ..config import (
@@ -17,6 +18,7 @@ from ..config import (
     ALLOWED_SPECS
 )
 from ..utils.sanitizers import strip_forbidden_phrases, sanitize_html
+from ..utils.cancellation import Cancelled, ShouldAbort, raise_if_cancelled, run_cancellable
 
 logger = logging.getLogger(__name__)
 
@@ -110,26 +112,60 @@ def initialize_client():
     return True
 
 
-async def generate(products: List[Dict[str, Any]], category: str) -> List[Dict[str, Any]]:
+def product_key(product: Dict[str, Any], category: str) -> str:
+    """Identify a product's generation input, to match it against checkpoints"""
+    payload = json.dumps([category, product], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def generate(
+    products: List[Dict[str, Any]],
+    category: str,
+    done: Optional[Dict[str, Dict[str, Any]]] = None,
+    on_generated: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    should_abort: ShouldAbort = None
+) -> List[Dict[str, Any]]:
     """
     Generate brand voice descriptions for products with retry logic
     Args:
         products: List of normalized product dicts
         category: Product category
+        done: Products finished by an earlier, interrupted run (product_key -> product);
+            these are reused instead of generated again
+        on_generated: Called with (product_key, product) as each product is generated,
+            to checkpoint it (runs in a thread; products that failed are not passed)
+        should_abort: Checked before each product and while its request is in flight
     Returns:
         List of products with enhanced descriptions
+    Raises:
+        Cancelled: should_abort() returned True (products generated so far stay checkpointed)
     """
     # Ensure client is initialized
     if client is None:
         initialize_client()
 
+    done = done or {}
     enhanced_products = []
+    reused = 0
 
     for idx, product in enumerate(products):
+        raise_if_cancelled(should_abort, "Brand voice")
+        key = product_key(product, category) if done or on_generated else None
+        if key in done:
+            enhanced_products.append(done[key])
+            reused += 1
+            continue
+
         try:
             logger.info(f"Processing product {idx + 1}/{len(products)}: {product.get('name', 'Unknown')}")
-            enhanced = await generate_single_product(product, category)
+            enhanced = await run_cancellable(
+                generate_single_product(product, category), should_abort, "Brand voice"
+            )
             enhanced_products.append(enhanced)
+            if on_generated:
+                await asyncio.to_thread(on_generated, key, enhanced)
+        except Cancelled:
+            raise
         except Exception as e:
             logger.error(f"Failed to process {product.get('name', 'Unknown')}: {e}")
             # Return product with error marker
@@ -141,6 +177,9 @@ async def generate(products: List[Dict[str, Any]], category: str) -> List[Dict[s
             product["_generation_error"] = str(e)
             enhanced_products.append(product)
 
+    if reused:
+        logger.info(f"Reused {reused}/{len(products)} products generated before the run was interrupted")
+
     return enhanced_products
 
 
@@ -0,0 +1,150 @@
+"""
+Docling Converter Registry
+Named pipeline profiles, each backed by its own warm DocumentConverter
+"""
+import time
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+
+from ..config import PDF_PIPELINE_PROFILES, DEFAULT_PDF_PROFILE, DOCLING_ARTIFACTS_PATH
+from ..utils.threads import thread_budget
+
+try:
+    from docling.datamodel.pipeline_options import AcceleratorOptions
+    HAS_ACCELERATOR_OPTIONS = True
+except ImportError:
+    HAS_ACCELERATOR_OPTIONS = False
+
+logger = logging.getLogger(__name__)
+
+# One converter per (profile, do_ocr) - building one loads the layout/table models
+_converters: Dict[Tuple[str, bool], DocumentConverter] = {}
+_lock = threading.Lock()
+
+
+def resolve_profile(profile: str = None) -> str:
+    """
+    Validate a profile name, falling back to the default
+    Args:
+        profile: Requested profile name (or None)
+    Returns:
+        Known profile name
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    name = (profile or DEFAULT_PDF_PROFILE).strip().lower()
+    if name not in PDF_PIPELINE_PROFILES:
+        raise ValueError(
+            f"Unknown pipeline profile '{profile}'. "
+            f"Choose one of: {', '.join(sorted(PDF_PIPELINE_PROFILES))}"
+        )
+    return name
+
+
+def build_pipeline_options(profile: str, do_ocr: bool = None) -> PdfPipelineOptions:
+    """
+    Build PdfPipelineOptions for a named profile
+    Args:
+        profile: Profile name
+        do_ocr: Override the profile's OCR setting (None keeps it)
+    Returns:
+        Configured PdfPipelineOptions
+    """
+    settings = PDF_PIPELINE_PROFILES[resolve_profile(profile)]
+
+    pipeline_options = PdfPipelineOptions()
+    if DOCLING_ARTIFACTS_PATH:
+        # Load models from the local bundle instead of the Hugging Face cache/network
+        pipeline_options.artifacts_path = DOCLING_ARTIFACTS_PATH
+    pipeline_options.do_ocr = settings["do_ocr"] if do_ocr is None else do_ocr
+    pipeline_options.do_table_structure = settings["do_table_structure"]
+    pipeline_options.table_structure_options.do_cell_matching = settings["do_cell_matching"]
+    pipeline_options.table_structure_options.mode = (
+        TableFormerMode.ACCURATE if settings["table_mode"] == "accurate" else TableFormerMode.FAST
+    )
+    pipeline_options.generate_page_images = settings["generate_images"]
+    pipeline_options.generate_picture_images = settings["generate_images"]
+
+    if HAS_ACCELERATOR_OPTIONS:
+        pipeline_options.accelerator_options = AcceleratorOptions(
+            num_threads=thread_budget()["threads_per_worker"]
+        )
+
+    return pipeline_options
+
+
+def get_converter(profile: str = None, do_ocr: bool = None) -> DocumentConverter:
+    """
+    Get the warm converter for a profile, creating it on first use
+    Args:
+        profile: Profile name (defaults to DEFAULT_PDF_PROFILE)
+        do_ocr: Override the profile's OCR setting (None keeps it)
+    Returns:
+        Shared DocumentConverter instance
+    """
+    name = resolve_profile(profile)
+    ocr = PDF_PIPELINE_PROFILES[name]["do_ocr"] if do_ocr is None else do_ocr
+    key = (name, ocr)
+
+    converter = _converters.get(key)
+    if converter is None:
+        with _lock:
+            converter = _converters.get(key)
+            if converter is None:
+                logger.info(f"Creating Docling converter for profile '{name}' (ocr={ocr})")
+                converter = DocumentConverter(
+                    format_options={
+                        InputFormat.PDF: PdfFormatOption(
+                            pipeline_options=build_pipeline_options(name, do_ocr=ocr)
+                        )
+                    }
+                )
+                _converters[key] = converter
+    return converter
+
+
+def preload(profiles: List[str] = None) -> Dict[str, float]:
+    """
+    Create converters and load their pipeline models up front
+    Args:
+        profiles: Profile names (defaults to DEFAULT_PDF_PROFILE); OCR profiles
+            also get their text-layer (no OCR) converter
+    Returns:
+        Seconds spent loading each converter, keyed "profile" or "profile+ocr"
+    """
+    timings = {}
+    for name in profiles or [DEFAULT_PDF_PROFILE]:
+        name = resolve_profile(name)
+        for ocr in sorted({False, PDF_PIPELINE_PROFILES[name]["do_ocr"]}):
+            start = time.perf_counter()
+            get_converter(name, do_ocr=ocr).initialize_pipeline(InputFormat.PDF)
+            key = f"{name}+ocr" if ocr else name
+            timings[key] = round(time.perf_counter() - start, 2)
+            logger.info(f"Preloaded Docling converter '{key}' in {timings[key]}s")
+    return timings
+
+
+# DOCX/PPTX/HTML need no models, so one converter serves all of them
+_document_converter: DocumentConverter = None
+
+
+def get_document_converter() -> DocumentConverter:
+    """
+    Get the shared converter for Word, PowerPoint and HTML documents
+    Returns:
+        DocumentConverter restricted to DOCX, PPTX and HTML
+    """
+    global _document_converter
+    if _document_converter is None:
+        with _lock:
+            if _document_converter is None:
+                logger.info("Creating Docling converter for DOCX/PPTX/HTML")
+                _document_converter = DocumentConverter(
+                    allowed_formats=[InputFormat.DOCX, InputFormat.PPTX, InputFormat.HTML]
+                )
+    return _document_converter
@@ -0,0 +1,127 @@
+"""
+Document Processor Service
+Uses Docling to extract products from Word spec sheets, PowerPoint range
+decks and HTML pages, through the same worker pool and product extraction
+as PDFs
+"""
+import io
+import os
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any
+
+from docling.datamodel.base_models import DocumentStream
+
+from ..config import DOCUMENT_FORMATS, PDF_RUN_TIMEOUT_SEC
+from ..utils import memory
+from . import docling_converters
+from . import worker_pool
+from .pdf_processor import table_grids, extract_products
+
+logger = logging.getLogger(__name__)
+
+
+def document_format(filename: str) -> str:
+    """
+    Format key for a filename
+    Args:
+        filename: Uploaded file name
+    Returns:
+        "docx", "pptx" or "html"
+    Raises:
+        ValueError: If the extension is not supported
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in DOCUMENT_FORMATS:
+        raise ValueError(
+            f"Unsupported document type '{extension or filename}'. "
+            f"Choose one of: {', '.join(sorted(DOCUMENT_FORMATS))}"
+        )
+    return DOCUMENT_FORMATS[extension]
+
+
+def convert_document(file_content: bytes, filename: str) -> Dict[str, Any]:
+    """
+    Convert a DOCX/PPTX/HTML document (runs inside a pool worker, sampling its RSS there)
+    Args:
+        file_content: Document bytes
+        filename: File name (Docling picks the backend from the extension)
+    Returns:
+        Dict with markdown, tables (cell text grids), pages_processed, format,
+        peak_rss_mb and rss_growth_mb
+    """
+    with memory.PeakRSSSampler() as sampler:
+        converter = docling_converters.get_document_converter()
+        result = converter.convert(DocumentStream(name=filename, stream=io.BytesIO(file_content)))
+        document = result.document
+
+        conversion = {
+            "markdown": document.export_to_markdown(),
+            "tables": table_grids(document),
+            # Slides for PPTX; DOCX/HTML have no page layout
+            "pages_processed": len(document.pages) or 1,
+            "format": document_format(filename)
+        }
+
+    conversion["peak_rss_mb"] = sampler.peak_mb
+    conversion["rss_growth_mb"] = sampler.growth_mb
+    return conversion
+
+
+async def process(file_content: bytes, filename: str, category: str) -> List[Dict[str, Any]]:
+    """
+    Extract products from a DOCX/PPTX/HTML document
+
+    Args:
+        file_content: Document bytes
+        filename: Original file name
+        category: Product category
+
+    Returns:
+        List of product dicts
+    """
+    extraction = await process_content(file_content, filename, category)
+    return extraction["products"]
+
+
+async def process_content(
+    file_content: bytes,
+    filename: str,
+    category: str,
+    run_timeout: float = None
+) -> Dict[str, Any]:
+    """
+    Extract products from a DOCX/PPTX/HTML document, keeping the conversion details
+
+    Args:
+        file_content: Document bytes
+        filename: Original file name
+        category: Product category
+        run_timeout: Seconds allowed for the conversion (defaults to PDF_RUN_TIMEOUT_SEC)
+
+    Returns:
+        Dict with products, pages_processed, format, markdown_chars, convert_ms and peak_rss_mb
+    """
+    source_format = document_format(filename)
+    logger.info(f"Processing {source_format.upper()} {filename} ({len(file_content)} bytes)")
+
+    kwargs = {"file_content": file_content, "filename": filename}
+    pool = worker_pool.get_pool("conversion")
+
+    convert_start = time.perf_counter()
+    if pool:
+        conversion = await asyncio.to_thread(
+            pool.run, convert_document, kwargs, run_timeout or PDF_RUN_TIMEOUT_SEC
+        )
+    else:
+        conversion = await asyncio.to_thread(convert_document, **kwargs)
+    conversion["convert_ms"] = round((time.perf_counter() - convert_start) * 1000, 1)
+    products = extract_products(conversion, category)
+
+    memory.record_conversion(conversion["peak_rss_mb"], conversion.pop("rss_growth_mb"))
+
+    conversion["markdown_chars"] = len(conversion.pop("markdown"))
+    del conversion["tables"]
+    conversion["products"] = products
+    return conversion
@@ -2,161 +2,760 @@
 PDF Processor Service
 Uses Docling to extract products from PDF catalogues
 """
+import gc
+import io
 import os
+import json
 import re
+import time
+import shutil
+import asyncio
 import logging
 import tempfile
-from typing import List, Dict, Any
-from docling.document_converter import DocumentConverter
+from typing import List, Dict, Any, Union
+from docling.datamodel.base_models import DocumentStream
+
+from ..config import (
+    PDF_PIPELINE_PROFILES,
+    PDF_STREAM_MAX_BYTES,
+    PDF_SPOOL_DIR,
+    PDF_MAX_PAGES_PER_RUN,
+    PDF_RUN_TIMEOUT_SEC,
+    TABLE_HEADER_KEYWORDS
+)
+from ..utils.keyword_matcher import get_matcher
+from ..utils import memory
+from ..utils.downloads import fetch_source
+from ..utils.cancellation import ShouldAbort, raise_if_cancelled
+from . import text_layer
+from . import docling_converters
+from . import worker_pool
 
 logger = logging.getLogger(__name__)
 
-# Initialize converter once (singleton pattern for performance)
-_converter = None
 
-def get_converter():
-    global _converter
-    if _converter is None:
-        _converter = DocumentConverter()
-    return _converter
+def _docling_source(source: Union[bytes, str]) -> Union[DocumentStream, str]:
+    """Wrap in-memory PDFs in a fresh DocumentStream (each convert consumes it)"""
+    if isinstance(source, (bytes, bytearray)):
+        return DocumentStream(name="document.pdf", stream=io.BytesIO(source))
+    return source
+
+
+def convert_run(
+    source: Union[bytes, str],
+    profile: str,
+    do_ocr: bool,
+    page_range: tuple = None,
+    json_part_path: str = None
+) -> Dict[str, Any]:
+    """
+    Convert one page run and take its exports (runs inside a pool worker)
+
+    Markdown is exported page by page and the Docling document is released
+    before returning, so only plain exports cross the process boundary.
+    RSS is sampled here, in the process doing the work, so the reported
+    peak is this run's and not the API process's.
+
+    Args:
+        source: PDF bytes or path on disk
+        profile: Pipeline profile name
+        do_ocr: Run OCR on this run
+        page_range: (start, end) pages, 1-based and inclusive (None for all pages)
+        json_part_path: Write this run's document JSON here
+    Returns:
+        Dict with markdown_pages, tables (cell text grids), page_count,
+        peak_rss_mb and rss_growth_mb
+    """
+    with memory.PeakRSSSampler() as sampler:
+        converter = docling_converters.get_converter(profile, do_ocr=do_ocr)
+        if page_range:
+            result = converter.convert(_docling_source(source), page_range=tuple(page_range))
+        else:
+            result = converter.convert(_docling_source(source))
+        document = result.document
+
+        markdown_pages = []
+        for page_no in sorted(document.pages) or [None]:
+            page_markdown = document.export_to_markdown(page_no=page_no)
+            if page_markdown:
+                markdown_pages.append(page_markdown)
+
+        exports = {
+            "markdown_pages": markdown_pages,
+            "tables": table_grids(document),
+            "page_count": len(document.pages)
+        }
+
+        if json_part_path:
+            with open(json_part_path, "w", encoding="utf-8") as f:
+                json.dump({"page_range": page_range, "document": document.export_to_dict()}, f)
+
+        # Drop the page images and layout of this run before the next one
+        del result, document
+        gc.collect()
+
+    exports["peak_rss_mb"] = sampler.peak_mb
+    exports["rss_growth_mb"] = sampler.growth_mb
+    return exports
+
+
+class _DocumentExporter:
+    """
+    Collects exports from each page run as it finishes
+
+    Markdown is appended to markdown_path when given; run JSON parts are
+    copied into json_path one at a time so no full-catalogue dict is ever
+    held in memory.
+    """
+
+    def __init__(self, markdown_path: str = None, json_path: str = None):
+        self.markdown_parts: List[str] = []
+        self.tables: List[List[List[str]]] = []
+        self._markdown_file = open(markdown_path, "w", encoding="utf-8") if markdown_path else None
+        self._json_file = open(json_path, "w", encoding="utf-8") if json_path else None
+        self._runs_written = 0
+        if self._json_file:
+            self._json_file.write('{"runs": [')
+
+    def add(self, exports: Dict[str, Any], json_part_path: str = None):
+        """Take the exports of one convert_run"""
+        for page_markdown in exports["markdown_pages"]:
+            self.markdown_parts.append(page_markdown)
+            if self._markdown_file:
+                self._markdown_file.write(page_markdown + "\n\n")
+
+        self.tables.extend(exports["tables"])
+
+        if self._json_file and json_part_path:
+            if self._runs_written:
+                self._json_file.write(", ")
+            with open(json_part_path, encoding="utf-8") as part:
+                shutil.copyfileobj(part, self._json_file)
+            self._runs_written += 1
+
+    def close(self):
+        if self._json_file:
+            self._json_file.write("]}")
+            self._json_file.close()
+        if self._markdown_file:
+            self._markdown_file.close()
+
 
-async def process(file_content: bytes, category: str) -> List[Dict[str, Any]]:
+def convert_pdf(
+    source: Union[bytes, str],
+    force_full_ocr: bool = False,
+    profile: str = None,
+    markdown_path: str = None,
+    json_path: str = None,
+    batch_size: int = None,
+    run_timeout: float = None,
+    should_abort: ShouldAbort = None
+) -> Dict[str, Any]:
+    """
+    Convert a PDF to markdown, only running OCR on pages without a text layer
+
+    Pages are converted in runs of at most batch_size pages, each on the
+    conversion worker pool with a deadline. A run that misses its deadline
+    (or kills its worker) is skipped and recorded; the other runs are kept.
+
+    Args:
+        source: PDF bytes or path on disk (pass a path when converting on the
+            pool: bytes are copied to the worker for every run; process_content
+            spools them first)
+        force_full_ocr: OCR every page regardless of text layer
+        profile: Pipeline profile name (defaults to DEFAULT_PDF_PROFILE)
+        markdown_path: Also write the markdown to this file
+        json_path: Stream the Docling document JSON to this file
+        batch_size: Pages per run (defaults to PDF_MAX_PAGES_PER_RUN)
+        run_timeout: Seconds allowed per run (defaults to PDF_RUN_TIMEOUT_SEC)
+        should_abort: Checked before and during each run; True kills the
+            current run and skips the rest
+    Returns:
+        Dict with markdown, tables (cell text grids), pages_processed, ocr_pages,
+        timed_out_pages, crashed_pages, profile, and the largest peak_rss_mb and
+        rss_growth_mb of any run
+    Raises:
+        WorkerTimeout: Every run timed out or crashed
+        Cancelled: should_abort() returned True
+    """
+    profile = docling_converters.resolve_profile(profile)
+    profile_ocr = force_full_ocr or PDF_PIPELINE_PROFILES[profile]["do_ocr"]
+    run_timeout = run_timeout or PDF_RUN_TIMEOUT_SEC
+
+    try:
+        pages = text_layer.scan_pages(source)
+    except Exception as e:
+        logger.warning(f"Text layer scan failed, using full pipeline: {e}")
+        pages = []
+
+    if pages:
+        runs = [
+            ((start, end), needs_ocr and profile_ocr)
+            for start, end, needs_ocr in text_layer.plan_page_runs(
+                pages, force_full_ocr, batch_size or PDF_MAX_PAGES_PER_RUN
+            )
+        ]
+    else:
+        runs = [(None, profile_ocr)]
+
+    pool = worker_pool.get_pool("conversion")
+    exporter = _DocumentExporter(markdown_path, json_path)
+    pages_processed = len(pages)
+    ocr_pages = 0
+    timed_out_pages: List[int] = []
+    crashed_pages: List[int] = []
+    peak_rss_mb = rss_growth_mb = 0.0
+
+    try:
+        for index, (page_range, do_ocr) in enumerate(runs):
+            label = f"pages {page_range[0]}-{page_range[1]}" if page_range else "all pages"
+            raise_if_cancelled(should_abort, f"Conversion before {label}")
+            logger.info(f"Converting {label} with '{profile}' ({'OCR' if do_ocr else 'text layer'})")
+            json_part_path = f"{json_path}.{index}.part" if json_path else None
+            task = {
+                "source": source,
+                "profile": profile,
+                "do_ocr": do_ocr,
+                "page_range": page_range,
+                "json_part_path": json_part_path
+            }
+
+            try:
+                exports = pool.run(convert_run, task, run_timeout, should_abort) if pool else convert_run(**task)
+            except (worker_pool.WorkerTimeout, worker_pool.WorkerCrashed) as e:
+                if not page_range:
+                    raise
+                logger.warning(f"Skipping {label}: {e}")
+                skipped = range(page_range[0], page_range[1] + 1)
+                if isinstance(e, worker_pool.WorkerTimeout):
+                    timed_out_pages.extend(skipped)
+                else:
+                    crashed_pages.extend(skipped)
+                continue
+
+            try:
+                exporter.add(exports, json_part_path)
+            finally:
+                if json_part_path and os.path.exists(json_part_path):
+                    os.unlink(json_part_path)
+
+            peak_rss_mb = max(peak_rss_mb, exports["peak_rss_mb"])
+            rss_growth_mb = max(rss_growth_mb, exports["rss_growth_mb"])
+            run_pages = page_range[1] - page_range[0] + 1 if page_range else exports["page_count"]
+            if not page_range:
+                pages_processed = run_pages
+            if do_ocr:
+                ocr_pages += run_pages
+    finally:
+        exporter.close()
+
+    if pages and len(timed_out_pages) + len(crashed_pages) == len(pages):
+        raise worker_pool.WorkerTimeout(f"All {len(pages)} pages failed to convert in time")
+
+    return {
+        "markdown": "\n\n".join(exporter.markdown_parts),
+        "tables": exporter.tables,
+        "pages_processed": pages_processed,
+        "ocr_pages": ocr_pages,
+        "timed_out_pages": timed_out_pages,
+        "crashed_pages": crashed_pages,
+        "profile": profile,
+        "peak_rss_mb": peak_rss_mb,
+        "rss_growth_mb": rss_growth_mb
+    }
+
+
+async def process(
+    file_content: bytes,
+    category: str,
+    force_full_ocr: bool = False,
+    profile: str = None
+) -> List[Dict[str, Any]]:
     """
     Extract products from PDF using Docling
-    
+
     Args:
         file_content: PDF file bytes
         category: Product category
-    
+        force_full_ocr: OCR every page regardless of text layer
+        profile: Pipeline profile name (fast, balanced, accurate)
+
     Returns:
         List of product dicts
     """
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(file_content)
-        tmp_path = tmp.name
-    
+    extraction = await process_content(file_content, category, force_full_ocr, profile)
+    return extraction["products"]
+
+
+async def process_content(
+    file_content: bytes,
+    category: str,
+    force_full_ocr: bool = False,
+    profile: str = None,
+    markdown_path: str = None,
+    json_path: str = None,
+    batch_size: int = None,
+    run_timeout: float = None,
+    should_abort: ShouldAbort = None
+) -> Dict[str, Any]:
+    """
+    Extract products from PDF bytes, keeping the conversion details
+
+    Only in-process conversion (PDF_WORKER_PROCESSES=0) hands small PDFs to
+    Docling straight from memory. Anything above PDF_STREAM_MAX_BYTES, and
+    every PDF converted on the worker pool (the default), is spooled to
+    PDF_SPOOL_DIR (tmpfs when available), so each page run reads the file
+    instead of receiving another copy. staging and staging_ms report what
+    was done.
+
+    Args:
+        file_content: PDF file bytes
+        category: Product category
+        force_full_ocr: OCR every page regardless of text layer
+        profile: Pipeline profile name (fast, balanced, accurate)
+        markdown_path: Also write the markdown to this file
+        json_path: Stream the Docling document JSON to this file
+        batch_size: Pages per conversion run
+        run_timeout: Seconds allowed per conversion run
+        should_abort: Cancellation check (see convert_pdf)
+
+    Returns:
+        Dict with products plus the conversion details from process_source
+    """
+    # Looked up before timing: the first call starts the pool
+    pooled = worker_pool.get_pool("conversion") is not None
+    staging_start = time.perf_counter()
+    spool_path = None
+
+    if len(file_content) <= PDF_STREAM_MAX_BYTES and not pooled:
+        source = file_content
+        staging = "memory"
+    else:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", dir=PDF_SPOOL_DIR) as tmp:
+            tmp.write(file_content)
+            spool_path = tmp.name
+        source = spool_path
+        staging = "spool"
+
+    staging_ms = round((time.perf_counter() - staging_start) * 1000, 1)
+    logger.info(f"Staged {len(file_content)} byte PDF via {staging} in {staging_ms}ms")
+
     try:
-        logger.info(f"Processing PDF: {tmp_path}")
-        
-        converter = get_converter()
-        result = converter.convert(tmp_path)
-        markdown = result.document.export_to_markdown()
-        
-        logger.info(f"Extracted {len(markdown)} chars of markdown")
-        
-        # Parse markdown to find individual products
-        products = extract_products_from_markdown(markdown, category)
-        
-        if not products:
-            # Fallback: return whole document as one product
-            logger.warning("No individual products found, returning as single product")
-            products = [{
-                "name": "Product from PDF",
-                "brand": "",
-                "sku": "",
-                "category": category,
-                "rawExtractedContent": markdown[:5000],
-                "features": extract_features(markdown),
-                "specifications": extract_specifications(markdown),
-                "descriptions": {
-                    "shortDescription": "",
-                    "metaDescription": "",
-                    "longDescription": ""
-                }
-            }]
-        
-        logger.info(f"Extracted {len(products)} products from PDF")
-        return products
-        
+        extraction = await process_source(
+            source, category, force_full_ocr, profile, markdown_path, json_path, batch_size, run_timeout,
+            should_abort
+        )
     finally:
-        os.unlink(tmp_path)
+        if spool_path:
+            os.unlink(spool_path)
+
+    extraction["staging"] = staging
+    extraction["staging_ms"] = staging_ms
+    return extraction
+
+
+async def process_url(
+    file_url: str,
+    category: str,
+    force_full_ocr: bool = False,
+    profile: str = None,
+    batch_size: int = None,
+    run_timeout: float = None
+) -> Dict[str, Any]:
+    """
+    Download a PDF and extract products from it
+
+    Args:
+        file_url: PDF URL
+        category: Product category
+        force_full_ocr: OCR every page regardless of text layer
+        profile: Pipeline profile name (fast, balanced, accurate)
+        batch_size: Pages per conversion run
+        run_timeout: Seconds allowed per conversion run
+
+    Returns:
+        Dict with products plus the conversion details and download_ms
+    """
+    download_start = time.perf_counter()
+    downloaded = await fetch_source(file_url)
+    download_ms = round((time.perf_counter() - download_start) * 1000, 1)
+
+    if isinstance(downloaded, str):
+        try:
+            extraction = await process_source(
+                downloaded, category, force_full_ocr, profile, batch_size=batch_size, run_timeout=run_timeout
+            )
+        finally:
+            os.unlink(downloaded)
+        extraction["staging"] = "spool"
+    else:
+        extraction = await process_content(
+            downloaded, category, force_full_ocr, profile, batch_size=batch_size, run_timeout=run_timeout
+        )
+
+    extraction["download_ms"] = download_ms
+    return extraction
+
+
+async def process_source(
+    source: Union[bytes, str],
+    category: str,
+    force_full_ocr: bool = False,
+    profile: str = None,
+    markdown_path: str = None,
+    json_path: str = None,
+    batch_size: int = None,
+    run_timeout: float = None,
+    should_abort: ShouldAbort = None
+) -> Dict[str, Any]:
+    """
+    Extract products from PDF bytes or a PDF already on disk
+
+    The markdown and table grids are dropped once products are extracted;
+    pass markdown_path/json_path to keep the exports on disk instead.
+
+    Args:
+        source: PDF bytes or path on disk
+        category: Product category
+        force_full_ocr: OCR every page regardless of text layer
+        profile: Pipeline profile name (fast, balanced, accurate)
+        markdown_path: Also write the markdown to this file
+        json_path: Stream the Docling document JSON to this file
+        batch_size: Pages per conversion run
+        run_timeout: Seconds allowed per conversion run
+        should_abort: Cancellation check (see convert_pdf)
+
+    Returns:
+        Dict with products, pages_processed, ocr_pages, timed_out_pages, crashed_pages,
+        profile, markdown_chars, convert_ms and peak_rss_mb
+    """
+    if isinstance(source, str):
+        logger.info(f"Processing PDF: {source}")
+    else:
+        logger.info(f"Processing PDF from memory ({len(source)} bytes)")
+
+    convert_start = time.perf_counter()
+    conversion = await asyncio.to_thread(
+        convert_pdf, source, force_full_ocr, profile, markdown_path, json_path, batch_size, run_timeout,
+        should_abort
+    )
+    conversion["convert_ms"] = round((time.perf_counter() - convert_start) * 1000, 1)
+    products = extract_products(conversion, category)
+
+    growth_mb = conversion.pop("rss_growth_mb")
+    memory.record_conversion(conversion["peak_rss_mb"], growth_mb)
+    logger.info(f"Conversion peak RSS {conversion['peak_rss_mb']}MB (+{growth_mb}MB)")
+
+    conversion["markdown_chars"] = len(conversion.pop("markdown"))
+    del conversion["tables"]
+    conversion["products"] = products
+    return conversion
+
+
+def extract_products(conversion: Dict[str, Any], category: str) -> List[Dict[str, Any]]:
+    """Products from a convert_pdf / convert_document result (tables first, then markdown)"""
+    markdown = conversion["markdown"]
+    source_format = conversion.get("format", "pdf")
+
+    logger.info(
+        f"Extracted {len(markdown)} chars of markdown from {conversion['pages_processed']} pages "
+        f"({conversion.get('ocr_pages', 0)} OCR, {source_format})"
+    )
+
+    # Price lists: read Docling's table grids first, then fill in from the markdown
+    table_products = extract_products_from_tables(conversion["tables"], category)
+    products = merge_products(table_products, extract_products_from_markdown(markdown, category))
+
+    if not products:
+        # Fallback: return whole document as one product
+        logger.warning("No individual products found, returning as single product")
+        products = [{
+            "name": f"Product from {source_format.upper()}",
+            "brand": "",
+            "sku": "",
+            "category": category,
+            "rawExtractedContent": markdown[:MAX_BLOCK_CHARS],
+            "features": extract_features(markdown),
+            "specifications": extract_specifications(markdown),
+            "descriptions": {
+                "shortDescription": "",
+                "metaDescription": "",
+                "longDescription": ""
+            }
+        }]
+
+    logger.info(f"Extracted {len(products)} products from {source_format.upper()} ({len(table_products)} from tables)")
+    return products
+
+
+def preview_products(file_content: bytes, category: str) -> List[Dict[str, Any]]:
+    """
+    Quick product preview from the raw PDF text layer (no Docling models)
+
+    Args:
+        file_content: PDF file bytes
+        category: Product category
+
+    Returns:
+        List of preview product dicts (empty for scanned PDFs)
+    """
+    text = text_layer.extract_text(file_content)
+    products = extract_products_from_markdown(text, category)
+    for product in products:
+        product["source"] = "preview"
+    logger.info(f"Preview found {len(products)} products in {len(text)} chars of text layer")
+    return products
+
+
+# SKU codes (typically 8-15 alphanumeric chars)
+SKU_PATTERN = r'\b[A-Z]{2,4}[0-9]{3,}[A-Z0-9]{2,}\b'
+
+# Product names (headings with a product type)
+PRODUCT_NAME_PATTERN = re.compile(
+    r'(?:Machine|Maker|Cooker|Blender|Mixer|Kettle|Toaster|Iron|Fryer|Oven|Grill|Pan|Pot|Set)',
+    re.IGNORECASE
+)
+
+# One scan finds both markdown headings and SKU codes
+ANCHOR_PATTERN = re.compile(
+    rf'(?P<heading>^#+[ \t]*(?P<title>[^\n]+)$)|(?P<sku>{SKU_PATTERN})',
+    re.MULTILINE
+)
+SKU_RE = re.compile(SKU_PATTERN)
+
+# Upper bound on text kept per product block (the final block runs to end of document)
+MAX_BLOCK_CHARS = 5000
 
 
 def extract_products_from_markdown(markdown: str, category: str) -> List[Dict[str, Any]]:
     """
-    Parse markdown to identify individual products
-    
-    Looks for patterns like:
-    - SKU codes (e.g., SES882BSS4GUK1)
-    - Product headers
-    - Product tables
+    Parse markdown to identify individual products in a single pass
+
+    Indexes every heading and SKU position, cuts the markdown into
+    non-overlapping product blocks and extracts fields per block:
+    - SKU codes (e.g., SES882BSS4GUK1) anchor a block at the closest preceding
+      heading (or the SKU's own line when another product sits in between)
+    - Further SKUs on the same line (variants in one table row) start at the
+      SKU itself; the block before them still runs to the end of that row
+    - Without SKUs, product-type headings anchor the blocks
     """
+    headings = []      # (line_start, title)
+    sku_anchors = []   # (block_start, sku) for the first occurrence of each SKU
+    shared_lines = set()  # block starts of SKUs sharing the previous SKU's line
+    seen_skus = set()
+    previous_line = -1
+
+    for match in ANCHOR_PATTERN.finditer(markdown):
+        if match.group('heading'):
+            headings.append((match.start(), match.group('title').strip()))
+            title_start = match.start('title')
+            skus = [(m.group(), title_start + m.start()) for m in SKU_RE.finditer(match.group('title'))]
+        else:
+            skus = [(match.group('sku'), match.start())]
+
+        for sku, sku_pos in skus:
+            if sku in seen_skus:
+                continue
+            seen_skus.add(sku)
+
+            line_start = markdown.rfind('\n', 0, sku_pos) + 1
+            previous_anchor = sku_anchors[-1][0] if sku_anchors else -1
+            if line_start == previous_line:
+                # Several SKUs on one line (e.g. a table row listing variants)
+                block_start = sku_pos
+                shared_lines.add(block_start)
+            elif headings and previous_anchor < headings[-1][0] <= line_start:
+                # Claim the closest heading not already inside an earlier product
+                block_start = headings[-1][0]
+            else:
+                block_start = line_start
+            sku_anchors.append((block_start, sku))
+            previous_line = line_start
+
+    if sku_anchors:
+        logger.info(f"Found {len(sku_anchors)} SKU codes")
+        anchors = sku_anchors
+    else:
+        anchors = [(pos, None) for pos, title in headings if PRODUCT_NAME_PATTERN.search(title)]
+        if anchors:
+            logger.info(f"Found {len(anchors)} product names")
+
     products = []
-    
-    # Pattern 1: Find SKU codes (typically 8-15 alphanumeric chars)
-    sku_pattern = r'\b([A-Z]{2,4}[0-9]{3,}[A-Z0-9]{2,})\b'
-    skus_found = list(set(re.findall(sku_pattern, markdown)))
-    
-    # Pattern 2: Find product names (lines with brand + product type)
-    product_name_pattern = r'^#+\s*(.+(?:Machine|Maker|Cooker|Blender|Mixer|Kettle|Toaster|Iron|Fryer|Oven|Grill|Pan|Pot|Set).*)$'
-    names_found = re.findall(product_name_pattern, markdown, re.MULTILINE | re.IGNORECASE)
-    
-    # Pattern 3: Look for table rows with product data
-    table_row_pattern = r'\|([^|]+)\|([^|]+)\|([^|]*)\|'
-    table_matches = re.findall(table_row_pattern, markdown)
-    
-    # If we found SKUs, create products for each
-    if skus_found:
-        logger.info(f"Found {len(skus_found)} SKU codes")
-        
-        for sku in skus_found[:20]:  # Limit to 20 products
-            # Try to find context around this SKU
-            context = extract_context_around(markdown, sku, chars=500)
-            name = extract_product_name(context) or f"Product {sku}"
-            brand = extract_brand(context)
-            
-            products.append({
-                "name": name,
-                "brand": brand,
+    for index, (block_start, sku) in enumerate(anchors):
+        block_end = anchors[index + 1][0] if index + 1 < len(anchors) else len(markdown)
+        if block_end in shared_lines:
+            # The next SKU shares this product's row; keep the whole row
+            line_end = markdown.find('\n', block_end)
+            block_end = len(markdown) if line_end == -1 else line_end + 1
+        block = markdown[block_start:min(block_end, block_start + MAX_BLOCK_CHARS)]
+
+        if sku:
+            name = extract_product_name(block) or f"Product {sku}"
+        else:
+            name = block.split('\n', 1)[0].lstrip('#').strip()
+
+        products.append({
+            "name": name,
+            "brand": extract_brand(block),
+            "sku": sku or "",
+            "category": category,
+            "rawExtractedContent": block,
+            "features": extract_features(block),
+            "specifications": extract_specifications(block),
+            "descriptions": {
+                "shortDescription": "",
+                "metaDescription": "",
+                "longDescription": ""
+            }
+        })
+
+    return products
+
+
+# Header keyword patterns, in field priority order
+HEADER_PATTERNS = [
+    (field, [re.compile(rf'\b{re.escape(keyword)}\b') for keyword in keywords])
+    for field, keywords in TABLE_HEADER_KEYWORDS.items()
+]
+
+
+def table_grids(document) -> List[List[List[str]]]:
+    """
+    Read Docling's structured tables as plain cell-text grids
+    Args:
+        document: DoclingDocument
+    Returns:
+        One grid (rows of cell strings) per table
+    """
+    grids = []
+    for table in document.tables:
+        grid = [[(cell.text or "").strip() for cell in row] for row in table.data.grid]
+        if grid:
+            grids.append(grid)
+    return grids
+
+
+def detect_header(grid: List[List[str]]) -> tuple:
+    """
+    Find the header row of a table and map its columns to product fields
+    Args:
+        grid: Table cell-text grid
+    Returns:
+        (header_row_index, {field: column_index}), or (None, {}) if not a product table
+    """
+    best_row, best_columns = None, {}
+
+    for row_index, row in enumerate(grid[:3]):
+        columns = {}
+        for col_index, cell in enumerate(row):
+            cell_lower = " ".join(cell.lower().split())
+            if not cell_lower or len(cell_lower) > 40:
+                continue
+            for field, patterns in HEADER_PATTERNS:
+                if field not in columns and any(p.search(cell_lower) for p in patterns):
+                    columns[field] = col_index
+                    break
+        if len(columns) > len(best_columns):
+            best_row, best_columns = row_index, columns
+
+    has_identifier = any(f in best_columns for f in ("sku", "barcode", "name"))
+    if not has_identifier or len(best_columns) < 2:
+        return None, {}
+    return best_row, best_columns
+
+
+def extract_products_from_tables(grids: List[List[List[str]]], category: str) -> List[Dict[str, Any]]:
+    """
+    Emit one product per data row of every product table
+    Args:
+        grids: Cell-text grids from table_grids
+        category: Product category
+    Returns:
+        List of product dicts
+    """
+    products = []
+
+    for grid in grids:
+        header_row, columns = detect_header(grid)
+        if header_row is None:
+            continue
+        header = grid[header_row]
+
+        for row in grid[header_row + 1:]:
+            # Skip blank rows and headers repeated across page breaks
+            if not any(row) or row == header:
+                continue
+
+            def cell(field: str) -> str:
+                index = columns.get(field)
+                return row[index] if index is not None and index < len(row) else ""
+
+            sku = cell("sku")
+            name = cell("name")
+            if not sku and not name:
+                continue
+
+            row_text = " | ".join(c for c in row if c)
+            specs = {}
+            if cell("dimensions"):
+                specs["dimensions"] = cell("dimensions")
+            if cell("weight"):
+                specs["weight"] = cell("weight")
+            if cell("capacity"):
+                specs["capacity"] = cell("capacity")
+            power_match = re.search(r'(\d{2,5})', cell("powerW").replace(",", ""))
+            if power_match:
+                specs["powerW"] = int(power_match.group(1))
+
+            product = {
+                "name": name or f"Product {sku}",
+                "brand": cell("brand") or extract_brand(row_text),
                 "sku": sku,
+                "barcode": cell("barcode"),
                 "category": category,
-                "rawExtractedContent": context,
-                "features": extract_features(context),
-                "specifications": extract_specifications(context),
-                "descriptions": {
-                    "shortDescription": "",
-                    "metaDescription": "",
-                    "longDescription": ""
-                }
-            })
-    
-    # If we found product names but no SKUs
-    elif names_found:
-        logger.info(f"Found {len(names_found)} product names")
-        
-        for name in names_found[:20]:
-            name = name.strip()
-            context = extract_context_around(markdown, name, chars=500)
-            
-            products.append({
-                "name": name,
-                "brand": extract_brand(context),
-                "sku": "",
-                "category": category,
-                "rawExtractedContent": context,
-                "features": extract_features(context),
-                "specifications": extract_specifications(context),
+                "rawExtractedContent": row_text,
+                "features": [],
+                "specifications": specs,
                 "descriptions": {
                     "shortDescription": "",
                     "metaDescription": "",
                     "longDescription": ""
                 }
-            })
-    
+            }
+            if cell("price"):
+                product["price"] = cell("price")
+            products.append(product)
+
     return products
 
 
-def extract_context_around(text: str, search_term: str, chars: int = 500) -> str:
-    """Extract text around a search term"""
-    idx = text.find(search_term)
-    if idx == -1:
-        return ""
-    
-    start = max(0, idx - chars // 2)
-    end = min(len(text), idx + len(search_term) + chars // 2)
-    
-    return text[start:end]
+def merge_products(table_products: List[Dict[str, Any]], text_products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Combine table rows with markdown-segmented products
+    Table rows win; a markdown product with the same SKU only fills in
+    missing brand, features and specifications.
+    Args:
+        table_products: Products from extract_products_from_tables
+        text_products: Products from extract_products_from_markdown
+    Returns:
+        Merged product list
+    """
+    by_sku = {p["sku"]: p for p in table_products if p["sku"]}
+    merged = list(table_products)
+
+    for product in text_products:
+        existing = by_sku.get(product["sku"]) if product["sku"] else None
+        if existing is None:
+            merged.append(product)
+            continue
+        if not existing["brand"]:
+            existing["brand"] = product["brand"]
+        if not existing["features"]:
+            existing["features"] = product["features"]
+        for key, value in product["specifications"].items():
+            existing["specifications"].setdefault(key, value)
+
+    return merged
 
 
 def extract_product_name(context: str) -> str:
@@ -179,21 +778,8 @@ def extract_product_name(context: str) -> str:
 
 
 def extract_brand(context: str) -> str:
-    """Try to extract brand from context"""
-    # Common appliance brands
-    brands = [
-        "Sage", "Breville", "KitchenAid", "Kenwood", "Smeg", "Dualit",
-        "Cuisinart", "Magimix", "Russell Hobbs", "Morphy Richards",
-        "De'Longhi", "Nespresso", "Bosch", "Siemens", "Miele",
-        "Le Creuset", "Tramontina", "Zwilling", "Wusthof", "CASO"
-    ]
-    
-    context_lower = context.lower()
-    for brand in brands:
-        if brand.lower() in context_lower:
-            return brand
-    
-    return ""
+    """Try to extract brand from context (earliest dictionary brand)"""
+    return get_matcher().first(context, "brand")
 
 
 def extract_features(context: str) -> List[str]:
@@ -236,110 +822,9 @@ def extract_specifications(context: str) -> Dict[str, Any]:
     if capacity_match:
         specs["capacity"] = f"{capacity_match.group(1)}L"
     
-    return specs
-EOF
-
-# Add import to services __init__.py
-echo "from . import pdf_processor" >> /opt/app/docling-service/app/services/__init__.py
-
-# Update main.py to use the new service
-python3 << 'PYEOF'
-import re
-
-with open('/opt/app/docling-service/app/main.py', 'r') as f:
-    content = f.read()
-
-# Update imports to include pdf_processor
-old_import = "from app.services import csv_parser, image_processor, text_processor, product_search, url_scraper, brand_voice"
-new_import = "from app.services import csv_parser, image_processor, text_processor, product_search, url_scraper, brand_voice, pdf_processor"
-
-if old_import in content:
-    content = content.replace(old_import, new_import)
-
-# Replace the extract-pdf-products endpoint
-old_endpoint = '''@app.post("/api/extract-pdf-products")
-async def extract_pdf_products_endpoint(
-    file: UploadFile = File(...),
-    category: str = Form(default="Electricals"),
-    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
-):
-    """Extract products from PDF using Docling"""
-    check_key(x_api_key)
-    
-    try:
-        if category not in ALLOWED_CATEGORIES:
-            raise HTTPException(status_code=400, detail="Invalid category")
-        
-        logger.info(f"📄 Processing PDF for category: {category}")
-        
-        # Save uploaded file temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        try:
-            from docling.document_converter import DocumentConverter
-            
-            converter = DocumentConverter()
-            result = converter.convert(tmp_path)
-            markdown = result.document.export_to_markdown()
-            
-            # Extract product info from markdown
-            products = [{
-                "name": "Product from PDF",
-                "brand": "",
-                "sku": "",
-                "category": category,
-                "rawExtractedContent": markdown,
-                "descriptions": {
-                    "shortDescription": markdown[:200],
-                    "metaDescription": markdown[:160],
-                    "longDescription": markdown
-                }
-            }]
-            
-            # Generate brand voice
-            if brand_voice:
-                products = await brand_voice.generate(products, category)
-            
-            return ProcessingResponse(success=True, products=products)
-            
-        finally:
-            import os
-            os.unlink(tmp_path)'''
-
-new_endpoint = '''@app.post("/api/extract-pdf-products")
-async def extract_pdf_products_endpoint(
-    file: UploadFile = File(...),
-    category: str = Form(default="Electricals"),
-    x_api_key: Optional[str] = Header(default=None, alias="x-api-key"),
-):
-    """Extract products from PDF using Docling"""
-    check_key(x_api_key)
+    # Material from the shared dictionary
+    material = get_matcher().first(context, "material")
+    if material:
+        specs["material"] = material
     
-    try:
-        if category not in ALLOWED_CATEGORIES:
-            raise HTTPException(status_code=400, detail="Invalid category")
-        
-        logger.info(f"📄 Processing PDF for category: {category}")
-        
-        if not pdf_processor:
-            raise HTTPException(status_code=503, detail="PDF processor not available")
-        
-        file_content = await file.read()
-        products = await pdf_processor.process(file_content, category)
-        
-        logger.info(f"✅ Extracted {len(products)} products from PDF")
-        
-        return ProcessingResponse(success=True, products=products)'''
-
-if old_endpoint in content:
-    content = content.replace(old_endpoint, new_endpoint)
-    print("✅ Updated extract-pdf-products endpoint")
-else:
-    print("⚠️ Could not find old endpoint to replace")
-
-with open('/opt/app/docling-service/app/main.py', 'w') as f:
-    f.write(content)
+    return specs
@@ -0,0 +1,41 @@
+"""
+Worker Preload
+Imported once by the forkserver (WORKER_START_METHOD=forkserver) so every
+worker it forks inherits warm Docling converters and shares the model
+weights copy-on-write instead of loading its own copy
+
+Also importable from a spawn worker (loads models there) - see loaded_timings
+"""
+import logging
+from typing import Dict
+
+from ..config import PDF_PRELOAD_PROFILES
+from ..utils.threads import thread_budget, apply_thread_limits
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_TIMINGS: Dict[str, float] = {}
+PRELOAD_ERROR = ""
+
+# Before Docling/torch start their thread pools, so forked workers inherit the cap
+apply_thread_limits(thread_budget()["threads_per_worker"])
+
+try:
+    from . import docling_converters
+    PRELOAD_TIMINGS = docling_converters.preload(PDF_PRELOAD_PROFILES)
+    logger.info(f"Forkserver preloaded {len(PRELOAD_TIMINGS)} converters: {PRELOAD_TIMINGS}")
+except Exception as e:
+    # Workers still start, they just load models on first use
+    PRELOAD_ERROR = f"{type(e).__name__}: {e}"
+    logger.error(f"Converter preload failed: {e}")
+
+
+def loaded_timings() -> Dict[str, float]:
+    """
+    Seconds each converter took to load in this worker's preload (run via the pool)
+    Raises:
+        RuntimeError: The preload failed
+    """
+    if PRELOAD_ERROR:
+        raise RuntimeError(PRELOAD_ERROR)
+    return PRELOAD_TIMINGS
@@ -0,0 +1,93 @@
+"""
+Readiness
+Verifies the local Docling model bundle and loads every converter at
+startup, so the first PDF request never waits for model downloads
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List
+
+from ..config import DOCLING_ARTIFACTS_PATH, DOCLING_REQUIRED_ARTIFACTS, PDF_PRELOAD_PROFILES
+
+logger = logging.getLogger(__name__)
+
+_state: Dict[str, Any] = {
+    "ready": False,
+    "error": None,
+    "started_at": None,
+    "ready_in_seconds": None,
+    "artifacts_path": DOCLING_ARTIFACTS_PATH or None,
+    "missing_artifacts": [],
+    "timings": {}
+}
+
+
+def verify_artifacts() -> List[str]:
+    """
+    Check the model bundle holds every required artifact
+    Returns:
+        Missing artifact names (empty when the bundle is complete or not configured)
+    """
+    if not DOCLING_ARTIFACTS_PATH:
+        return []
+    if not os.path.isdir(DOCLING_ARTIFACTS_PATH):
+        return list(DOCLING_REQUIRED_ARTIFACTS)
+    return [
+        name for name in DOCLING_REQUIRED_ARTIFACTS
+        if not os.path.exists(os.path.join(DOCLING_ARTIFACTS_PATH, name))
+    ]
+
+
+def worker_load_timings() -> Dict[str, float]:
+    """Runs inside a pool worker; importing preload never happens in the API process"""
+    from . import preload
+    return preload.loaded_timings()
+
+
+def _load_models() -> Dict[str, float]:
+    """Start the conversion pool and collect each converter's load time (blocking)"""
+    from . import worker_pool, docling_converters
+
+    timings = {}
+    start = time.perf_counter()
+    pool = worker_pool.get_pool("conversion")
+    if pool is None:
+        return docling_converters.preload(PDF_PRELOAD_PROFILES)
+
+    pool.warm()
+    timings["worker_pool_start"] = round(time.perf_counter() - start, 2)
+    # Under forkserver these are the loads done once before forking; under spawn, one worker's own loads
+    timings.update(pool.run(worker_load_timings, {}))
+    return timings
+
+
+async def startup():
+    """Verify the bundle then load the models; records the outcome for /readyz"""
+    _state["started_at"] = datetime.now().isoformat()
+    start = time.perf_counter()
+
+    missing = verify_artifacts()
+    if missing:
+        _state["missing_artifacts"] = missing
+        _state["error"] = f"Missing Docling model artifacts in {DOCLING_ARTIFACTS_PATH}: {', '.join(missing)}"
+        logger.error(f"❌ {_state['error']}")
+        return
+
+    try:
+        _state["timings"] = await asyncio.to_thread(_load_models)
+    except Exception as e:
+        _state["error"] = f"Model preload failed: {e}"
+        logger.error(f"❌ {_state['error']}", exc_info=True)
+        return
+
+    _state["ready"] = True
+    _state["ready_in_seconds"] = round(time.perf_counter() - start, 2)
+    logger.info(f"✅ Docling models ready in {_state['ready_in_seconds']}s: {_state['timings']}")
+
+
+def readiness() -> Dict[str, Any]:
+    """Current readiness state"""
+    return dict(_state)
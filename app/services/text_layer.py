@@ -0,0 +1,150 @@
+"""
+Text Layer Scanner
+Cheap pypdfium2 pre-scan that decides which PDF pages actually need OCR
+"""
+import logging
+from typing import List, Dict, Any, Tuple, Union
+
+from ..config import (
+    TEXT_LAYER_MIN_CHARS,
+    TEXT_LAYER_MIN_COVERAGE,
+    TEXT_LAYER_MAX_GARBAGE_RATIO
+)
+
+logger = logging.getLogger(__name__)
+
+# pypdfium2 ships with Docling (PyPdfiumDocumentBackend)
+try:
+    import pypdfium2 as pdfium
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+
+
+def scan_pages(source: Union[bytes, str]) -> List[Dict[str, Any]]:
+    """
+    Measure text-layer coverage for every page of a PDF
+    Args:
+        source: PDF bytes or path on disk
+    Returns:
+        List of page dicts (1-based page, chars, coverage, garbage_ratio, has_text_layer)
+    """
+    if not HAS_PDFIUM:
+        logger.warning("pypdfium2 not available - skipping text layer scan")
+        return []
+
+    pages = []
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                width, height = page.get_size()
+                char_count = textpage.count_chars()
+                text = textpage.get_text_range() if char_count else ""
+
+                # Area of the page covered by text boxes
+                text_area = 0.0
+                for rect_index in range(textpage.count_rects()):
+                    left, bottom, right, top = textpage.get_rect(rect_index)
+                    text_area += max(0.0, right - left) * max(0.0, top - bottom)
+                page_area = width * height
+                coverage = min(1.0, text_area / page_area) if page_area else 0.0
+
+                pages.append(classify_page(index + 1, text, coverage))
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+    ocr_pages = sum(1 for p in pages if not p["has_text_layer"])
+    logger.info(f"Text layer scan: {len(pages)} pages, {ocr_pages} need OCR")
+
+    return pages
+
+
+def classify_page(page_no: int, text: str, coverage: float) -> Dict[str, Any]:
+    """
+    Decide whether a page has a usable text layer
+    Args:
+        page_no: 1-based page number
+        text: Text extracted from the page's text layer
+        coverage: Fraction of the page area covered by text boxes
+    Returns:
+        Page dict with has_text_layer flag
+    """
+    visible = [c for c in text if not c.isspace()]
+    # Broken font encodings come back as replacement or control characters
+    garbage = sum(1 for c in visible if c == "\ufffd" or (ord(c) < 32))
+    garbage_ratio = garbage / len(visible) if visible else 0.0
+
+    has_text_layer = (
+        len(visible) >= TEXT_LAYER_MIN_CHARS
+        and coverage >= TEXT_LAYER_MIN_COVERAGE
+        and garbage_ratio <= TEXT_LAYER_MAX_GARBAGE_RATIO
+    )
+
+    return {
+        "page": page_no,
+        "chars": len(visible),
+        "coverage": round(coverage, 4),
+        "garbage_ratio": round(garbage_ratio, 4),
+        "has_text_layer": has_text_layer
+    }
+
+
+def plan_page_runs(
+    pages: List[Dict[str, Any]],
+    force_full_ocr: bool = False,
+    max_pages: int = None
+) -> List[Tuple[int, int, bool]]:
+    """
+    Group consecutive pages that share the same OCR decision
+    Args:
+        pages: Output of scan_pages
+        force_full_ocr: OCR every page regardless of text layer
+        max_pages: Split runs longer than this (None for no limit)
+    Returns:
+        List of (start_page, end_page, needs_ocr) tuples, 1-based and inclusive
+    """
+    runs = []
+    for page in pages:
+        needs_ocr = force_full_ocr or not page["has_text_layer"]
+        if (runs and runs[-1][2] == needs_ocr and runs[-1][1] == page["page"] - 1
+                and (not max_pages or page["page"] - runs[-1][0] < max_pages)):
+            start, _, _ = runs[-1]
+            runs[-1] = (start, page["page"], needs_ocr)
+        else:
+            runs.append((page["page"], page["page"], needs_ocr))
+    return runs
+
+
+def extract_text(source: Union[bytes, str]) -> str:
+    """
+    Pull the raw text layer from every page without running Docling
+    Args:
+        source: PDF bytes or path on disk
+    Returns:
+        Page texts joined by blank lines
+    """
+    if not HAS_PDFIUM:
+        logger.warning("pypdfium2 not available - cannot extract text layer")
+        return ""
+
+    texts = []
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                texts.append(textpage.get_text_range())
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+    return "\n\n".join(texts)
@@ -7,6 +7,7 @@ import re
 from typing import List, Dict, Any
 
 from ..config import TEXT_MIN_LENGTH, TEXT_MAX_LENGTH
+from ..utils.keyword_matcher import get_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -194,7 +195,8 @@ def extract_brand_from_text(text: str) -> str:
         if match:
             return match.group(1).strip()
 
-    return ""
+    # Fall back to known brands mentioned anywhere in the text
+    return get_matcher().first(text, "brand")
 
 
 def extract_features_from_text(text: str) -> List[str]:
@@ -323,6 +325,12 @@ def extract_specs_from_text(text: str) -> Dict[str, Any]:
             elif 'care' in key_lower or 'cleaning' in key_lower:
                 specs['care'] = value.strip()
 
+    # Material mentioned in prose rather than as "Material: ..."
+    if 'material' not in specs:
+        material = get_matcher().first(text, "material")
+        if material:
+            specs['material'] = material
+
     return specs
 
 
@@ -25,6 +25,10 @@ except ImportError:
 
 from bs4 import BeautifulSoup
 
+from ..config import PARSE_TIMEOUT_SEC
+from ..utils.keyword_matcher import get_matcher
+from . import worker_pool
+
 
 async def scrape(url: str, category: str) -> List[Dict[str, Any]]:
     """Scrape product data - tries cloudscraper first, then Playwright"""
@@ -54,7 +58,28 @@ async def scrape(url: str, category: str) -> List[Dict[str, Any]]:
     if not html:
         raise ValueError("This website could not be scraped. Please copy the product details and use the Free Text tab.")
     
-    # Parse and extract
+    # Parse in the parse worker pool so soup trees never accumulate in the API process
+    kwargs = {"html": html, "url": url, "category": category, "method_used": method_used}
+    pool = worker_pool.get_pool("parse")
+    if pool:
+        product = await asyncio.to_thread(pool.run, parse_product, kwargs, PARSE_TIMEOUT_SEC)
+    else:
+        product = parse_product(**kwargs)
+    
+    return [product]
+
+
+def parse_product(html: str, url: str, category: str, method_used: str) -> Dict[str, Any]:
+    """
+    Parse scraped HTML into a product dict (runs inside a parse worker)
+    Args:
+        html: Page HTML
+        url: Source URL
+        category: Product category
+        method_used: Scrape method that fetched the HTML
+    Returns:
+        Product dict
+    """
     soup = BeautifulSoup(html, 'html.parser')
     full_text = soup.get_text(separator=' ', strip=True)
     
@@ -83,7 +108,8 @@ async def scrape(url: str, category: str) -> List[Dict[str, Any]]:
         "_scrape_method": method_used
     }
     
-    return [product]
+    soup.decompose()
+    return product
 
 
 def scrape_with_cloudscraper(url: str) -> str:
@@ -159,7 +185,7 @@ def extract_brand(soup: BeautifulSoup, full_text: str) -> str:
     match = re.search(r'Brand:\s*([A-Za-z0-9\s&]+)', full_text)
     if match:
         return match.group(1).strip()[:50]
-    return ""
+    return get_matcher().first(full_text, "brand")
 
 
 def extract_sku(soup: BeautifulSoup, full_text: str) -> str:
@@ -320,16 +346,8 @@ def extract_specifications(soup: BeautifulSoup, full_text: str) -> Dict[str, Any
 
 
 def extract_colours(soup: BeautifulSoup, full_text: str) -> List[str]:
-    colours = []
-    colour_words = [
-        'black', 'white', 'silver', 'grey', 'gray', 'red', 'blue', 'green',
-        'gold', 'rose gold', 'bronze', 'copper', 'cream', 'stainless steel'
-    ]
-    text_lower = full_text.lower()
-    for colour in colour_words:
-        if colour in text_lower:
-            colours.append(colour.title())
-    return list(set(colours))[:10]
+    colours = get_matcher().keywords(full_text, "colour")
+    return [colour.title() for colour in colours][:10]
 
 
 def extract_sizes(soup: BeautifulSoup, full_text: str) -> List[str]:
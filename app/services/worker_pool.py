@@ -0,0 +1,355 @@
+"""
+Worker Pools
+Runs heavy work (Docling page runs, HTML parsing) in separate processes so
+a hung task can be killed at its deadline and a bloated worker can be
+recycled without taking the API process down with it
+"""
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from typing import Callable, Dict, Any, List, Optional
+
+from ..config import (
+    PDF_WORKER_PROCESSES,
+    PDF_WORKER_MAX_TASKS,
+    PDF_WORKER_MAX_RSS_MB,
+    PARSE_WORKER_PROCESSES,
+    PARSE_WORKER_MAX_TASKS,
+    PARSE_WORKER_MAX_RSS_MB,
+    WORKER_START_METHOD
+)
+from ..utils.memory import current_rss_bytes, private_rss_bytes
+from ..utils.threads import thread_budget, apply_thread_limits
+from ..utils.cancellation import Cancelled, ShouldAbort
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting run checks should_abort
+ABORT_CHECK_SEC = 0.5
+
+# Workers are never plain-forked from the API process (its threads and event
+# loop are not fork-safe). "forkserver" forks them from a single-threaded
+# server that has already imported Docling and preloaded the converters.
+_context = multiprocessing.get_context(WORKER_START_METHOD)
+if WORKER_START_METHOD == "forkserver":
+    _context.set_forkserver_preload(["app.services.preload"])
+
+# Pool name -> (workers, tasks before recycling, RSS ceiling in MB, intra-op threads per worker);
+# size 0 runs in-process
+POOL_SETTINGS = {
+    "conversion": (
+        PDF_WORKER_PROCESSES, PDF_WORKER_MAX_TASKS, PDF_WORKER_MAX_RSS_MB, thread_budget()["threads_per_worker"]
+    ),
+    "parse": (PARSE_WORKER_PROCESSES, PARSE_WORKER_MAX_TASKS, PARSE_WORKER_MAX_RSS_MB, 1),
+}
+
+
+class WorkerTimeout(Exception):
+    """A task did not finish before its deadline (the worker was killed)"""
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while running a task (the worker was replaced)"""
+
+
+def _memory() -> tuple:
+    return current_rss_bytes(), private_rss_bytes()
+
+
+def _worker_main(conn, threads: int):
+    """Worker loop: receive (func, kwargs), send back (status, payload, (rss, private) bytes)"""
+    if threads:
+        apply_thread_limits(threads)
+    # Start-up time must not count against the first task's deadline
+    conn.send(("ready", None, _memory()))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        func, kwargs = task
+        try:
+            result = ("ok", func(**kwargs))
+        except Exception as e:
+            result = ("error", f"{type(e).__name__}: {e}")
+        conn.send((*result, _memory()))
+
+
+class _Worker:
+    def __init__(self, pool_name: str, index: int, threads: int = 0):
+        self.index = index
+        self.tasks = 0
+        self.rss_bytes = 0
+        self.private_bytes = 0
+        self.ready = False
+        self.conn, child_conn = _context.Pipe()
+        self.process = _context.Process(
+            target=_worker_main, args=(child_conn, threads), name=f"{pool_name}-worker-{index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        logger.info(f"Started {pool_name} worker {index} (pid {self.process.pid})")
+
+    def wait_ready(self):
+        """Block until the worker has finished importing (raises EOFError if it died)"""
+        if not self.ready:
+            _, _, (self.rss_bytes, self.private_bytes) = self.conn.recv()
+            self.ready = True
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of worker processes
+
+    run() blocks the calling thread until a worker is free and the task
+    finishes. A worker that misses the deadline or dies is killed and
+    replaced before the error is raised; a worker that has run max_tasks
+    tasks or whose private memory has grown past max_rss_mb is recycled
+    once its current task has been returned, so pool capacity never shrinks
+    and no work is lost. (Private rather than total RSS, so model weights
+    shared from the forkserver do not count against each worker.)
+    """
+
+    def __init__(self, name: str, size: int, max_tasks: int = 0, max_rss_mb: int = 0, threads: int = 0):
+        self.name = name
+        self.size = size
+        self.threads = threads
+        self.max_tasks = max_tasks
+        self.max_rss_bytes = max_rss_mb * 1048576
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: Dict[int, _Worker] = {}
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self.stats = {
+            "tasks": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "aborted": 0,
+            "replaced": 0,
+            "recycled_tasks": 0,
+            "recycled_rss": 0
+        }
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+        worker = _Worker(self.name, index, self.threads)
+        with self._lock:
+            self._workers[index] = worker
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool) -> _Worker:
+        with self._lock:
+            self._workers.pop(worker.index, None)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        return self._spawn()
+
+    def _check_recycle(self, worker: _Worker) -> _Worker:
+        """Swap a worker that has done enough tasks or grown too large for a fresh one"""
+        if self.max_tasks and worker.tasks >= self.max_tasks:
+            reason = "recycled_tasks"
+            logger.info(f"Recycling {self.name} worker {worker.index} after {worker.tasks} tasks")
+        elif self.max_rss_bytes and worker.private_bytes > self.max_rss_bytes:
+            reason = "recycled_rss"
+            logger.info(
+                f"Recycling {self.name} worker {worker.index} at {worker.private_bytes / 1048576:.0f}MB private RSS "
+                f"(ceiling {self.max_rss_bytes / 1048576:.0f}MB)"
+            )
+        else:
+            return worker
+        self._count(reason)
+        return self._retire(worker, kill=False)
+
+    def _take_idle(self, should_abort: ShouldAbort) -> _Worker:
+        """Wait for a free worker, giving up if the task is cancelled meanwhile"""
+        if should_abort is None:
+            return self._idle.get()
+        while True:
+            if should_abort():
+                raise Cancelled("task cancelled while waiting for a worker")
+            try:
+                return self._idle.get(timeout=ABORT_CHECK_SEC)
+            except queue.Empty:
+                pass
+
+    def _wait_result(self, worker: _Worker, timeout: Optional[float], should_abort: ShouldAbort) -> str:
+        """Wait for the worker's reply: ready, timeout or aborted"""
+        if should_abort is None:
+            return "ready" if worker.conn.poll(timeout) else "timeout"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = ABORT_CHECK_SEC if deadline is None else min(ABORT_CHECK_SEC, deadline - time.monotonic())
+            if worker.conn.poll(max(0.0, wait)):
+                return "ready"
+            if should_abort():
+                return "aborted"
+            if deadline is not None and time.monotonic() >= deadline:
+                return "timeout"
+
+    def run(
+        self,
+        func: Callable,
+        kwargs: Dict[str, Any],
+        timeout: Optional[float] = None,
+        should_abort: ShouldAbort = None
+    ) -> Any:
+        """
+        Run one task on a free worker
+        Args:
+            func: Module-level function (pickled by reference, imported in the worker)
+            kwargs: Keyword arguments for func
+            timeout: Seconds to wait for the result (None waits forever)
+            should_abort: Checked while waiting; True kills the worker and abandons the task
+        Returns:
+            func's return value
+        Raises:
+            WorkerTimeout: Deadline passed; the worker was killed and replaced
+            WorkerCrashed: Worker process died; it was replaced
+            Cancelled: should_abort() returned True; the worker was killed and replaced
+            RuntimeError: func raised inside the worker
+        """
+        label = f"{func.__name__}({kwargs.get('page_range') or ''})"
+        worker = self._take_idle(should_abort)
+        try:
+            self._count("tasks")
+            worker.wait_ready()
+            worker.conn.send((func, kwargs))
+            outcome = self._wait_result(worker, timeout, should_abort)
+            if outcome == "aborted":
+                self._count("aborted")
+                logger.info(f"{self.name} worker {worker.index} cancelled on {label}, killing it")
+                worker = self._retire(worker, kill=True)
+                self._count("replaced")
+                raise Cancelled(f"{label} cancelled")
+            if outcome == "timeout":
+                self._count("timeouts")
+                logger.warning(f"{self.name} worker {worker.index} missed {timeout}s deadline on {label}, killing it")
+                worker = self._retire(worker, kill=True)
+                self._count("replaced")
+                raise WorkerTimeout(f"{label} timed out after {timeout}s")
+            status, payload, (worker.rss_bytes, worker.private_bytes) = worker.conn.recv()
+            worker.tasks += 1
+            worker = self._check_recycle(worker)
+        except (EOFError, OSError) as e:
+            self._count("crashes")
+            logger.error(f"{self.name} worker {worker.index} died on {label}: {e}")
+            worker = self._retire(worker, kill=True)
+            self._count("replaced")
+            raise WorkerCrashed(f"{self.name} worker died on {label}") from e
+        finally:
+            self._idle.put(worker)
+
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def warm(self):
+        """Block until every worker has started (pool must be idle)"""
+        workers = [self._idle.get() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                worker.wait_ready()
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus per-worker task count and last reported RSS"""
+        with self._lock:
+            workers = [
+                {
+                    "index": worker.index,
+                    "pid": worker.process.pid,
+                    "tasks": worker.tasks,
+                    "rss_mb": round(worker.rss_bytes / 1048576, 1),
+                    "private_mb": round(worker.private_bytes / 1048576, 1)
+                }
+                for worker in self._workers.values()
+            ]
+            stats = dict(self.stats)
+        return {
+            "size": self.size,
+            "start_method": WORKER_START_METHOD,
+            "threads_per_worker": self.threads,
+            "max_tasks": self.max_tasks,
+            "max_rss_mb": self.max_rss_bytes // 1048576,
+            **stats,
+            "workers": workers
+        }
+
+    def shutdown(self):
+        """Stop every idle worker (busy ones are killed with the process)"""
+        workers: List[_Worker] = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.stop()
+        logger.info(f"Stopped {len(workers)} {self.name} workers")
+
+
+# Started on first use
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str) -> Optional[WorkerPool]:
+    """
+    Shared pool by name
+    Args:
+        name: Key of POOL_SETTINGS
+    Returns:
+        WorkerPool, or None when the pool is configured with 0 workers (run in-process)
+    """
+    size, max_tasks, max_rss_mb, threads = POOL_SETTINGS[name]
+    if size <= 0:
+        return None
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = WorkerPool(name, size, max_tasks, max_rss_mb, threads)
+        return _pools[name]
+
+
+def shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Snapshot of every running pool for /metrics"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.snapshot() for name, pool in pools.items()}
@@ -0,0 +1,63 @@
+"""
+Cooperative cancellation
+Long steps (downloads, conversion runs, brand voice) take a should_abort
+callable and check it between chunks of work
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+# Returns True once the work should stop; must be cheap, it is called often
+ShouldAbort = Optional[Callable[[], bool]]
+T = TypeVar("T")
+
+
+class Cancelled(Exception):
+    """Work stopped because should_abort() returned True"""
+
+
+def raise_if_cancelled(should_abort: ShouldAbort, what: str = "work"):
+    """
+    Stop here if the work was cancelled
+    Args:
+        should_abort: Abort check (None never aborts)
+        what: Description for the exception message
+    Raises:
+        Cancelled: should_abort() returned True
+    """
+    if should_abort is not None and should_abort():
+        raise Cancelled(f"{what} cancelled")
+
+
+async def run_cancellable(
+    coro: Awaitable[T],
+    should_abort: ShouldAbort,
+    what: str = "work",
+    check_sec: float = 0.5
+) -> T:
+    """
+    Await a coroutine, cancelling it as soon as the work is cancelled
+    For single long awaits (an LLM call, a page scrape) that have no chunks to check between
+    Args:
+        coro: Coroutine to run
+        should_abort: Abort check, polled every check_sec (None just awaits coro)
+        what: Description for the exception message
+        check_sec: Poll interval
+    Returns:
+        The coroutine's result
+    Raises:
+        Cancelled: should_abort() returned True (the coroutine is cancelled)
+    """
+    if should_abort is None:
+        return await coro
+    task = asyncio.ensure_future(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=check_sec)
+        if done:
+            return task.result()
+        if should_abort():
+            task.cancel()
+            try:
+                await task
+            except BaseException:
+                pass
+            raise Cancelled(f"{what} cancelled")
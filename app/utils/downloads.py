@@ -0,0 +1,322 @@
+"""
+Remote file downloads
+Bounded, resumable downloads over one pooled HTTP client, with a local
+cache of files revalidated by ETag / Last-Modified (see Remote Downloads
+in config.py)
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, Optional, Union
+
+import httpx
+
+from ..config import (
+    PDF_STREAM_MAX_BYTES,
+    PDF_SPOOL_DIR,
+    DOWNLOAD_CONNECT_TIMEOUT_SEC,
+    DOWNLOAD_READ_TIMEOUT_SEC,
+    DOWNLOAD_DEADLINE_SEC,
+    DOWNLOAD_MAX_BYTES,
+    DOWNLOAD_RETRIES,
+    DOWNLOAD_MAX_CONNECTIONS,
+    DOWNLOAD_CACHE_DIR,
+    DOWNLOAD_CACHE_MAX_BYTES
+)
+from .cancellation import ShouldAbort, raise_if_cancelled
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class DownloadError(Exception):
+    """A download broke one of its limits or could not be completed"""
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared download client (one per event loop, keeps connections alive between downloads)"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DOWNLOAD_READ_TIMEOUT_SEC, connect=DOWNLOAD_CONNECT_TIMEOUT_SEC),
+            limits=httpx.Limits(
+                max_connections=DOWNLOAD_MAX_CONNECTIONS,
+                max_keepalive_connections=DOWNLOAD_MAX_CONNECTIONS // 2
+            ),
+            # Byte offsets (Range, size limits) are counted on the file itself, not a compressed transfer
+            headers={"Accept-Encoding": "identity"},
+            follow_redirects=True
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client():
+    """Close the shared download client (on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class _Sink:
+    """Download target: memory while it stays under max_memory_bytes, then a spool file"""
+
+    def __init__(self, max_memory_bytes: int):
+        self.max_memory_bytes = max_memory_bytes
+        self.size = 0
+        self.buffer = bytearray()
+        self.path = None
+        self.file = None
+
+    def write(self, chunk: bytes):
+        if self.file is None and self.size + len(chunk) > self.max_memory_bytes:
+            fd, self.path = tempfile.mkstemp(suffix=".pdf", dir=PDF_SPOOL_DIR)
+            self.file = os.fdopen(fd, "wb")
+            self.file.write(self.buffer)
+            self.buffer = None
+        if self.file is not None:
+            self.file.write(chunk)
+        else:
+            self.buffer.extend(chunk)
+        self.size += len(chunk)
+
+    def discard(self):
+        """Drop everything written so far (also removes the spool file)"""
+        if self.file is not None:
+            self.file.close()
+            os.remove(self.path)
+        self.size = 0
+        self.buffer = bytearray()
+        self.path = self.file = None
+
+    def finish(self) -> Union[bytes, str]:
+        if self.file is not None:
+            self.file.close()
+            return self.path
+        return bytes(self.buffer)
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    """Full size of the file being downloaded, when the server says"""
+    if response.status_code == 206:
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length", "")
+    return int(length) if length.isdigit() else None
+
+
+def _resume_offset(response: httpx.Response) -> Optional[int]:
+    """First byte of a 206 response (Content-Range: bytes <start>-<end>/<total>)"""
+    value = response.headers.get("content-range", "")
+    start = value.partition(" ")[2].partition("-")[0]
+    return int(start) if start.isdigit() else None
+
+
+async def _download(
+    file_url: str,
+    sink: _Sink,
+    cached: Optional[Dict[str, Any]],
+    max_bytes: int,
+    should_abort: ShouldAbort
+) -> Optional[httpx.Headers]:
+    """
+    Stream file_url into sink, resuming after dropped connections
+    Returns:
+        Headers of the response the body came from, or None when the cached copy is still current
+    Raises:
+        DownloadError: Too large, too slow or an unusable partial response
+        httpx.HTTPError: HTTP error status, or the connection kept failing
+        Cancelled: should_abort() returned True
+    """
+    client = get_client()
+    deadline = time.monotonic() + DOWNLOAD_DEADLINE_SEC
+    response_headers = None
+    failures = 0
+
+    while True:
+        headers = {}
+        if sink.size:
+            # Only resume the same version of the file; otherwise the server sends all of it
+            headers["Range"] = f"bytes={sink.size}-"
+            validator = response_headers.get("etag") or response_headers.get("last-modified")
+            if validator:
+                headers["If-Range"] = validator
+        elif cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            async with client.stream("GET", file_url, headers=headers) as r:
+                if r.status_code == 304 and cached and not sink.size:
+                    return None
+                r.raise_for_status()
+
+                if r.status_code == 206:
+                    if _resume_offset(r) != sink.size:
+                        raise DownloadError(f"Server resumed {file_url} at the wrong offset")
+                else:
+                    if sink.size:
+                        logger.info(f"Server restarted {file_url} from the beginning")
+                        sink.discard()
+                    response_headers = r.headers
+
+                length = _content_length(r)
+                if length is not None and length > max_bytes:
+                    raise DownloadError(f"{file_url} is {length // (1024 * 1024)}MB (limit {max_bytes // (1024 * 1024)}MB)")
+
+                async for chunk in r.aiter_bytes():
+                    raise_if_cancelled(should_abort, f"Download of {file_url}")
+                    sink.write(chunk)
+                    if sink.size > max_bytes:
+                        raise DownloadError(f"{file_url} is over the {max_bytes // (1024 * 1024)}MB limit")
+                    if time.monotonic() > deadline:
+                        raise DownloadError(f"Download of {file_url} took longer than {DOWNLOAD_DEADLINE_SEC:.0f}s")
+                return response_headers
+
+        except httpx.TransportError as e:
+            failures += 1
+            if failures > DOWNLOAD_RETRIES or time.monotonic() > deadline:
+                raise
+            logger.warning(
+                f"Download of {file_url} interrupted after {sink.size} bytes ({type(e).__name__}), "
+                f"retry {failures}/{DOWNLOAD_RETRIES}"
+            )
+            await asyncio.sleep(min(2 ** (failures - 1), 10))
+
+
+def _cache_paths(file_url: str) -> tuple:
+    key = hashlib.sha256(file_url.encode("utf-8")).hexdigest()
+    return os.path.join(DOWNLOAD_CACHE_DIR, f"{key}.bin"), os.path.join(DOWNLOAD_CACHE_DIR, f"{key}.json")
+
+
+def _cache_lookup(file_url: str) -> Optional[Dict[str, Any]]:
+    """Validators of the cached copy of a URL, if there is a usable one"""
+    if not DOWNLOAD_CACHE_MAX_BYTES:
+        return None
+    data_path, meta_path = _cache_paths(file_url)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if os.path.getsize(data_path) != meta["size"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    meta["path"] = data_path
+    return meta
+
+
+def _link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _read_cached(meta: Dict[str, Any], max_memory_bytes: int) -> Union[bytes, str]:
+    """The cached file as bytes, or as a spool file of its own once it is large"""
+    os.utime(meta["path"])
+    if meta["size"] <= max_memory_bytes:
+        with open(meta["path"], "rb") as f:
+            return f.read()
+    path = os.path.join(PDF_SPOOL_DIR, f"{uuid.uuid4().hex}.pdf")
+    _link_or_copy(meta["path"], path)
+    return path
+
+
+def _cache_store(file_url: str, headers: httpx.Headers, downloaded: Union[bytes, str]):
+    """Keep a download that can be revalidated later, then trim the cache to size"""
+    etag, last_modified = headers.get("etag"), headers.get("last-modified")
+    if not DOWNLOAD_CACHE_MAX_BYTES or not (etag or last_modified) or "no-store" in headers.get("cache-control", ""):
+        return
+    os.makedirs(DOWNLOAD_CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _cache_paths(file_url)
+    tmp = f"{data_path}.{uuid.uuid4().hex}.tmp"
+    if isinstance(downloaded, str):
+        _link_or_copy(downloaded, tmp)
+        size = os.path.getsize(tmp)
+    else:
+        with open(tmp, "wb") as f:
+            f.write(downloaded)
+        size = len(downloaded)
+    # Replaced, never rewritten, so spool files linked to the old copy stay intact
+    os.replace(tmp, data_path)
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump({"url": file_url, "etag": etag, "last_modified": last_modified, "size": size}, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    _prune_cache()
+
+
+def _prune_cache():
+    """Remove least recently used files until the cache fits DOWNLOAD_CACHE_MAX_BYTES"""
+    entries = []
+    for name in os.listdir(DOWNLOAD_CACHE_DIR):
+        if name.endswith(".bin"):
+            stat = os.stat(os.path.join(DOWNLOAD_CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= DOWNLOAD_CACHE_MAX_BYTES:
+            break
+        for path in (name, name[:-4] + ".json"):
+            try:
+                os.remove(os.path.join(DOWNLOAD_CACHE_DIR, path))
+            except OSError:
+                pass
+        total -= size
+
+
+async def fetch_source(
+    file_url: str,
+    max_memory_bytes: int = PDF_STREAM_MAX_BYTES,
+    should_abort: ShouldAbort = None,
+    max_bytes: int = DOWNLOAD_MAX_BYTES
+) -> Union[bytes, str]:
+    """
+    Download a file, keeping it in memory while it stays small
+    Args:
+        file_url: URL to download
+        max_memory_bytes: Spill to PDF_SPOOL_DIR once the body grows past this
+        should_abort: Checked per chunk; True closes the connection and raises Cancelled
+        max_bytes: Give up on files larger than this
+    Returns:
+        File bytes, or the spool file path for large downloads (caller removes it)
+    Raises:
+        DownloadError: Over max_bytes, past DOWNLOAD_DEADLINE_SEC or not resumable
+        httpx.HTTPError: HTTP error status, or the connection kept failing
+    """
+    cached = await asyncio.to_thread(_cache_lookup, file_url)
+    sink = _Sink(max_memory_bytes)
+    try:
+        headers = await _download(file_url, sink, cached, max_bytes, should_abort)
+    except BaseException:
+        sink.discard()
+        raise
+
+    if headers is None:
+        try:
+            downloaded = await asyncio.to_thread(_read_cached, cached, max_memory_bytes)
+            logger.info(f"Using cached copy of {file_url} (not modified)")
+            return downloaded
+        except OSError:
+            # Evicted since the lookup; fetch it again
+            headers = await _download(file_url, sink, None, max_bytes, should_abort)
+
+    downloaded = sink.finish()
+    try:
+        await asyncio.to_thread(_cache_store, file_url, headers, downloaded)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not cache {file_url}: {e}")
+    return downloaded
+
@@ -0,0 +1,176 @@
+"""
+Keyword matcher
+Aho-Corasick multi-pattern search over the brand/colour/material dictionary
+"""
+import json
+import logging
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional
+
+from ..config import (
+    KEYWORD_DICTIONARY_PATH,
+    BRAND_KEYWORDS,
+    COLOUR_KEYWORDS,
+    MATERIAL_KEYWORDS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Finds every dictionary keyword in a text with one linear scan
+
+    Matching is case-insensitive and whole-word: a keyword only matches
+    when it is not glued to surrounding letters or digits ("Sage" does not
+    match "usage").
+    """
+
+    def __init__(self, dictionary: Dict[str, Iterable[str]]):
+        """
+        Build the automaton
+        Args:
+            dictionary: {category: [keyword, ...]}
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[tuple] = []  # (category, keyword, length)
+
+        seen = set()
+        for category, keywords in dictionary.items():
+            for keyword in keywords:
+                pattern = keyword.strip().lower()
+                if not pattern or (category, pattern) in seen:
+                    continue
+                seen.add((category, pattern))
+                self._add(pattern, len(self._patterns))
+                self._patterns.append((category, keyword.strip(), len(pattern)))
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, pattern: str, pattern_id: int):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append(pattern_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return every whole-word match with its position
+        Args:
+            text: Text to scan
+            category: Only report keywords from this category (None for all)
+        Returns:
+            List of {category, keyword, start, end} in order of appearance
+        """
+        if not text or not self._patterns:
+            return []
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased; keep offsets aligned
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        matches = []
+        node = 0
+
+        for index, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not out[node]:
+                continue
+
+            for pattern_id in out[node]:
+                pattern_category, keyword, length = patterns[pattern_id]
+                if category and pattern_category != category:
+                    continue
+                start = index - length + 1
+                end = index + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                matches.append({
+                    "category": pattern_category,
+                    "keyword": keyword,
+                    "start": start,
+                    "end": end
+                })
+
+        matches.sort(key=lambda m: (m["start"], -(m["end"] - m["start"])))
+        return matches
+
+    def keywords(self, text: str, category: str) -> List[str]:
+        """Unique keywords of one category in order of first appearance"""
+        found = []
+        for match in self.find_all(text, category):
+            if match["keyword"] not in found:
+                found.append(match["keyword"])
+        return found
+
+    def first(self, text: str, category: str) -> str:
+        """Earliest keyword of one category, or empty string"""
+        matches = self.find_all(text, category)
+        return matches[0]["keyword"] if matches else ""
+
+
+def load_dictionary() -> Dict[str, List[str]]:
+    """
+    Built-in keyword lists extended with KEYWORD_DICTIONARY_PATH (if set)
+    Returns:
+        {category: [keyword, ...]}
+    """
+    dictionary = {
+        "brand": list(BRAND_KEYWORDS),
+        "colour": list(COLOUR_KEYWORDS),
+        "material": list(MATERIAL_KEYWORDS)
+    }
+
+    if KEYWORD_DICTIONARY_PATH:
+        try:
+            with open(KEYWORD_DICTIONARY_PATH, encoding="utf-8") as f:
+                extra = json.load(f)
+            for category, keywords in extra.items():
+                dictionary.setdefault(category, []).extend(keywords)
+            logger.info(f"Loaded keyword dictionary from {KEYWORD_DICTIONARY_PATH}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load keyword dictionary {KEYWORD_DICTIONARY_PATH}: {e}")
+
+    return dictionary
+
+
+# Built once on first use and shared by all extractors
+_matcher: Optional[KeywordMatcher] = None
+
+
+def get_matcher() -> KeywordMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher(load_dictionary())
+        logger.info(f"Keyword matcher built with {len(_matcher)} keywords")
+    return _matcher
@@ -0,0 +1,105 @@
+"""
+Memory accounting
+Samples process RSS so conversions can report their peak memory use
+"""
+import os
+import resource
+import threading
+from typing import Dict, Any, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (falls back to the lifetime peak off Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def private_rss_bytes() -> int:
+    """
+    Resident memory not shared with other processes (Private_Clean + Private_Dirty)
+
+    Workers forked from a preloaded parent share the model weights; only
+    their private memory is freed when they are recycled.
+    """
+    try:
+        private = 0
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    private += int(line.split()[1]) * 1024
+        return private
+    except (OSError, ValueError, IndexError):
+        return current_rss_bytes()
+
+
+class PeakRSSSampler:
+    """
+    Track peak RSS while a block runs
+
+    ru_maxrss only ever grows over the process lifetime, so a background
+    thread polls the current RSS instead to get a per-conversion peak.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def __enter__(self) -> "PeakRSSSampler":
+        self.start_bytes = self.peak_bytes = current_rss_bytes()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak_bytes / 1048576, 1)
+
+    @property
+    def growth_mb(self) -> float:
+        return round((self.peak_bytes - self.start_bytes) / 1048576, 1)
+
+
+# Memory stats of the conversions this process started (exposed on /metrics);
+# peaks are sampled by whichever process ran the conversion
+_stats = {"conversions": 0, "last_peak_rss_mb": 0.0, "max_peak_rss_mb": 0.0, "last_growth_mb": 0.0}
+_stats_lock = threading.Lock()
+
+
+def record_conversion(peak_mb: float, growth_mb: float):
+    """
+    Fold one conversion's memory use into the process stats
+    Args:
+        peak_mb: Largest peak RSS of its runs (from a PeakRSSSampler in the worker)
+        growth_mb: Largest RSS growth over a run
+    """
+    with _stats_lock:
+        _stats["conversions"] += 1
+        _stats["last_peak_rss_mb"] = peak_mb
+        _stats["last_growth_mb"] = growth_mb
+        _stats["max_peak_rss_mb"] = max(_stats["max_peak_rss_mb"], peak_mb)
+
+
+def memory_stats() -> Dict[str, Any]:
+    """Current RSS plus conversion peaks"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["rss_mb"] = round(current_rss_bytes() / 1048576, 1)
+    return stats
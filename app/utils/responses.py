@@ -0,0 +1,69 @@
+"""
+Compressed responses
+Job results and exports are gzipped for clients that send
+Accept-Encoding: gzip, once they pass JOB_RESULT_GZIP_MIN_BYTES
+"""
+import os
+import gzip
+import json
+import zlib
+from typing import Any, Iterator
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse, FileResponse
+
+from ..config import JOB_RESULT_GZIP_MIN_BYTES
+
+# Exports are read and compressed this much at a time
+CHUNK_SIZE = 64 * 1024
+# wbits for zlib.compressobj that writes a gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the client accepts gzip-encoded responses"""
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def json_response(request: Request, content: Any) -> Response:
+    """
+    JSON response, gzipped when the client accepts it and it is large enough
+    Args:
+        request: Incoming request (for Accept-Encoding)
+        content: JSON-serialisable content
+    """
+    body = json.dumps(content).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= JOB_RESULT_GZIP_MIN_BYTES and accepts_gzip(request):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _gzip_file(path: str) -> Iterator[bytes]:
+    """Gzip a file chunk by chunk, so it is never held in memory whole"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, _GZIP_WBITS)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.flush()
+
+
+def file_response(request: Request, path: str, media_type: str) -> Response:
+    """
+    Stream a file from disk, gzipped on the fly when the client accepts it
+    Args:
+        request: Incoming request (for Accept-Encoding)
+        path: File to send
+        media_type: Its content type
+    """
+    filename = os.path.basename(path)
+    if os.path.getsize(path) >= JOB_RESULT_GZIP_MIN_BYTES and accepts_gzip(request):
+        return StreamingResponse(_gzip_file(path), media_type=media_type, headers={
+            "Content-Encoding": "gzip",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Vary": "Accept-Encoding",
+        })
+    return FileResponse(path, media_type=media_type, filename=filename, headers={"Vary": "Accept-Encoding"})
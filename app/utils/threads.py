@@ -0,0 +1,108 @@
+"""
+CPU thread budget
+Splits the available cores between conversion workers so concurrent
+Docling runs do not each start a thread per core
+"""
+import os
+import logging
+from typing import Dict, Any
+
+from ..config import (
+    PDF_WORKER_PROCESSES,
+    PDF_BATCH_CONCURRENCY,
+    CPU_RESERVED_CORES,
+    CONVERSION_THREADS_PER_WORKER
+)
+
+logger = logging.getLogger(__name__)
+
+# Read by OpenMP (torch, tesseract), MKL, OpenBLAS and numexpr when their pools start
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OMP_THREAD_LIMIT",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS"
+)
+
+
+def available_cores() -> int:
+    """CPUs this process may use (CPU affinity and cgroup quota, not host core count)"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    # cgroup v2 quota, e.g. "400000 100000" for a 4-CPU container limit
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+
+    return cores
+
+
+def thread_budget() -> Dict[str, Any]:
+    """
+    Intra-op threads each conversion worker may use
+    Returns:
+        Dict with cores, reserved_cores, conversion_workers, threads_per_worker and source
+    """
+    cores = available_cores()
+    # In-process conversions (no pool) run PDF_BATCH_CONCURRENCY at a time
+    workers = PDF_WORKER_PROCESSES if PDF_WORKER_PROCESSES > 0 else PDF_BATCH_CONCURRENCY
+    usable = max(1, cores - CPU_RESERVED_CORES)
+
+    if CONVERSION_THREADS_PER_WORKER > 0:
+        threads, source = CONVERSION_THREADS_PER_WORKER, "config"
+    else:
+        threads, source = max(1, usable // max(1, workers)), "auto"
+
+    return {
+        "cores": cores,
+        "reserved_cores": CPU_RESERVED_CORES,
+        "conversion_workers": workers,
+        "threads_per_worker": threads,
+        "source": source
+    }
+
+
+def apply_thread_limits(threads: int) -> Dict[str, Any]:
+    """
+    Cap numeric library thread pools in this process
+    Environment variables only affect pools that have not started yet, so
+    call this before Docling runs anything; torch and threadpoolctl limits
+    also apply to libraries that are already loaded.
+    Args:
+        threads: Intra-op threads to allow
+    Returns:
+        What was applied, for logging
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    applied = {"threads": threads, "env": True, "torch": False, "threadpoolctl": False}
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only settable before torch runs its first parallel op
+            pass
+        applied["torch"] = True
+    except ImportError:
+        pass
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+        applied["threadpoolctl"] = True
+    except ImportError:
+        pass
+
+    logger.info(f"Thread limits applied in pid {os.getpid()}: {applied}")
+    return applied
@@ -0,0 +1,105 @@
+"""
+Job webhooks
+Delivers the signed completion callbacks queued by the job store
+(webhook_deliveries), retrying with exponential backoff
+"""
+import hmac
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Any
+
+import httpx
+
+from .config import (
+    WEBHOOK_SECRET,
+    WEBHOOK_TIMEOUT_SEC,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_BACKOFF_SEC,
+    WEBHOOK_BACKOFF_MAX_SEC,
+    WEBHOOK_POLL_SEC
+)
+from .jobs import claim_webhook_deliveries, record_webhook_attempt
+
+logger = logging.getLogger(__name__)
+
+# Worth another attempt; any other 4xx means the receiver rejected the callback
+RETRY_STATUS_CODES = {408, 429}
+
+
+def sign(body: bytes, timestamp: int, secret: str = WEBHOOK_SECRET) -> str:
+    """
+    Signature header value for a webhook body
+    Args:
+        body: Exact request body
+        timestamp: Unix time the signature was made (receivers reject stale ones)
+        secret: Shared secret
+    Returns:
+        "t=<timestamp>,v1=<hex HMAC-SHA256 of '<timestamp>.<body>'>"
+    """
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds before the next attempt after `attempts` failures (exponential, with jitter)"""
+    delay = min(WEBHOOK_BACKOFF_MAX_SEC, WEBHOOK_BACKOFF_SEC * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def deliver(client: httpx.AsyncClient, delivery: Dict[str, Any]):
+    """
+    Make one delivery attempt and record the outcome
+    Args:
+        client: Shared HTTP client
+        delivery: Claimed delivery (see jobs.claim_webhook_deliveries)
+    """
+    body = delivery["payload"].encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "X-Webhook-Event": delivery["event"],
+        "X-Webhook-Delivery": delivery["id"],
+        "X-Webhook-Signature": sign(body, int(time.time())),
+    }
+    attempts = delivery["attempts"] + 1
+    status_code = error = None
+
+    try:
+        response = await client.post(delivery["url"], content=body, headers=headers)
+        status_code = response.status_code
+        if response.is_success:
+            await asyncio.to_thread(record_webhook_attempt, delivery["id"], True, status_code)
+            logger.info(f"[WEBHOOK {delivery['job_id']}] ✅ {delivery['event']} delivered to {delivery['url']}")
+            return
+        error = f"HTTP {status_code}"
+        retryable = status_code >= 500 or status_code in RETRY_STATUS_CODES
+    except httpx.HTTPError as e:
+        error = f"{type(e).__name__}: {e}"
+        retryable = True
+
+    retry_at = time.time() + backoff_delay(attempts) if retryable and attempts < WEBHOOK_MAX_ATTEMPTS else None
+    await asyncio.to_thread(record_webhook_attempt, delivery["id"], False, status_code, error, retry_at)
+    if retry_at:
+        logger.warning(
+            f"[WEBHOOK {delivery['job_id']}] Attempt {attempts} to {delivery['url']} failed ({error}), "
+            f"retrying in {retry_at - time.time():.0f}s"
+        )
+    else:
+        logger.error(f"[WEBHOOK {delivery['job_id']}] ❌ Giving up on {delivery['url']} after {attempts} attempts ({error})")
+
+
+async def delivery_loop(batch_size: int = 20):
+    """Send due deliveries every WEBHOOK_POLL_SEC (runs in the job worker)"""
+    async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT_SEC, follow_redirects=False) as client:
+        while True:
+            try:
+                # Leased past the request timeout so another worker never sends the same attempt
+                deliveries = await asyncio.to_thread(claim_webhook_deliveries, batch_size, WEBHOOK_TIMEOUT_SEC * 3)
+                if deliveries:
+                    await asyncio.gather(*(deliver(client, delivery) for delivery in deliveries))
+                    continue
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook delivery loop error: {e}")
+            await asyncio.sleep(WEBHOOK_POLL_SEC)
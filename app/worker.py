@@ -0,0 +1,449 @@
+"""
+Job worker
+Claims queued async jobs from the job store and runs them, so heavy
+conversions and brand voice generation never run inside a web worker
+
+Usage:
+    python -m app.worker [concurrency]
+
+Runs up to JOB_WORKER_CONCURRENCY jobs at a time (highest priority first,
+FIFO within a priority). Page runs go to this process's conversion pool;
+scale out by running more worker processes against the same JOB_DB_PATH.
+"""
+import os
+import sys
+import time
+import uuid
+import shutil
+import signal
+import hashlib
+import socket
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+from app.config import (
+    JOB_OUTPUT_DIR,
+    JOB_WORKER_CONCURRENCY,
+    JOB_POLL_INTERVAL_SEC,
+    JOB_HEARTBEAT_SEC,
+    JOB_CANCEL_POLL_SEC
+)
+from app.models import ExtractRequest
+from app.jobs import (
+    JobStatus,
+    JOB_EXPORTS,
+    get_job,
+    find_job_by_content,
+    update_job,
+    complete_job,
+    fail_job,
+    claim_next_job,
+    heartbeat,
+    cancelled_jobs,
+    requeue_stale_jobs,
+    save_checkpoint,
+    load_checkpoints,
+    job_export_path,
+    remove_job_exports
+)
+from app.utils.downloads import fetch_source, close_client
+from app.utils.cancellation import Cancelled, ShouldAbort, raise_if_cancelled, run_cancellable
+from app.services import (
+    pdf_processor, csv_parser, image_processor, text_processor, url_scraper,
+    brand_voice, worker_pool, readiness
+)
+from app import webhooks
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def content_sha256(file_content: Optional[bytes], path: Optional[str]) -> str:
+    """SHA-256 of a downloaded document, in memory or spooled to disk"""
+    digest = hashlib.sha256()
+    if file_content is not None:
+        digest.update(file_content)
+    else:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def identical_job(job_id: str, content_hash: str, should_abort: ShouldAbort = None) -> Optional[dict]:
+    """
+    Completed job with the same document content and options, waiting for it while in flight
+    Args:
+        job_id: Job about to convert
+        content_hash: SHA-256 of its document
+        should_abort: Stop waiting when this job is cancelled
+    Returns:
+        The other job (with result), or None when there is none or it failed
+    """
+    other = await asyncio.to_thread(find_job_by_content, job_id, content_hash)
+    if other and other['status'] != JobStatus.COMPLETED:
+        await asyncio.to_thread(
+            update_job, job_id, progress_message=f"Waiting for identical job {other['id']}..."
+        )
+    while other and other['status'] in (JobStatus.PENDING, JobStatus.PROCESSING):
+        raise_if_cancelled(should_abort, "Waiting for identical job")
+        await asyncio.sleep(JOB_POLL_INTERVAL_SEC * 2)
+        other = await asyncio.to_thread(get_job, other['id'], True)
+    if other and other['status'] == JobStatus.COMPLETED and other['result']:
+        return other
+    return None
+
+
+def reuse_result(job_id: str, other: dict) -> dict:
+    """Result of an identical job, with its exports linked under this job's id"""
+    result = dict(other['result'])
+    for export in JOB_EXPORTS:
+        url_key = f"{export}_url"
+        if not result.get(url_key):
+            continue
+        source, target = job_export_path(other['id'], export), job_export_path(job_id, export)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        result[url_key] = f"/convert/result/{job_id}/{export}"
+    result["deduplicated_from"] = other['id']
+    return result
+
+
+async def generate_brand_voice(
+    job_id: str,
+    products: list,
+    category: str,
+    should_abort: ShouldAbort = None,
+    start_progress: int = 90
+) -> list:
+    """
+    Brand voice for a job's products, checkpointed per product in the job store
+    A job requeued after its worker died picks up where the last run stopped;
+    a cancelled one stops before its next product (raises Cancelled).
+    Job progress moves from start_progress towards 99 as products finish
+    """
+    done = await asyncio.to_thread(load_checkpoints, job_id, "brand_voice")
+    if done:
+        logger.info(f"[JOB {job_id}] Resuming brand voice ({len(done)} products already generated)")
+    total = len(products)
+    finished = min(len(done), total)
+
+    def on_generated(key: str, product: dict):
+        nonlocal finished
+        save_checkpoint(job_id, "brand_voice", key, product)
+        finished += 1
+        update_job(
+            job_id,
+            progress=start_progress + (99 - start_progress) * finished // max(total, 1),
+            progress_message=f"Generating brand voice ({finished}/{total} products)..."
+        )
+
+    return await brand_voice.generate(
+        products, category,
+        done=done,
+        on_generated=on_generated,
+        should_abort=should_abort
+    )
+
+
+async def process_pdf_job(job_id: str, abort: threading.Event = None):
+    """
+    Run a full Docling extraction for a claimed job
+    Args:
+        job_id: Job to process (request.upload_path, else request.file_url, is the source)
+        abort: Set when the job is cancelled; the download, conversion runs
+            and brand voice step stop at their next check
+    """
+    logger.info(f"[JOB {job_id}] Starting processing...")
+
+    job = await asyncio.to_thread(get_job, job_id)
+    req = ExtractRequest(**job['request'])
+    tmp_path = job['request'].get('upload_path')
+    should_abort = (abort or threading.Event()).is_set
+
+    try:
+        start_time = time.time()
+        category = req.category or "Electricals"
+        download_ms = 0.0
+        file_content = None
+
+        if tmp_path is None:
+            await asyncio.to_thread(update_job, job_id, progress=5, progress_message="Downloading PDF...")
+            download_start = time.time()
+            downloaded = await fetch_source(req.file_url, should_abort=should_abort)
+            download_ms = round((time.time() - download_start) * 1000, 1)
+            if isinstance(downloaded, str):
+                tmp_path = downloaded
+            else:
+                file_content = downloaded
+
+        if req.dedupe:
+            # Same document under another URL (or uploaded again) with the same options
+            content_hash = await asyncio.to_thread(content_sha256, file_content, tmp_path)
+            other = await identical_job(job_id, content_hash, should_abort)
+            if other:
+                result = await asyncio.to_thread(reuse_result, job_id, other)
+                await asyncio.to_thread(complete_job, job_id, result)
+                logger.info(f"[JOB {job_id}] ♻️ Reused result of identical job {other['id']}")
+                return
+
+        await asyncio.to_thread(
+            update_job, job_id, progress=20, progress_message="Extracting content (this may take 2-3 minutes)..."
+        )
+
+        # Exports go to disk and are served by /convert/result/{job_id}/{export}
+        os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+        exports = {
+            "markdown_path": job_export_path(job_id, "markdown") if req.return_markdown else None,
+            "json_path": job_export_path(job_id, "document") if req.return_json else None,
+        }
+
+        if tmp_path:
+            extraction = await pdf_processor.process_source(
+                tmp_path, category, req.force_full_ocr, req.profile,
+                batch_size=req.batch_size, run_timeout=req.per_batch_timeout_sec,
+                should_abort=should_abort, **exports
+            )
+            extraction["staging"] = "spool"
+        else:
+            extraction = await pdf_processor.process_content(
+                file_content, category, req.force_full_ocr, req.profile,
+                batch_size=req.batch_size, run_timeout=req.per_batch_timeout_sec,
+                should_abort=should_abort, **exports
+            )
+        products = extraction["products"]
+
+        raise_if_cancelled(should_abort, "Brand voice")
+        await asyncio.to_thread(update_job, job_id, progress=90, progress_message="Generating brand voice...")
+
+        try:
+            products = await generate_brand_voice(job_id, products, category, should_abort)
+        except Cancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"[JOB {job_id}] Brand voice failed: {e}")
+
+        await asyncio.to_thread(complete_job, job_id, {
+            "success": True,
+            "products": products,
+            "pages_processed": extraction["pages_processed"],
+            "ocr_pages": extraction["ocr_pages"],
+            "timed_out_pages": extraction["timed_out_pages"],
+            "crashed_pages": extraction["crashed_pages"],
+            "profile": extraction["profile"],
+            "markdown_chars": extraction["markdown_chars"],
+            "markdown_url": f"/convert/result/{job_id}/markdown" if req.return_markdown else None,
+            "document_url": f"/convert/result/{job_id}/document" if req.return_json else None,
+            "peak_rss_mb": extraction["peak_rss_mb"],
+            "processing_time_seconds": round(time.time() - start_time, 1),
+            "timings": {
+                "staging": extraction["staging"],
+                "download_ms": download_ms,
+                "staging_ms": extraction.get("staging_ms", 0.0),
+                "convert_ms": extraction["convert_ms"],
+            },
+        })
+
+        logger.info(f"[JOB {job_id}] ✅ Completed in {round(time.time() - start_time, 1)}s")
+
+    except Cancelled as e:
+        # Status is already CANCELLED; just drop what was produced
+        logger.info(f"[JOB {job_id}] 🛑 {e}")
+        await asyncio.to_thread(remove_job_exports, job_id)
+
+    except Exception as e:
+        logger.error(f"[JOB {job_id}] ❌ Failed: {e}", exc_info=True)
+        await asyncio.to_thread(fail_job, job_id, str(e))
+        await asyncio.to_thread(remove_job_exports, job_id)
+
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+async def ingest_products(kind: str, request: dict, should_abort: ShouldAbort = None) -> list:
+    """
+    Extract products from a non-PDF job's source
+    Args:
+        kind: csv, image, text or url
+        request: Job request (upload_path for csv/image uploads)
+        should_abort: Cancels an in-flight page scrape or vision request
+    Returns:
+        Extracted products
+    """
+    category = request['category']
+    if kind == "text":
+        return await text_processor.process(request['text'], category)
+    if kind == "url":
+        return await run_cancellable(url_scraper.scrape(request['url'], category), should_abort, "Scrape")
+
+    with open(request['upload_path'], "rb") as f:
+        file_content = f.read()
+    if kind == "csv":
+        return await csv_parser.process(file_content, category)
+    if kind == "image":
+        return await run_cancellable(image_processor.process(
+            file_content, category, request.get('filename') or "",
+            additional_context=request.get('additional_text', "")
+        ), should_abort, "Image extraction")
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+async def process_ingest_job(job_id: str, abort: threading.Event = None):
+    """
+    Run a CSV, image, text or URL job: extraction, then brand voice
+    Args:
+        job_id: Job to process
+        abort: Set when the job is cancelled; stops the scrape or vision request
+            and brand voice at their next check
+    """
+    job = await asyncio.to_thread(get_job, job_id)
+    kind = job['kind']
+    upload_path = job['request'].get('upload_path')
+    should_abort = (abort or threading.Event()).is_set
+    logger.info(f"[JOB {job_id}] Starting {kind} processing...")
+
+    try:
+        start_time = time.time()
+        await asyncio.to_thread(
+            update_job, job_id, progress=10, progress_message=f"Extracting products from {kind}..."
+        )
+        products = await ingest_products(kind, job['request'], should_abort)
+
+        raise_if_cancelled(should_abort, "Brand voice")
+        await asyncio.to_thread(
+            update_job, job_id, progress=50, progress_message=f"Generating brand voice for {len(products)} products..."
+        )
+
+        try:
+            products = await generate_brand_voice(
+                job_id, products, job['request']['category'], should_abort, start_progress=50
+            )
+        except Cancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"[JOB {job_id}] Brand voice failed: {e}")
+
+        await asyncio.to_thread(complete_job, job_id, {
+            "success": True,
+            "products": products,
+            "processing_time_seconds": round(time.time() - start_time, 1),
+        })
+
+        logger.info(f"[JOB {job_id}] ✅ Completed {len(products)} products in {round(time.time() - start_time, 1)}s")
+
+    except Cancelled as e:
+        logger.info(f"[JOB {job_id}] 🛑 {e}")
+
+    except Exception as e:
+        logger.error(f"[JOB {job_id}] ❌ Failed: {e}", exc_info=True)
+        await asyncio.to_thread(fail_job, job_id, str(e))
+
+    finally:
+        if upload_path:
+            try:
+                os.remove(upload_path)
+            except OSError:
+                pass
+
+
+async def heartbeat_loop(running: Dict[str, asyncio.Task]):
+    """Keep claimed jobs alive and requeue jobs of workers that died"""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SEC)
+        try:
+            await asyncio.to_thread(heartbeat, list(running))
+            await asyncio.to_thread(requeue_stale_jobs)
+        except Exception as e:
+            logger.warning(f"⚠️ Heartbeat failed: {e}")
+
+
+async def cancellation_loop(aborts: Dict[str, threading.Event]):
+    """Signal running jobs that were cancelled through the API"""
+    while True:
+        await asyncio.sleep(JOB_CANCEL_POLL_SEC)
+        try:
+            for job_id in await asyncio.to_thread(cancelled_jobs, list(aborts)):
+                abort = aborts.get(job_id)
+                if abort and not abort.is_set():
+                    logger.info(f"[JOB {job_id}] Cancellation requested, aborting")
+                    abort.set()
+        except Exception as e:
+            logger.warning(f"⚠️ Cancellation check failed: {e}")
+
+
+async def run(concurrency: int = JOB_WORKER_CONCURRENCY):
+    """
+    Claim and run jobs until SIGTERM/SIGINT, then let running jobs finish
+    Args:
+        concurrency: Jobs run at the same time
+    """
+    await readiness.startup()
+    state = readiness.readiness()
+    if not state["ready"]:
+        raise RuntimeError(state["error"])
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await asyncio.to_thread(requeue_stale_jobs)
+    running: Dict[str, asyncio.Task] = {}
+    aborts: Dict[str, threading.Event] = {}
+    slots = asyncio.Semaphore(concurrency)
+    beat = asyncio.create_task(heartbeat_loop(running))
+    callbacks = asyncio.create_task(webhooks.delivery_loop())
+    cancellations = asyncio.create_task(cancellation_loop(aborts))
+    logger.info(f"👷 Job worker {WORKER_ID} started ({concurrency} concurrent jobs)")
+
+    while not stopping.is_set():
+        await slots.acquire()
+        if stopping.is_set():
+            slots.release()
+            break
+        job = await asyncio.to_thread(claim_next_job, WORKER_ID)
+        if job is None:
+            slots.release()
+            try:
+                await asyncio.wait_for(stopping.wait(), JOB_POLL_INTERVAL_SEC)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        wait_seconds = (job['started_at'] - job['created_at']).total_seconds()
+        logger.info(
+            f"[JOB {job['id']}] Claimed {job['kind']} job (priority {job['priority']}, waited {wait_seconds:.1f}s)"
+        )
+        aborts[job['id']] = threading.Event()
+        process = process_pdf_job if job['kind'] == "pdf" else process_ingest_job
+        task = asyncio.create_task(process(job['id'], aborts[job['id']]))
+        running[job['id']] = task
+        task.add_done_callback(
+            lambda _, job_id=job['id']: (running.pop(job_id, None), aborts.pop(job_id, None), slots.release())
+        )
+
+    logger.info(f"Stopping job worker {WORKER_ID}, waiting for {len(running)} running jobs")
+    if running:
+        await asyncio.gather(*running.values(), return_exceptions=True)
+    beat.cancel()
+    callbacks.cancel()
+    cancellations.cancel()
+    await close_client()
+    worker_pool.shutdown_pools()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else JOB_WORKER_CONCURRENCY))
@@ -0,0 +1,63 @@
+"""
+Benchmark the shared keyword matcher against per-keyword substring loops
+
+Usage:
+    python scripts/bench_keyword_matcher.py [brands] [text_kb]
+
+Builds a synthetic dictionary of N brand names (default 5000), a product
+text of the given size, and compares:
+    loop    - lowercase the text and test `brand.lower() in text` per brand
+              (what extract_brand / extract_colours used to do)
+    matcher - one Aho-Corasick scan returning every match with positions
+"""
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.keyword_matcher import KeywordMatcher  # noqa: E402
+
+
+def random_word(rng: random.Random, low: int = 4, high: int = 10) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def main(brand_count: int, text_kb: int):
+    rng = random.Random(42)
+    brands = sorted({random_word(rng).title() + ("" if i % 3 else " " + random_word(rng).title())
+                     for i in range(brand_count)})
+
+    words = [random_word(rng, 2, 9) for _ in range(text_kb * 180)]
+    for i in range(0, len(words), 200):
+        words[i] = rng.choice(brands)
+    text = " ".join(words)[:text_kb * 1024]
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher({"brand": brands})
+    build_time = time.perf_counter() - start
+
+    runs = 5
+    start = time.perf_counter()
+    for _ in range(runs):
+        text_lower = text.lower()
+        loop_found = [brand for brand in brands if brand.lower() in text_lower]
+    loop_time = (time.perf_counter() - start) / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        matches = matcher.find_all(text, "brand")
+    matcher_time = (time.perf_counter() - start) / runs
+
+    print(f"Dictionary: {len(brands)} brands, text: {len(text) / 1024:.0f}KB")
+    print(f"Matcher build: {build_time * 1000:.1f}ms (once per process)")
+    print(f"loop:    {loop_time * 1000:8.1f}ms  {len(loop_found)} brands (substring hits, no positions)")
+    print(f"matcher: {matcher_time * 1000:8.1f}ms  {len({m['keyword'] for m in matches})} brands, "
+          f"{len(matches)} whole-word matches with positions")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 5000, args[1] if len(args) > 1 else 64)
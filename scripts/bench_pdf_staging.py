@@ -0,0 +1,81 @@
+"""
+Benchmark upload-to-convert latency for each PDF staging path
+
+Usage:
+    python scripts/bench_pdf_staging.py /path/to/pdfs [profile]
+
+For every PDF, measures the time from having the upload bytes in hand to
+Docling returning a result when the PDF is:
+    disk   - written to a NamedTemporaryFile in the default temp dir (old path)
+    spool  - written to PDF_SPOOL_DIR (tmpfs when available)
+    memory - passed as an in-memory DocumentStream
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import PDF_SPOOL_DIR  # noqa: E402
+from app.services import pdf_processor, docling_converters  # noqa: E402
+
+
+def stage_to_file(content: bytes, directory: str = None) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", dir=directory) as tmp:
+        tmp.write(content)
+        return tmp.name
+
+
+def time_path(content: bytes, mode: str, profile: str) -> tuple:
+    start = time.perf_counter()
+    if mode == "memory":
+        source = content
+    else:
+        source = stage_to_file(content, PDF_SPOOL_DIR if mode == "spool" else None)
+    staged = time.perf_counter()
+    try:
+        pdf_processor.convert_pdf(source, profile=profile)
+    finally:
+        if mode != "memory":
+            os.unlink(source)
+    done = time.perf_counter()
+    return (staged - start) * 1000, (done - start) * 1000
+
+
+def main(corpus_dir: str, profile: str):
+    pdfs = sorted(Path(corpus_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {corpus_dir}")
+        return
+
+    docling_converters.get_converter(profile, do_ocr=True)
+    docling_converters.get_converter(profile, do_ocr=False)
+
+    modes = ("disk", "spool", "memory")
+    totals = {mode: [0.0, 0.0] for mode in modes}
+
+    print(f"Spool dir: {PDF_SPOOL_DIR}")
+    print(f"{'file':36} {'MB':>6} " + " ".join(f"{m + ' stage/total ms':>24}" for m in modes))
+    for pdf in pdfs:
+        content = pdf.read_bytes()
+        cells = []
+        for mode in modes:
+            stage_ms, total_ms = time_path(content, mode, profile)
+            totals[mode][0] += stage_ms
+            totals[mode][1] += total_ms
+            cells.append(f"{stage_ms:>11.1f}/{total_ms:<12.1f}")
+        print(f"{pdf.name[:36]:36} {len(content) / 1048576:>6.1f} " + " ".join(cells))
+
+    print()
+    for mode in modes:
+        stage_ms, total_ms = totals[mode]
+        print(f"{mode:6}: staging {stage_ms / len(pdfs):.1f}ms avg, upload-to-convert {total_ms / len(pdfs):.1f}ms avg")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
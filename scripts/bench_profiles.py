@@ -0,0 +1,72 @@
+"""
+Benchmark Docling pipeline profiles
+
+Usage:
+    python scripts/bench_profiles.py /path/to/pdfs [fast balanced accurate]
+
+For each profile prints pages/sec and extraction quality: products found,
+markdown table rows, and SKU recall when a ground-truth sidecar file
+(<name>.skus.txt, one SKU per line) sits next to the PDF.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import PDF_PIPELINE_PROFILES  # noqa: E402
+from app.services import pdf_processor, docling_converters  # noqa: E402
+
+
+def load_expected_skus(pdf: Path) -> set:
+    sidecar = pdf.with_suffix(".skus.txt")
+    if not sidecar.exists():
+        return set()
+    return {line.strip() for line in sidecar.read_text().splitlines() if line.strip()}
+
+
+def main(corpus_dir: str, profiles: list):
+    pdfs = sorted(Path(corpus_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {corpus_dir}")
+        return
+
+    print(f"{'profile':10} {'pages/s':>8} {'products':>9} {'table rows':>11} {'sku recall':>11}")
+    for profile in profiles:
+        # Warm both OCR variants so model loading is not counted
+        docling_converters.get_converter(profile, do_ocr=True)
+        docling_converters.get_converter(profile, do_ocr=False)
+
+        elapsed = 0.0
+        pages = 0
+        products = 0
+        table_rows = 0
+        expected_total = 0
+        found_total = 0
+
+        for pdf in pdfs:
+            start = time.perf_counter()
+            conversion = pdf_processor.convert_pdf(str(pdf), profile=profile)
+            elapsed += time.perf_counter() - start
+            pages += conversion["pages_processed"]
+
+            markdown = conversion["markdown"]
+            extracted = pdf_processor.extract_products_from_markdown(markdown, "Electricals")
+            products += len(extracted)
+            table_rows += sum(1 for line in markdown.splitlines() if line.startswith("|"))
+
+            expected = load_expected_skus(pdf)
+            if expected:
+                expected_total += len(expected)
+                found_total += len(expected & {p["sku"] for p in extracted})
+
+        recall = f"{found_total / expected_total:.1%}" if expected_total else "n/a"
+        rate = pages / elapsed if elapsed else 0.0
+        print(f"{profile:10} {rate:>8.2f} {products:>9} {table_rows:>11} {recall:>11}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2:] or list(PDF_PIPELINE_PROFILES))
@@ -0,0 +1,98 @@
+"""
+Benchmark markdown product segmentation on large catalogues
+
+Usage:
+    python scripts/bench_segmentation.py [products ...]
+
+Builds synthetic Docling-style markdown (headings, bullets, spec lines and
+price-list table rows) and compares the single-pass segmenter with the
+previous per-SKU text.find() approach, which also capped output at 20.
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import pdf_processor  # noqa: E402
+
+BRANDS = ["Sage", "Smeg", "Dualit", "Kenwood", "Zwilling", "Le Creuset"]
+TYPES = ["Coffee Machine", "Kettle", "Toaster", "Stand Mixer", "Air Fryer", "Grill"]
+
+
+def build_markdown(products: int) -> str:
+    parts = ["# Supplier Catalogue\n\nIntroduction text for the range.\n"]
+    for i in range(products):
+        brand = BRANDS[i % len(BRANDS)]
+        kind = TYPES[i % len(TYPES)]
+        sku = f"SKU{100000 + i}X{i % 10}"
+        if i % 3 == 0:
+            # Price-list row
+            parts.append(f"| {sku} | {brand} {kind} | {1000 + i % 900}W | 1.{i % 9}L |\n")
+        else:
+            parts.append(
+                f"\n## {brand} {kind} Model {i}\n"
+                f"Code: {sku}\n"
+                f"- Feature one for the {kind.lower()} model {i}\n"
+                f"- Feature two with extra detail for model {i}\n"
+                f"Dimensions {200 + i % 50} x {300 + i % 40} x {150 + i % 30} mm, "
+                f"weight {1 + i % 5}.{i % 10}kg\n"
+            )
+    return "".join(parts)
+
+
+def legacy_extract(markdown: str, category: str) -> list:
+    """Previous implementation: unique SKUs, text.find per SKU, capped at 20"""
+    products = []
+    skus_found = list(set(re.findall(r'\b([A-Z]{2,4}[0-9]{3,}[A-Z0-9]{2,})\b', markdown)))
+    for sku in skus_found[:20]:
+        idx = markdown.find(sku)
+        context = markdown[max(0, idx - 250):idx + len(sku) + 250]
+        products.append({
+            "name": pdf_processor.extract_product_name(context) or f"Product {sku}",
+            "brand": pdf_processor.extract_brand(context),
+            "sku": sku,
+            "category": category,
+            "features": pdf_processor.extract_features(context),
+            "specifications": pdf_processor.extract_specifications(context),
+        })
+    return products
+
+
+def legacy_extract_uncapped(markdown: str, category: str) -> list:
+    """Previous implementation without the 20-product cap (shows the quadratic cost)"""
+    products = []
+    for sku in set(re.findall(r'\b([A-Z]{2,4}[0-9]{3,}[A-Z0-9]{2,})\b', markdown)):
+        idx = markdown.find(sku)
+        context = markdown[max(0, idx - 250):idx + len(sku) + 250]
+        products.append({"sku": sku, "specifications": pdf_processor.extract_specifications(context)})
+    return products
+
+
+def main(sizes: list):
+    print(f"{'products':>9} {'MB':>6} {'legacy s':>9} {'found':>6} {'uncapped s':>11} {'single-pass s':>14} {'found':>6}")
+    for size in sizes:
+        markdown = build_markdown(size)
+
+        start = time.perf_counter()
+        legacy = legacy_extract(markdown, "Electricals")
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        legacy_uncapped_extract = legacy_extract_uncapped(markdown, "Electricals")
+        uncapped_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = pdf_processor.extract_products_from_markdown(markdown, "Electricals")
+        single_time = time.perf_counter() - start
+
+        assert len(legacy_uncapped_extract) == size
+        print(
+            f"{size:>9} {len(markdown) / 1048576:>6.2f} {legacy_time:>9.3f} {len(legacy):>6} "
+            f"{uncapped_time:>11.3f} {single_time:>14.3f} {len(single):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000, 20000])
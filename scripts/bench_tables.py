@@ -0,0 +1,78 @@
+"""
+Compare table-driven and regex product extraction on table-heavy catalogues
+
+Usage:
+    python scripts/bench_tables.py /path/to/pdfs [profile]
+
+Converts each PDF once, then times both extraction paths on the same
+conversion output:
+    regex  - extract_products_from_markdown over the flattened markdown
+    tables - extract_products_from_tables over Docling's cell grids
+Recall is measured against <name>.skus.txt sidecars (one SKU per line).
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import pdf_processor  # noqa: E402
+
+
+def load_expected_skus(pdf: Path) -> set:
+    sidecar = pdf.with_suffix(".skus.txt")
+    if not sidecar.exists():
+        return set()
+    return {line.strip() for line in sidecar.read_text().splitlines() if line.strip()}
+
+
+def main(corpus_dir: str, profile: str):
+    pdfs = sorted(Path(corpus_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {corpus_dir}")
+        return
+
+    stats = {mode: {"seconds": 0.0, "products": 0, "found": 0} for mode in ("regex", "tables", "merged")}
+    expected_total = 0
+
+    print(f"{'file':36} {'tables':>6} {'regex n':>8} {'regex ms':>9} {'table n':>8} {'table ms':>9}")
+    for pdf in pdfs:
+        conversion = pdf_processor.convert_pdf(str(pdf), profile=profile)
+        expected = load_expected_skus(pdf)
+        expected_total += len(expected)
+
+        start = time.perf_counter()
+        regex_products = pdf_processor.extract_products_from_markdown(conversion["markdown"], "Electricals")
+        regex_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        table_products = pdf_processor.extract_products_from_tables(conversion["tables"], "Electricals")
+        table_time = time.perf_counter() - start
+
+        merged = pdf_processor.merge_products(table_products, regex_products)
+
+        for mode, products, seconds in (
+            ("regex", regex_products, regex_time),
+            ("tables", table_products, table_time),
+            ("merged", merged, regex_time + table_time),
+        ):
+            stats[mode]["seconds"] += seconds
+            stats[mode]["products"] += len(products)
+            stats[mode]["found"] += len(expected & {p["sku"] for p in products})
+
+        print(
+            f"{pdf.name[:36]:36} {len(conversion['tables']):>6} {len(regex_products):>8} "
+            f"{regex_time * 1000:>9.1f} {len(table_products):>8} {table_time * 1000:>9.1f}"
+        )
+
+    print()
+    for mode, values in stats.items():
+        recall = f"{values['found'] / expected_total:.1%}" if expected_total else "n/a"
+        print(f"{mode:7}: {values['products']} products, {values['seconds'] * 1000:.1f}ms, SKU recall {recall}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,69 @@
+"""
+Benchmark text-layer detection against full OCR conversion
+
+Usage:
+    python scripts/bench_text_layer.py /path/to/mixed/pdfs
+
+Converts every PDF twice (forced full OCR, then text-layer auto selection)
+and prints pages/sec for each mode plus how many pages still needed OCR.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import pdf_processor, text_layer, docling_converters  # noqa: E402
+
+
+def main(corpus_dir: str):
+    pdfs = sorted(Path(corpus_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {corpus_dir}")
+        return
+
+    # Warm both converters so model loading is not counted
+    docling_converters.get_converter(do_ocr=True)
+    docling_converters.get_converter(do_ocr=False)
+
+    totals = {"full_ocr": 0.0, "auto": 0.0, "scan": 0.0}
+    total_pages = 0
+    total_ocr_pages = 0
+
+    print(f"{'file':40} {'pages':>5} {'ocr':>4} {'scan s':>8} {'full s':>8} {'auto s':>8}")
+    for pdf in pdfs:
+        start = time.perf_counter()
+        pages = text_layer.scan_pages(str(pdf))
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pdf_processor.convert_pdf(str(pdf), force_full_ocr=True)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        auto = pdf_processor.convert_pdf(str(pdf))
+        auto_time = time.perf_counter() - start
+
+        totals["scan"] += scan_time
+        totals["full_ocr"] += full_time
+        totals["auto"] += auto_time
+        total_pages += len(pages)
+        total_ocr_pages += auto["ocr_pages"]
+
+        print(
+            f"{pdf.name[:40]:40} {len(pages):>5} {auto['ocr_pages']:>4} "
+            f"{scan_time:>8.2f} {full_time:>8.2f} {auto_time:>8.2f}"
+        )
+
+    print()
+    print(f"Pages: {total_pages} ({total_ocr_pages} needed OCR)")
+    print(f"Pre-scan:  {total_pages / totals['scan']:.1f} pages/sec" if totals["scan"] else "Pre-scan: n/a")
+    for mode in ("full_ocr", "auto"):
+        print(f"{mode:9}: {total_pages / totals[mode]:.2f} pages/sec ({totals[mode]:.1f}s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,95 @@
+"""
+Find the best conversion worker / thread split for this node
+
+Usage:
+    python scripts/bench_thread_budget.py /path/to/pdfs [workers,...] [threads,...]
+
+For every (workers, threads per worker) pair - defaults 1,2,4 workers and
+1,2,4,8 threads plus the automatic budget - starts a fresh interpreter
+with PDF_WORKER_PROCESSES / CONVERSION_THREADS_PER_WORKER set, warms the
+conversion pool, then converts the whole corpus with one document in
+flight per worker. "oversubscribed" gives every worker all cores (what
+happens without a budget). Reports pages per second; run it on each node
+size (8 and 16 cores) and put the winner in the deployment's env.
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def measure(corpus_dir: str):
+    """Runs inside a child interpreter with the pool settings already in the env"""
+    from app.services import pdf_processor, worker_pool, docling_converters
+    from app.utils.threads import thread_budget
+
+    pdfs = sorted(Path(corpus_dir).glob("*.pdf"))
+    pool = worker_pool.get_pool("conversion")
+    pool.warm()
+    with ThreadPoolExecutor(pool.size) as executor:
+        list(executor.map(lambda _: pool.run(docling_converters.preload, {}), range(pool.size)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(pool.size) as executor:
+        results = list(executor.map(lambda pdf: pdf_processor.convert_pdf(str(pdf)), pdfs))
+    seconds = time.perf_counter() - start
+    worker_pool.shutdown_pools()
+
+    pages = sum(result["pages_processed"] for result in results)
+    print(json.dumps({"pages": pages, "seconds": round(seconds, 2), "budget": thread_budget()}))
+
+
+def main(corpus_dir: str, worker_counts: list, thread_counts: list):
+    cores = len(os.sched_getaffinity(0))
+    print(f"{cores} cores available")
+    print(f"{'workers':>7} {'threads':>20} {'pages':>6} {'seconds':>8} {'pages/s':>8}")
+
+    best = None
+    for workers in worker_counts:
+        for threads in thread_counts + ["auto", "oversubscribed"]:
+            if isinstance(threads, int) and workers * threads > cores * 2:
+                continue
+            per_worker = {"auto": 0, "oversubscribed": cores}.get(threads, threads)
+            env = dict(
+                os.environ,
+                PDF_WORKER_PROCESSES=str(workers),
+                CONVERSION_THREADS_PER_WORKER=str(per_worker),
+                CPU_RESERVED_CORES="0" if threads == "oversubscribed" else os.getenv("CPU_RESERVED_CORES", "1")
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", corpus_dir],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rate = result["pages"] / result["seconds"] if result["seconds"] else 0.0
+            label = f"{result['budget']['threads_per_worker']} ({threads})" if isinstance(threads, str) else threads
+            print(f"{workers:>7} {label:>20} {result['pages']:>6} {result['seconds']:>8.1f} {rate:>8.2f}")
+            if best is None or rate > best[0]:
+                best = (rate, workers, result["budget"]["threads_per_worker"])
+
+    if best:
+        print(f"\nBest: PDF_WORKER_PROCESSES={best[1]} CONVERSION_THREADS_PER_WORKER={best[2]} ({best[0]:.2f} pages/s)")
+
+
+def parse_counts(arg: str) -> list:
+    return [int(value) for value in arg.split(",") if value]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "--measure":
+        measure(args[1])
+    elif args:
+        main(
+            args[0],
+            parse_counts(args[1]) if len(args) > 1 else [1, 2, 4],
+            parse_counts(args[2]) if len(args) > 2 else [1, 2, 4, 8]
+        )
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,95 @@
+"""
+Compare cold start and memory of the conversion pool per worker start method
+
+Usage:
+    python scripts/bench_worker_start.py [workers] [profile ...]
+
+For each WORKER_START_METHOD (a fresh interpreter per method), starts a
+conversion pool of N workers and times how long it takes until every
+worker has its Docling converters loaded:
+    spawn      - every worker imports Docling and loads its own model copy
+                 (same cost as running N uvicorn workers)
+    forkserver - the forkserver loads the models once and forks workers,
+                 which share the weights copy-on-write
+Then reports total RSS (double-counts shared pages) and total PSS (shared
+pages split between the processes that map them) across the pool,
+including the forkserver itself.
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def read_memory(pid: int) -> tuple:
+    """(rss, pss) in bytes for a process, from /proc/<pid>/smaps_rollup"""
+    rss = pss = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1]) * 1024
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1]) * 1024
+    return rss, pss
+
+
+def measure(workers: int, profiles: list):
+    """Runs inside a child interpreter with WORKER_START_METHOD already set"""
+    from multiprocessing import forkserver
+    from app.services import worker_pool, docling_converters
+
+    start = time.perf_counter()
+    pool = worker_pool.WorkerPool("conversion", workers)
+    pool.warm()
+    ready = time.perf_counter() - start
+
+    # One preload per worker: a no-op under forkserver, the real model load under spawn
+    with ThreadPoolExecutor(workers) as executor:
+        loads = list(executor.map(
+            lambda _: pool.run(docling_converters.preload, {"profiles": profiles}), range(workers)
+        ))
+    loaded = time.perf_counter() - start
+
+    pids = [worker.process.pid for worker in pool._workers.values()]
+    server_pid = getattr(forkserver._forkserver, "_forkserver_pid", None)
+    if server_pid:
+        pids.append(server_pid)
+    memory = [read_memory(pid) for pid in pids]
+    pool.shutdown()
+
+    print(json.dumps({
+        "ready_s": round(ready, 2),
+        "loaded_s": round(loaded, 2),
+        "worker_load_s": [round(sum(load.values()), 2) for load in loads],
+        "rss_mb": round(sum(rss for rss, _ in memory) / 1048576),
+        "pss_mb": round(sum(pss for _, pss in memory) / 1048576),
+    }))
+
+
+def main(workers: int, profiles: list):
+    print(f"{workers} workers, profiles {', '.join(profiles)}")
+    print(f"{'method':11} {'ready s':>8} {'loaded s':>9} {'total RSS MB':>13} {'total PSS MB':>13}")
+    for method in ("spawn", "forkserver"):
+        env = dict(os.environ, WORKER_START_METHOD=method, PDF_PRELOAD_PROFILES=",".join(profiles))
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", str(workers), *profiles],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{method:11} {result['ready_s']:>8.2f} {result['loaded_s']:>9.2f} "
+            f"{result['rss_mb']:>13} {result['pss_mb']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--measure":
+        measure(int(args[1]), args[2:] or ["balanced"])
+    else:
+        main(int(args[0]) if args else 4, args[1:] or ["balanced"])
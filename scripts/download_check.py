@@ -0,0 +1,166 @@
+"""
+Check the remote file downloader against a local HTTP server
+
+Usage:
+    python scripts/download_check.py
+
+Starts a throwaway server on localhost and runs app.utils.downloads.fetch_source
+against it: a cacheable file (then revalidated with a 304), a connection
+dropped halfway (resumed with a Range request), files over the size limit
+(declared and undeclared), a server too slow for the deadline and a 404.
+Limits are shrunk through the environment so the run takes a few seconds.
+"""
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update({
+    "DOWNLOAD_CACHE_DIR": tempfile.mkdtemp(prefix="download-cache-"),
+    "PDF_SPOOL_DIR": tempfile.mkdtemp(prefix="download-spool-"),
+    "PDF_STREAM_MAX_MB": "1",
+    "DOWNLOAD_MAX_MB": "5",
+    "DOWNLOAD_DEADLINE_SEC": "3",
+    "DOWNLOAD_READ_TIMEOUT_SEC": "2",
+})
+
+import httpx  # noqa: E402
+from app.utils.downloads import fetch_source, close_client, DownloadError  # noqa: E402
+
+BODY = os.urandom(3 * 1024 * 1024)
+ETAG = f'"{hashlib.sha256(BODY).hexdigest()[:16]}"'
+LAST_MODIFIED = "Mon, 06 Oct 2025 09:00:00 GMT"
+
+
+class Server(BaseHTTPRequestHandler):
+    # (path, status) of every response, to check what the client asked for
+    log = []
+    flaky_dropped = False
+
+    def reply(self, status, headers, body=b""):
+        Server.log.append((self.path, status))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        validators = {"ETag": ETAG, "Last-Modified": LAST_MODIFIED, "Accept-Ranges": "bytes"}
+
+        if self.path == "/file.pdf":
+            if self.headers.get("If-None-Match") == ETAG:
+                return self.reply(304, validators)
+            return self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY)
+
+        if self.path == "/flaky.pdf":
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range") == ETAG:
+                start = int(range_header.split("=")[1].rstrip("-"))
+                return self.reply(206, {
+                    **validators,
+                    "Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}",
+                    "Content-Length": len(BODY) - start,
+                }, BODY[start:])
+            if not Server.flaky_dropped:
+                # Promise the whole file, send half and hang up
+                Server.flaky_dropped = True
+                self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY[:len(BODY) // 2])
+                self.close_connection = True
+                return
+            return self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY)
+
+        if self.path == "/declared-huge.pdf":
+            return self.reply(200, {"Content-Length": 50 * 1024 * 1024})
+
+        if self.path == "/undeclared-huge.pdf":
+            Server.log.append((self.path, 200))
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for _ in range(60):
+                self.wfile.write(b"\0" * 128 * 1024)
+            return
+
+        if self.path == "/slow.pdf":
+            Server.log.append((self.path, 200))
+            self.send_response(200)
+            self.send_header("Content-Length", len(BODY))
+            self.end_headers()
+            for offset in range(0, len(BODY), 4096):
+                self.wfile.write(BODY[offset:offset + 4096])
+                time.sleep(0.5)
+            return
+
+        self.reply(404, {"Content-Length": 0})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def read(downloaded):
+    """Bytes of a fetch_source result (removing its spool file)"""
+    if isinstance(downloaded, bytes):
+        return downloaded
+    with open(downloaded, "rb") as f:
+        data = f.read()
+    os.remove(downloaded)
+    return data
+
+
+async def expect_error(url, errors):
+    try:
+        read(await fetch_source(url))
+    except errors as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+async def main(base):
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' ({detail})' if detail else ''}")
+
+    data = read(await fetch_source(f"{base}/file.pdf"))
+    check("download spooled past PDF_STREAM_MAX_MB", data == BODY)
+
+    data = read(await fetch_source(f"{base}/file.pdf"))
+    check("second download revalidated from cache", data == BODY and Server.log[-1] == ("/file.pdf", 304))
+
+    data = read(await fetch_source(f"{base}/flaky.pdf"))
+    check("dropped connection resumed with Range", data == BODY and ("/flaky.pdf", 206) in Server.log)
+
+    error = await expect_error(f"{base}/declared-huge.pdf", DownloadError)
+    check("declared size over DOWNLOAD_MAX_MB refused", error is not None, error)
+
+    error = await expect_error(f"{base}/undeclared-huge.pdf", DownloadError)
+    check("undeclared size over DOWNLOAD_MAX_MB stopped", error is not None, error)
+
+    start = time.monotonic()
+    error = await expect_error(f"{base}/slow.pdf", (DownloadError, httpx.TimeoutException))
+    check("slow server stopped at DOWNLOAD_DEADLINE_SEC", error is not None and time.monotonic() - start < 6, error)
+
+    error = await expect_error(f"{base}/missing.pdf", httpx.HTTPStatusError)
+    check("HTTP error status raised", error is not None, error)
+
+    leftovers = os.listdir(os.environ["PDF_SPOOL_DIR"])
+    check("no spool files left behind", not leftovers, ", ".join(leftovers))
+
+    await close_client()
+    return all(results)
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Server)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ok = asyncio.run(main(f"http://127.0.0.1:{server.server_address[1]}"))
+    server.shutdown()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,76 @@
+"""
+Local receiver for job webhooks
+
+Usage:
+    WEBHOOK_SECRET=... python scripts/webhook_receiver.py [port] [fail_first]
+
+Listens on http://localhost:<port>/ (default 9000), checks each delivery's
+X-Webhook-Signature against WEBHOOK_SECRET and prints the event. Answers
+500 to the first <fail_first> deliveries (default 0) to exercise the
+retry/backoff path. Point a job at it with
+    "callback_url": "http://localhost:9000/"
+and follow the attempts on /convert/webhooks/{job_id}.
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import hashlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Signatures older than this are rejected (replayed deliveries)
+TOLERANCE_SEC = 300
+
+
+def verify(signature_header: str, body: bytes) -> str:
+    """Check a signature header; returns "ok" or why it failed"""
+    try:
+        parts = dict(item.split("=", 1) for item in signature_header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return "malformed signature header"
+    if abs(time.time() - timestamp) > TOLERANCE_SEC:
+        return "stale timestamp"
+    expected = hmac.new(SECRET.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return "ok" if hmac.compare_digest(expected, parts.get("v1", "")) else "bad signature"
+
+
+class Receiver(BaseHTTPRequestHandler):
+    fail_remaining = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        check = verify(self.headers.get("X-Webhook-Signature", ""), body)
+        payload = json.loads(body or b"{}")
+
+        print(
+            f"{time.strftime('%H:%M:%S')} {self.headers.get('X-Webhook-Event')} "
+            f"delivery={self.headers.get('X-Webhook-Delivery')} signature={check}"
+        )
+        print(json.dumps(payload, indent=2))
+
+        if check != "ok":
+            status = 401
+        elif Receiver.fail_remaining > 0:
+            Receiver.fail_remaining -= 1
+            status = 500
+        else:
+            status = 204
+        print(f"-> {status}\n")
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    if not SECRET:
+        print("Set WEBHOOK_SECRET to the service's secret")
+        sys.exit(1)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    Receiver.fail_remaining = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    print(f"Listening on http://localhost:{port}/ (failing the first {Receiver.fail_remaining} deliveries)")
+    HTTPServer(("", port), Receiver).serve_forever()
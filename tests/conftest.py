@@ -0,0 +1,55 @@
+"""
+Shared test setup
+Points job storage, downloads and webhooks at throwaway settings before any
+app module reads its configuration. None of these tests need Docling.
+"""
+import os
+import tempfile
+import threading
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix="app-tests-")
+os.environ.update({
+    "JOB_OUTPUT_DIR": _TEST_DIR,
+    "JOB_DB_PATH": os.path.join(_TEST_DIR, "jobs.db"),
+    "PDF_SPOOL_DIR": os.path.join(_TEST_DIR, "spool"),
+    "DOWNLOAD_CACHE_DIR": os.path.join(_TEST_DIR, "downloads"),
+    "WEBHOOK_SECRET": "test-secret",
+    # Pool workers start from a clean interpreter instead of a Docling preload
+    "WORKER_START_METHOD": "spawn",
+})
+os.environ.pop("DOCLING_API_KEY", None)
+os.makedirs(os.environ["PDF_SPOOL_DIR"], exist_ok=True)
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    """app.jobs on an empty database of its own"""
+    from app import jobs
+
+    monkeypatch.setattr(jobs, "JOB_DB_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(jobs, "JOB_OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "_local", threading.local())
+    monkeypatch.setattr(jobs, "_schema_ready", False)
+    return jobs
+
+
+@pytest.fixture
+def pdf_job(job_store):
+    """Create a PDF job; pass result to complete it straight away"""
+    def create(result=None, **request):
+        job = job_store.create_job({"file_url": "https://example.com/a.pdf", **request})
+        if result is not None:
+            job_store.complete_job(job["id"], result)
+        return job
+    return create
+
+
+@pytest.fixture
+def client(job_store):
+    """API test client backed by job_store"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
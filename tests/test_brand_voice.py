@@ -0,0 +1,52 @@
+"""Checkpointed brand voice generation (app/services/brand_voice.py)"""
+import asyncio
+
+import pytest
+
+from app.services import brand_voice
+from app.utils.cancellation import Cancelled
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Names of products sent for generation (no OpenAI calls are made)"""
+    names = []
+
+    async def generate_single_product(product, category):
+        names.append(product["name"])
+        return {**product, "descriptions": {"shortDescription": f"<p>{product['name']}</p>"}}
+
+    monkeypatch.setattr(brand_voice, "generate_single_product", generate_single_product)
+    monkeypatch.setattr(brand_voice, "client", object())
+    return names
+
+
+PRODUCTS = [{"name": "Kettle"}, {"name": "Toaster"}, {"name": "Blender"}]
+
+
+def test_resumed_run_skips_checkpointed_products(generated):
+    kettle = {"name": "Kettle", "descriptions": {"shortDescription": "<p>from the first run</p>"}}
+    done = {brand_voice.product_key(PRODUCTS[0], "Electricals"): kettle}
+    checkpointed = []
+
+    products = asyncio.run(brand_voice.generate(
+        PRODUCTS, "Electricals", done=done, on_generated=lambda key, product: checkpointed.append(product["name"])
+    ))
+
+    assert generated == checkpointed == ["Toaster", "Blender"]
+    assert products[0] is kettle
+    assert [product["name"] for product in products] == ["Kettle", "Toaster", "Blender"]
+
+
+def test_cancelled_run_stops_before_next_product(generated):
+    checkpointed = []
+
+    with pytest.raises(Cancelled):
+        asyncio.run(brand_voice.generate(
+            PRODUCTS, "Electricals",
+            on_generated=lambda key, product: checkpointed.append(key),
+            should_abort=lambda: len(checkpointed) >= 1
+        ))
+
+    assert generated == ["Kettle"]
+    assert checkpointed == [brand_voice.product_key(PRODUCTS[0], "Electricals")]
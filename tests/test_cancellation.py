@@ -0,0 +1,81 @@
+"""Job cancellation (POST /jobs/{job_id}/cancel, app/utils/cancellation.py)"""
+import os
+import time
+import asyncio
+
+import pytest
+
+from app.utils.cancellation import Cancelled, run_cancellable
+
+
+def test_cancel_pending_job(client, job_store):
+    upload = job_store.save_job_upload(b"%PDF-1.4")
+    job = job_store.create_job({"upload_path": upload})
+
+    response = client.post(f"/jobs/{job['id']}/cancel")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert not os.path.exists(upload)
+    assert job_store.claim_next_job("worker-1") is None
+
+
+def test_cancel_running_job_flags_it_for_its_worker(client, job_store, pdf_job):
+    job = pdf_job()
+    job_store.claim_next_job("worker-1")
+
+    assert client.post(f"/convert/cancel/{job['id']}").status_code == 200
+    assert job_store.cancelled_jobs([job["id"]]) == [job["id"]]
+
+    # The worker finishing late does not overwrite the cancellation
+    job_store.complete_job(job["id"], {"products": []})
+    assert job_store.get_job(job["id"])["status"] == job_store.JobStatus.CANCELLED
+
+
+@pytest.mark.parametrize("finish", ["cancel", "complete", "fail"])
+def test_cancel_finished_job_conflicts(client, job_store, pdf_job, finish):
+    job = pdf_job()
+    if finish == "cancel":
+        job_store.cancel_job(job["id"])
+    elif finish == "complete":
+        job_store.complete_job(job["id"], {"products": []})
+    else:
+        job_store.fail_job(job["id"], "boom")
+
+    response = client.post(f"/jobs/{job['id']}/cancel")
+
+    assert response.status_code == 409
+    assert client.post("/jobs/missing/cancel").status_code == 404
+
+
+def test_cancel_coalesced_job_detaches_the_caller(client, job_store):
+    request = {"file_url": "https://example.com/a.pdf", "callback_url": "https://a.example.com"}
+    job = job_store.create_job(request, dedupe=True)
+    job_store.create_job({**request, "callback_url": "https://b.example.com"}, dedupe=True)
+
+    detached = client.post(f"/jobs/{job['id']}/cancel", params={"callback_url": "https://b.example.com"})
+
+    assert detached.status_code == 200
+    assert detached.json()["detached"]
+    assert detached.json()["status"] == "pending"
+    assert job_store.get_job(job["id"])["duplicates"] == 0
+
+    # The last submitter left cancels the work; only its callback is told
+    assert client.post(f"/jobs/{job['id']}/cancel").json()["status"] == "cancelled"
+    assert [d["url"] for d in job_store.webhook_deliveries(job["id"])] == ["https://a.example.com"]
+
+
+def test_run_cancellable_stops_work_in_flight():
+    flag = {"abort": False}
+
+    async def slow():
+        await asyncio.sleep(30)
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.2, flag.update, {"abort": True})
+        start = time.monotonic()
+        with pytest.raises(Cancelled):
+            await run_cancellable(slow(), lambda: flag["abort"], "Slow step", check_sec=0.05)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 1
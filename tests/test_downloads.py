@@ -0,0 +1,149 @@
+"""Remote file downloads (app/utils/downloads.py) against a local HTTP server"""
+import os
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.utils import downloads
+from app.utils.downloads import DownloadError, fetch_source
+
+BODY = os.urandom(512 * 1024)
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    log = []
+    dropped = set()
+
+    def reply(self, status, headers, body=b""):
+        Handler.log.append((self.path, status, self.headers.get("Range")))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        validators = {"ETag": ETAG, "Accept-Ranges": "bytes"}
+        if self.path == "/file.pdf":
+            if self.headers.get("If-None-Match") == ETAG:
+                return self.reply(304, validators)
+            return self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY)
+        if self.path == "/flaky.pdf":
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range") == ETAG:
+                start = int(range_header.split("=")[1].rstrip("-"))
+                return self.reply(206, {
+                    **validators,
+                    "Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}",
+                    "Content-Length": len(BODY) - start,
+                }, BODY[start:])
+            if self.path not in Handler.dropped:
+                # Promise the whole file, send half and hang up
+                Handler.dropped.add(self.path)
+                self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY[:len(BODY) // 2])
+                self.close_connection = True
+                return
+            return self.reply(200, {**validators, "Content-Length": len(BODY)}, BODY)
+        if self.path == "/declared-huge.pdf":
+            return self.reply(200, {"Content-Length": 50 * 1024 * 1024})
+        if self.path == "/undeclared-huge.pdf":
+            Handler.log.append((self.path, 200, None))
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for _ in range(64):
+                self.wfile.write(b"\0" * 64 * 1024)
+            return
+        if self.path == "/slow.pdf":
+            Handler.log.append((self.path, 200, None))
+            self.send_response(200)
+            self.send_header("Content-Length", len(BODY))
+            self.end_headers()
+            for offset in range(0, len(BODY), 4096):
+                self.wfile.write(BODY[offset:offset + 4096])
+                time.sleep(0.2)
+            return
+        self.reply(404, {"Content-Length": 0})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    """Fresh spool and cache directories; returns the spool directory"""
+    Handler.log.clear()
+    Handler.dropped.clear()
+    spool_dir, cache_dir = tmp_path / "spool", tmp_path / "cache"
+    spool_dir.mkdir()
+    monkeypatch.setattr(downloads, "PDF_SPOOL_DIR", str(spool_dir))
+    monkeypatch.setattr(downloads, "DOWNLOAD_CACHE_DIR", str(cache_dir))
+    return spool_dir
+
+
+def fetch(url: str, **kwargs):
+    """fetch_source as bytes (spool files are read and removed)"""
+    async def run():
+        try:
+            return await fetch_source(url, **kwargs)
+        finally:
+            await downloads.close_client()
+
+    downloaded = asyncio.run(run())
+    if isinstance(downloaded, bytes):
+        return downloaded
+    with open(downloaded, "rb") as f:
+        data = f.read()
+    os.remove(downloaded)
+    return data
+
+
+def test_large_download_spooled_then_revalidated_from_cache(server, spool):
+    assert fetch(f"{server}/file.pdf", max_memory_bytes=64 * 1024) == BODY
+    assert fetch(f"{server}/file.pdf", max_memory_bytes=64 * 1024) == BODY
+
+    assert [status for _, status, _ in Handler.log] == [200, 304]
+    assert not os.listdir(spool)
+
+
+def test_dropped_connection_resumed_with_range(server, spool):
+    assert fetch(f"{server}/flaky.pdf") == BODY
+
+    assert Handler.log[-1] == ("/flaky.pdf", 206, f"bytes={len(BODY) // 2}-")
+
+
+@pytest.mark.parametrize("path", ["/declared-huge.pdf", "/undeclared-huge.pdf"])
+def test_size_cap(server, spool, path):
+    with pytest.raises(DownloadError, match="limit"):
+        fetch(f"{server}{path}", max_bytes=1024 * 1024, max_memory_bytes=64 * 1024)
+
+    assert not os.listdir(spool)
+
+
+def test_deadline(server, spool, monkeypatch):
+    monkeypatch.setattr(downloads, "DOWNLOAD_DEADLINE_SEC", 1.0)
+    start = time.monotonic()
+
+    with pytest.raises(DownloadError, match="longer than"):
+        fetch(f"{server}/slow.pdf")
+
+    assert time.monotonic() - start < 3
+
+
+def test_http_error_status(server, spool):
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(f"{server}/missing.pdf")
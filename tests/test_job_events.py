@@ -0,0 +1,49 @@
+"""Job progress over Server-Sent Events (/jobs/{job_id}/events)"""
+import json
+
+
+def parse_events(body: str) -> list:
+    """(id, event, data) of each SSE message in a response body"""
+    events = []
+    for message in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def finished_job(job_store, pdf_job) -> str:
+    job = pdf_job()
+    job_store.claim_next_job("worker-1")
+    job_store.update_job(job["id"], progress=50, progress_message="Halfway")
+    job_store.complete_job(job["id"], {"products": [{"name": "Kettle"}]})
+    return job["id"]
+
+
+def test_fresh_stream_replays_history_and_closes(client, job_store, pdf_job):
+    job_id = finished_job(job_store, pdf_job)
+
+    events = parse_events(client.get(f"/jobs/{job_id}/events").text)
+
+    assert [event for _, event, _ in events][-1] == "completed"
+    assert [seq for seq, _, _ in events] == list(range(1, len(events) + 1))
+    assert events[-1][2]["result"]["products_count"] == 1
+
+
+def test_reconnect_resumes_after_last_event_id(client, job_store, pdf_job):
+    job_id = finished_job(job_store, pdf_job)
+    history = parse_events(client.get(f"/jobs/{job_id}/events").text)
+    halfway = next(seq for seq, _, data in history if data["progress"] == 50)
+
+    resumed = parse_events(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": str(halfway)}).text)
+    by_query = parse_events(client.get(f"/jobs/{job_id}/events", params={"last_event_id": halfway}).text)
+
+    assert resumed == by_query == [event for event in history if event[0] > halfway]
+    assert resumed[0][0] == halfway + 1
+
+
+def test_bad_requests(client, job_store, pdf_job):
+    job_id = finished_job(job_store, pdf_job)
+
+    assert client.get("/jobs/missing/events").status_code == 404
+    assert client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "abc"}).status_code == 400
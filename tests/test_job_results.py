@@ -0,0 +1,55 @@
+"""Job status summaries and paged results (/jobs/{job_id}, /jobs/{job_id}/result)"""
+import pytest
+
+
+@pytest.fixture
+def completed_job(job_store, pdf_job, monkeypatch):
+    """Complete a job with count products, stored ten to a chunk, and return its id"""
+    monkeypatch.setattr(job_store, "JOB_RESULT_CHUNK_SIZE", 10)
+
+    def complete(count: int) -> str:
+        products = [{"name": f"Product {n}", "sku": f"SKU-{n}", "description": "x" * 50} for n in range(count)]
+        return pdf_job({"success": True, "products": products, "pages_processed": 3})["id"]
+    return complete
+
+
+def test_status_carries_summary_without_products(client, completed_job):
+    job_id = completed_job(25)
+
+    result = client.get(f"/jobs/{job_id}").json()["result"]
+
+    assert result == {
+        "success": True,
+        "pages_processed": 3,
+        "products_count": 25,
+        "products_url": f"/jobs/{job_id}/result",
+    }
+
+
+def test_pages_span_chunks(client, job_store, completed_job):
+    job_id = completed_job(25)
+    names, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/jobs/{job_id}/result", params={"offset": offset, "limit": 7, "fields": "name"}).json()
+        assert page["total"] == 25
+        names += [product["name"] for product in page["products"]]
+        offset = page["next_offset"]
+
+    assert names == [f"Product {n}" for n in range(25)]
+    assert job_store.get_job(job_id, with_result=True)["result"]["products"][24]["sku"] == "SKU-24"
+
+
+def test_result_gzipped_when_accepted(client, completed_job):
+    job_id = completed_job(25)
+
+    response = client.get(f"/jobs/{job_id}/result", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["total"] == 25
+
+
+def test_result_missing_until_completed(client, pdf_job):
+    job = pdf_job()
+
+    assert client.get(f"/jobs/{job['id']}/result").status_code == 404
+    assert client.get("/jobs/missing/result").status_code == 404
@@ -0,0 +1,162 @@
+"""SQLite job store (app/jobs.py)"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_job_round_trip(job_store):
+    job = job_store.create_job({"file_url": "https://example.com/a.pdf", "category": "Electricals"}, kind="pdf")
+
+    stored = job_store.get_job(job["id"])
+    assert stored["status"] == job_store.JobStatus.PENDING
+    assert stored["request"]["file_url"] == "https://example.com/a.pdf"
+    assert job_store.job_status_response(stored)["queue_position"] == 0
+    assert job_store.get_job("missing") is None
+
+
+def test_finished_job_ignores_updates(job_store):
+    job = job_store.create_job({"file_url": "https://example.com/a.pdf"})
+    job_store.complete_job(job["id"], {"products": [{"name": "Kettle"}]})
+
+    job_store.update_job(job["id"], status=job_store.JobStatus.PROCESSING, progress=10)
+    job_store.fail_job(job["id"], "late failure")
+
+    stored = job_store.get_job(job["id"], with_result=True)
+    assert stored["status"] == job_store.JobStatus.COMPLETED
+    assert stored["progress"] == 100
+    assert stored["result"]["products"] == [{"name": "Kettle"}]
+
+
+def test_eviction_removes_expired_jobs_and_exports(job_store):
+    expired = job_store.create_job({"file_url": "https://example.com/old.pdf"})
+    recent = job_store.create_job({"file_url": "https://example.com/new.pdf"})
+    running = job_store.create_job({"file_url": "https://example.com/running.pdf"})
+    for job in (expired, recent):
+        job_store.complete_job(job["id"], {"products": [{"name": "Toaster"}]})
+    export = job_store.job_export_path(expired["id"], "markdown")
+    with open(export, "w") as f:
+        f.write("# Catalogue")
+    job_store._connection().execute(
+        "UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 7200, expired["id"])
+    )
+    job_store._connection().execute(
+        "UPDATE jobs SET created_at = ? WHERE id = ?", (time.time() - 7200, running["id"])
+    )
+
+    assert job_store.evict_expired_jobs(ttl_sec=3600) == 1
+
+    assert job_store.get_job(expired["id"]) is None
+    assert not os.path.exists(export)
+    assert job_store.result_products(expired["id"]) is None
+    assert not job_store._connection().execute(
+        "SELECT 1 FROM job_result_chunks WHERE job_id = ?", (expired["id"],)
+    ).fetchone()
+    assert job_store.get_job(recent["id"]) is not None
+    assert job_store.get_job(running["id"]) is not None
+
+
+def test_claim_takes_highest_priority_then_oldest(job_store):
+    low = job_store.create_job({"file_url": "https://example.com/low.pdf"}, priority=0)
+    high = job_store.create_job({"file_url": "https://example.com/high.pdf"}, priority=5)
+    later_low = job_store.create_job({"file_url": "https://example.com/later.pdf"}, priority=0)
+
+    claimed = [job_store.claim_next_job("worker-1")["id"] for _ in range(3)]
+
+    assert claimed == [high["id"], low["id"], later_low["id"]]
+    assert job_store.claim_next_job("worker-1") is None
+    assert job_store.get_job(high["id"])["worker"] == "worker-1"
+
+
+def test_concurrent_workers_never_claim_the_same_job(job_store):
+    created = {job_store.create_job({"file_url": f"https://example.com/{n}.pdf"})["id"] for n in range(30)}
+
+    def drain(worker):
+        claimed = []
+        while (job := job_store.claim_next_job(worker)) is not None:
+            claimed.append(job["id"])
+        return claimed
+
+    with ThreadPoolExecutor(4) as executor:
+        batches = list(executor.map(drain, [f"worker-{n}" for n in range(4)]))
+
+    claimed = [job_id for batch in batches for job_id in batch]
+    assert sorted(claimed) == sorted(created)
+
+
+def test_stale_job_requeued_unless_heartbeating(job_store):
+    stale = job_store.create_job({"file_url": "https://example.com/stale.pdf"})
+    alive = job_store.create_job({"file_url": "https://example.com/alive.pdf"})
+    job_store.claim_next_job("worker-1")
+    job_store.claim_next_job("worker-1")
+    job_store._connection().execute("UPDATE jobs SET updated_at = ?", (time.time() - 600,))
+    job_store.heartbeat([alive["id"]])
+
+    assert job_store.requeue_stale_jobs(stale_sec=300) == 1
+
+    requeued = job_store.get_job(stale["id"])
+    assert requeued["status"] == job_store.JobStatus.PENDING
+    assert requeued["worker"] is None
+    assert job_store.get_job(alive["id"])["status"] == job_store.JobStatus.PROCESSING
+    assert job_store.claim_next_job("worker-2")["id"] == stale["id"]
+
+
+def test_identical_submission_attaches_to_job_in_flight(job_store):
+    request = {"file_url": "https://example.com/a.pdf", "category": "Electricals", "callback_url": "https://a.example.com"}
+    first = job_store.create_job(request, dedupe=True)
+    second = job_store.create_job({**request, "callback_url": "https://b.example.com", "priority": 5}, dedupe=True)
+
+    assert second["id"] == first["id"] and second["deduplicated"]
+    assert job_store.get_job(first["id"])["duplicates"] == 1
+    assert job_store.create_job(request)["id"] != first["id"]
+    assert job_store.create_job({**request, "category": "Kitchen"}, dedupe=True)["id"] != first["id"]
+    assert job_store.create_job(request, dedupe=True, kind="url")["id"] != first["id"]
+
+    job_store.complete_job(first["id"], {"products": []})
+    urls = {delivery["url"] for delivery in job_store.webhook_deliveries(first["id"])}
+    assert urls == {"https://a.example.com", "https://b.example.com"}
+
+
+def test_completed_job_reused_only_within_dedup_window(job_store, monkeypatch):
+    monkeypatch.setattr(job_store, "JOB_DEDUP_WINDOW_SEC", 600)
+    request = {"file_url": "https://example.com/a.pdf"}
+    done = job_store.create_job(request, dedupe=True)
+    job_store.complete_job(done["id"], {"products": [{"name": "Kettle"}]})
+
+    reused = job_store.create_job({**request, "callback_url": "https://late.example.com"}, dedupe=True)
+    assert reused["id"] == done["id"]
+    assert reused["status"] == job_store.JobStatus.COMPLETED
+    # Attached after completion, so its webhook is queued straight away
+    assert [d["url"] for d in job_store.webhook_deliveries(done["id"])] == ["https://late.example.com"]
+
+    job_store._connection().execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 601, done["id"]))
+    assert job_store.create_job(request, dedupe=True)["id"] != done["id"]
+
+
+def test_same_content_under_another_url_found_by_hash(job_store):
+    first = job_store.create_job({"file_url": "https://example.com/a.pdf", "category": "Electricals"}, dedupe=True)
+    job_store.find_job_by_content(first["id"], "abc123")
+    job_store.complete_job(first["id"], {"products": [{"name": "Kettle"}]})
+    mirror = job_store.create_job({"file_url": "https://mirror.example.com/a.pdf", "category": "Electricals"})
+    other_options = job_store.create_job({"file_url": "https://mirror.example.com/b.pdf", "category": "Kitchen"})
+
+    match = job_store.find_job_by_content(mirror["id"], "abc123")
+
+    assert match["id"] == first["id"]
+    assert match["result"]["products"] == [{"name": "Kettle"}]
+    assert job_store.find_job_by_content(other_options["id"], "abc123") is None
+
+
+def test_checkpoints_kept_per_step_until_completion(job_store):
+    job = job_store.create_job({"file_url": "https://example.com/a.pdf"})
+    job_store.save_checkpoint(job["id"], "brand_voice", "a", {"name": "Kettle"})
+    job_store.save_checkpoint(job["id"], "brand_voice", "a", {"name": "Kettle v2"})
+    job_store.save_checkpoint(job["id"], "brand_voice", "b", {"name": "Toaster"})
+    job_store.save_checkpoint(job["id"], "other_step", "a", {"name": "Other"})
+
+    assert job_store.load_checkpoints(job["id"], "brand_voice") == {
+        "a": {"name": "Kettle v2"},
+        "b": {"name": "Toaster"},
+    }
+
+    job_store.complete_job(job["id"], {"products": []})
+    assert job_store.load_checkpoints(job["id"], "brand_voice") == {}
@@ -0,0 +1,86 @@
+"""Keyword matcher (app/utils/keyword_matcher.py)"""
+import json
+
+from app.utils import keyword_matcher
+from app.utils.keyword_matcher import KeywordMatcher
+
+MATCHER = KeywordMatcher({
+    "brand": ["Sage", "De'Longhi", "Russell Hobbs"],
+    "colour": ["Gold", "Rose Gold", "Black"],
+    "material": ["Steel", "Stainless Steel", "Glass"]
+})
+
+
+def spans(matches):
+    return [(m["keyword"], m["start"], m["end"]) for m in matches]
+
+
+def test_keywords_only_match_whole_words():
+    assert MATCHER.find_all("Reduced usage, blackened goldfish, steely look") == []
+    assert MATCHER.keywords("Sage kettle", "brand") == ["Sage"]
+    assert MATCHER.keywords("kettle (Sage), 1.7L", "brand") == ["Sage"]
+    assert MATCHER.keywords("Sage2 kettle", "brand") == []
+
+
+def test_overlapping_keywords_are_all_reported_longest_first():
+    text = "Rose Gold and stainless steel"
+
+    assert spans(MATCHER.find_all(text)) == [
+        ("Rose Gold", 0, 9),
+        ("Gold", 5, 9),
+        ("Stainless Steel", 14, 29),
+        ("Steel", 24, 29)
+    ]
+
+
+def test_matching_ignores_case_and_reports_the_dictionary_spelling():
+    assert MATCHER.keywords("RUSSELL HOBBS kettle in BLACK", "brand") == ["Russell Hobbs"]
+    assert MATCHER.first("RUSSELL HOBBS kettle in BLACK", "colour") == "Black"
+    assert MATCHER.keywords("de'longhi", "brand") == ["De'Longhi"]
+
+
+def test_positions_index_into_the_original_text():
+    text = "Glass jug, black base, BLACK lid"
+    matches = MATCHER.find_all(text, "colour")
+
+    assert spans(matches) == [("Black", 11, 16), ("Black", 23, 28)]
+    assert [text[m["start"]:m["end"]] for m in matches] == ["black", "BLACK"]
+
+
+def test_positions_survive_characters_that_change_length_when_lowercased():
+    text = "İznik Glass"
+
+    assert spans(MATCHER.find_all(text, "material")) == [("Glass", 6, 11)]
+
+
+def test_category_filter_and_unique_keywords():
+    text = "Black Sage kettle, black handle"
+
+    assert MATCHER.keywords(text, "colour") == ["Black"]
+    assert MATCHER.keywords(text, "material") == []
+    assert MATCHER.first(text, "material") == ""
+
+
+def test_duplicate_and_blank_keywords_are_ignored():
+    matcher = KeywordMatcher({"colour": ["Red", " red ", "", "RED"]})
+
+    assert len(matcher) == 1
+    assert spans(matcher.find_all("red")) == [("Red", 0, 3)]
+
+
+def test_dictionary_file_extends_the_built_in_lists(tmp_path, monkeypatch):
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps({"brand": ["Zwilling"], "finish": ["Matte"]}), encoding="utf-8")
+    monkeypatch.setattr(keyword_matcher, "KEYWORD_DICTIONARY_PATH", str(path))
+
+    dictionary = keyword_matcher.load_dictionary()
+
+    assert "Zwilling" in dictionary["brand"]
+    assert dictionary["finish"] == ["Matte"]
+    assert dictionary["colour"]
+
+
+def test_unreadable_dictionary_file_falls_back_to_built_in_lists(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_matcher, "KEYWORD_DICTIONARY_PATH", str(tmp_path / "missing.json"))
+
+    assert set(keyword_matcher.load_dictionary()) == {"brand", "colour", "material"}
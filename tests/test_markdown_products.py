@@ -0,0 +1,56 @@
+"""Product segmentation of Docling markdown (pdf_processor.extract_products_from_markdown)"""
+import pytest
+
+pytest.importorskip("docling")
+
+from app.services.pdf_processor import extract_products_from_markdown  # noqa: E402
+
+
+def by_sku(markdown: str) -> dict:
+    return {product["sku"]: product for product in extract_products_from_markdown(markdown, "Electricals")}
+
+
+def test_several_skus_on_one_row_each_keep_the_row():
+    products = by_sku("## Sage Kettle Range\nAvailable finishes:\n| SKE100BSS2 | SKE100BTR2 | 1.7L 2400W |\n")
+
+    first, second = products["SKE100BSS2"], products["SKE100BTR2"]
+    assert first["name"] == "Sage Kettle Range"
+    assert first["rawExtractedContent"].startswith("## Sage Kettle Range\n")
+    assert first["rawExtractedContent"].endswith("| SKE100BSS2 | SKE100BTR2 | 1.7L 2400W |\n")
+    assert first["specifications"] == {"powerW": 2400, "capacity": "1.7L"}
+    assert second["rawExtractedContent"] == "SKE100BTR2 | 1.7L 2400W |\n"
+    assert second["specifications"] == first["specifications"]
+
+
+def test_sku_inside_heading_anchors_its_block():
+    products = by_sku(
+        "## Sage Bambino Plus Coffee Machine SES500BSS4GUK1\nCompact espresso, 1600W\n"
+        "## Sage Barista Express Coffee Machine SES875BSS2GUK1\nBuilt-in grinder, 1850W\n"
+    )
+
+    assert list(products) == ["SES500BSS4GUK1", "SES875BSS2GUK1"]
+    assert products["SES500BSS4GUK1"]["name"] == "Sage Bambino Plus Coffee Machine SES500BSS4GUK1"
+    assert products["SES500BSS4GUK1"]["specifications"]["powerW"] == 1600
+    assert products["SES875BSS2GUK1"]["specifications"]["powerW"] == 1850
+
+
+def test_heading_without_sku_goes_to_the_sku_under_it():
+    products = by_sku(
+        "## Sage Toaster STA820BSS4GUK1\n4 slice, 2000W\n"
+        "## Smeg Kettle KLF03CRUK\nRetro style\n| SMG100CRM01 | 1.7L 3000W |\n"
+    )
+
+    toaster, kettle = products["STA820BSS4GUK1"], products["SMG100CRM01"]
+    assert "Smeg" not in toaster["rawExtractedContent"]
+    assert toaster["specifications"]["powerW"] == 2000
+    assert kettle["name"] == "Smeg Kettle KLF03CRUK"
+    assert kettle["specifications"]["powerW"] == 3000
+
+
+def test_product_headings_anchor_blocks_without_skus():
+    products = extract_products_from_markdown(
+        "# Catalogue\n## Smeg Kettle\n1.7L\n## Smeg Toaster\n2 slice\n", "Electricals"
+    )
+
+    assert [product["name"] for product in products] == ["Smeg Kettle", "Smeg Toaster"]
+    assert products[0]["sku"] == ""
@@ -0,0 +1,28 @@
+"""Peak RSS sampling (app/utils/memory.py)"""
+import time
+
+from app.utils import memory
+
+
+def test_sampler_catches_a_transient_peak():
+    with memory.PeakRSSSampler(interval=0.01) as sampler:
+        block = b"\x01" * (64 * 1048576)
+        time.sleep(0.2)
+        del block
+        time.sleep(0.05)
+
+    assert sampler.growth_mb >= 48
+    assert sampler.peak_mb >= sampler.start_bytes / 1048576 + 48
+
+
+def test_record_conversion_keeps_the_largest_peak(monkeypatch):
+    monkeypatch.setattr(memory, "_stats", dict(memory._stats, conversions=0, max_peak_rss_mb=0.0))
+
+    memory.record_conversion(900.0, 300.0)
+    memory.record_conversion(400.0, 20.0)
+    stats = memory.memory_stats()
+
+    assert stats["conversions"] == 2
+    assert stats["last_peak_rss_mb"] == 400.0
+    assert stats["last_growth_mb"] == 20.0
+    assert stats["max_peak_rss_mb"] == 900.0
@@ -0,0 +1,101 @@
+"""Price list table extraction (pdf_processor.detect_header / extract_products_from_tables / merge_products)"""
+import pytest
+
+pytest.importorskip("docling")
+
+from app.services.pdf_processor import (  # noqa: E402
+    detect_header,
+    extract_products_from_tables,
+    merge_products
+)
+
+PRICE_LIST = [
+    ["Kitchen Electricals Price List 2026", "", "", "", ""],
+    ["Product Code", "Description", "EAN", "Power", "RRP"],
+    ["SKE100BSS2", "Sage the Smart Kettle", "5060189691234", "2,400 W", "£129.95"],
+    ["", "", "", "", ""],
+    ["Product Code", "Description", "EAN", "Power", "RRP"],
+    ["KMX750BK", "Kenwood kMix Stand Mixer", "5011423199934", "1000W", "£399.00"]
+]
+
+
+def test_header_columns_are_mapped_through_their_aliases():
+    row, columns = detect_header(PRICE_LIST)
+
+    assert row == 1
+    assert columns == {"sku": 0, "name": 1, "barcode": 2, "powerW": 3, "price": 4}
+
+
+def test_header_aliases_are_case_and_spacing_insensitive():
+    _, columns = detect_header([["  GTIN ", "Item  Code", "Product Name", "Wattage"]])
+
+    assert columns == {"barcode": 0, "sku": 1, "name": 2, "powerW": 3}
+
+
+def test_table_without_a_product_identifier_is_not_a_product_table():
+    assert detect_header([["Power", "Weight"], ["2400W", "1.2kg"]]) == (None, {})
+    assert detect_header([["Notes"], ["Prices include VAT"]]) == (None, {})
+
+
+def test_one_product_per_data_row():
+    products = extract_products_from_tables([PRICE_LIST], "Electricals")
+
+    assert [p["sku"] for p in products] == ["SKE100BSS2", "KMX750BK"]
+    kettle = products[0]
+    assert kettle["name"] == "Sage the Smart Kettle"
+    assert kettle["brand"] == "Sage"
+    assert kettle["barcode"] == "5060189691234"
+    assert kettle["price"] == "£129.95"
+    assert kettle["category"] == "Electricals"
+    assert kettle["rawExtractedContent"] == "SKE100BSS2 | Sage the Smart Kettle | 5060189691234 | 2,400 W | £129.95"
+
+
+def test_power_is_parsed_from_formatted_cells():
+    products = extract_products_from_tables([PRICE_LIST], "Electricals")
+
+    assert [p["specifications"]["powerW"] for p in products] == [2400, 1000]
+
+
+def test_rows_without_sku_or_name_are_skipped():
+    grid = [["SKU", "Name", "Price"], ["", "", "£10.00"], ["TOST2", "", ""]]
+
+    products = extract_products_from_tables([grid], "Electricals")
+
+    assert len(products) == 1
+    assert products[0]["name"] == "Product TOST2"
+    assert "price" not in products[0]
+
+
+def markdown_product(sku, **fields):
+    return {"name": f"Product {sku}", "brand": "", "sku": sku, "features": [], "specifications": {}, **fields}
+
+
+def test_table_rows_win_and_markdown_fills_in_missing_fields():
+    table = extract_products_from_tables([PRICE_LIST], "Electricals")
+    text = [
+        markdown_product(
+            "KMX750BK",
+            brand="Kenwood",
+            features=["Five-litre brushed steel bowl"],
+            specifications={"powerW": 1200, "capacity": "5L"}
+        ),
+        markdown_product("SKE100BSS2", brand="Breville")
+    ]
+
+    merged = merge_products(table, text)
+
+    assert [p["sku"] for p in merged] == ["SKE100BSS2", "KMX750BK"]
+    kettle, mixer = merged
+    assert kettle["brand"] == "Sage"
+    assert mixer["name"] == "Kenwood kMix Stand Mixer"
+    assert mixer["features"] == ["Five-litre brushed steel bowl"]
+    assert mixer["specifications"] == {"powerW": 1000, "capacity": "5L"}
+
+
+def test_markdown_products_not_in_a_table_are_appended():
+    table = extract_products_from_tables([PRICE_LIST], "Electricals")
+    text = [markdown_product("TOST2"), markdown_product(""), markdown_product("")]
+
+    merged = merge_products(table, text)
+
+    assert [p["sku"] for p in merged] == ["SKE100BSS2", "KMX750BK", "TOST2", "", ""]
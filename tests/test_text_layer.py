@@ -0,0 +1,69 @@
+"""Text layer classification and OCR run planning (app/services/text_layer.py)"""
+from app.services.text_layer import classify_page, plan_page_runs
+
+TEXT = "Cordless kettle 1.7 litre, rapid boil, 360 degree base. " * 2
+
+
+def pages(*flags):
+    """Page dicts with the given has_text_layer flags, numbered from 1"""
+    return [{"page": n, "has_text_layer": flag} for n, flag in enumerate(flags, start=1)]
+
+
+def test_page_with_enough_text_has_a_text_layer():
+    page = classify_page(3, TEXT, coverage=0.2)
+
+    assert page["page"] == 3
+    assert page["chars"] == len(TEXT.replace(" ", ""))
+    assert page["has_text_layer"]
+
+
+def test_page_below_the_text_density_threshold_needs_ocr():
+    assert not classify_page(1, "Page 1 of 40", coverage=0.2)["has_text_layer"]
+    assert not classify_page(1, TEXT, coverage=0.001)["has_text_layer"]
+    assert not classify_page(1, "", coverage=0.0)["has_text_layer"]
+
+
+def test_whitespace_does_not_count_towards_the_threshold():
+    assert not classify_page(1, "a " * 49 + "\n" * 100, coverage=0.2)["has_text_layer"]
+    assert classify_page(1, "a " * 50, coverage=0.2)["has_text_layer"]
+
+
+def test_broken_font_encoding_needs_ocr():
+    page = classify_page(1, "�" * 20 + "x" * 80, coverage=0.2)
+
+    assert page["garbage_ratio"] == 0.2
+    assert not page["has_text_layer"]
+
+
+def test_adjacent_pages_with_the_same_decision_share_a_run():
+    assert plan_page_runs(pages(True, True, False, False, False, True)) == [
+        (1, 2, False), (3, 5, True), (6, 6, False)
+    ]
+
+
+def test_all_text_document_is_one_run_without_ocr():
+    assert plan_page_runs(pages(*[True] * 12)) == [(1, 12, False)]
+
+
+def test_all_scanned_document_is_one_ocr_run():
+    assert plan_page_runs(pages(*[False] * 12)) == [(1, 12, True)]
+
+
+def test_forced_ocr_covers_text_pages_too():
+    assert plan_page_runs(pages(True, False, True), force_full_ocr=True) == [(1, 3, True)]
+
+
+def test_long_runs_are_split_at_max_pages():
+    assert plan_page_runs(pages(*[False] * 10), max_pages=4) == [
+        (1, 4, True), (5, 8, True), (9, 10, True)
+    ]
+
+
+def test_gaps_in_page_numbers_start_a_new_run():
+    scanned = [{"page": 1, "has_text_layer": False}, {"page": 3, "has_text_layer": False}]
+
+    assert plan_page_runs(scanned) == [(1, 1, True), (3, 3, True)]
+
+
+def test_empty_document_has_no_runs():
+    assert plan_page_runs([]) == []
@@ -0,0 +1,79 @@
+"""CPU thread budget (app/utils/threads.py)"""
+import io
+import os
+
+import pytest
+
+from app.utils import threads
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """Configure cores and worker settings, then compute the budget"""
+    def configure(cores=8, workers=2, concurrency=3, reserved=1, per_worker=0):
+        monkeypatch.setattr(threads, "available_cores", lambda: cores)
+        monkeypatch.setattr(threads, "PDF_WORKER_PROCESSES", workers)
+        monkeypatch.setattr(threads, "PDF_BATCH_CONCURRENCY", concurrency)
+        monkeypatch.setattr(threads, "CPU_RESERVED_CORES", reserved)
+        monkeypatch.setattr(threads, "CONVERSION_THREADS_PER_WORKER", per_worker)
+        return threads.thread_budget()
+    return configure
+
+
+def test_usable_cores_are_split_across_pool_workers(budget):
+    assert budget(cores=9, workers=4, reserved=1) == {
+        "cores": 9,
+        "reserved_cores": 1,
+        "conversion_workers": 4,
+        "threads_per_worker": 2,
+        "source": "auto"
+    }
+    assert budget(cores=16, workers=3, reserved=1)["threads_per_worker"] == 5
+
+
+def test_reserved_cores_are_kept_out_of_the_split(budget):
+    assert budget(cores=8, workers=1, reserved=0)["threads_per_worker"] == 8
+    assert budget(cores=8, workers=1, reserved=2)["threads_per_worker"] == 6
+
+
+def test_every_worker_gets_at_least_one_thread(budget):
+    assert budget(cores=2, workers=4, reserved=1)["threads_per_worker"] == 1
+    assert budget(cores=1, workers=1, reserved=4)["threads_per_worker"] == 1
+
+
+def test_in_process_conversions_split_by_batch_concurrency(budget):
+    result = budget(cores=13, workers=0, concurrency=3, reserved=1)
+
+    assert result["conversion_workers"] == 3
+    assert result["threads_per_worker"] == 4
+
+
+def test_configured_threads_per_worker_override_the_split(budget):
+    result = budget(cores=64, workers=2, per_worker=3)
+
+    assert result["threads_per_worker"] == 3
+    assert result["source"] == "config"
+
+
+def test_cgroup_quota_caps_available_cores(monkeypatch):
+    monkeypatch.setattr(threads.os, "sched_getaffinity", lambda pid: set(range(32)))
+    monkeypatch.setattr(threads, "open", lambda path: io.StringIO("400000 100000\n"), raising=False)
+
+    assert threads.available_cores() == 4
+
+
+def test_unlimited_cgroup_uses_cpu_affinity(monkeypatch):
+    monkeypatch.setattr(threads.os, "sched_getaffinity", lambda pid: {0, 1, 2})
+    monkeypatch.setattr(threads, "open", lambda path: io.StringIO("max 100000\n"), raising=False)
+
+    assert threads.available_cores() == 3
+
+
+def test_thread_limits_are_exported_to_numeric_libraries(monkeypatch):
+    for name in threads.THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "64")
+
+    applied = threads.apply_thread_limits(3)
+
+    assert applied["threads"] == 3
+    assert all(os.environ[name] == "3" for name in threads.THREAD_ENV_VARS)
@@ -0,0 +1,71 @@
+"""Signed job webhooks (app/webhooks.py)"""
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from app import webhooks
+
+SECRET = "test-secret"
+
+
+def verify(body: bytes, header: str, secret: str = SECRET, tolerance_sec: int = 300) -> bool:
+    """What a receiver does with X-Webhook-Signature"""
+    fields = dict(part.split("=", 1) for part in header.split(","))
+    expected = hmac.new(secret.encode(), f"{fields['t']}.".encode() + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, fields["v1"]) and abs(time.time() - int(fields["t"])) <= tolerance_sec
+
+
+def test_signature_covers_timestamp_and_body():
+    body = b'{"event": "job.completed"}'
+    now = int(time.time())
+    header = webhooks.sign(body, now, SECRET)
+
+    assert header.startswith(f"t={now},v1=")
+    assert verify(body, header)
+    assert not verify(body + b" ", header)
+    assert not verify(body, header, secret="other-secret")
+    assert not verify(body, webhooks.sign(body, now - 3600, SECRET))
+
+
+def deliver_once(job_store, pdf_job, respond) -> tuple:
+    """Queue a completion webhook, deliver it to respond(request) and return (request, delivery record)"""
+    job = pdf_job({"products": [{"name": "Kettle"}]}, callback_url="https://hooks.example.com/in")
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return respond(request)
+
+    async def run():
+        [delivery] = job_store.claim_webhook_deliveries(10, 30)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            await webhooks.deliver(http, delivery)
+
+    asyncio.run(run())
+    [record] = job_store.webhook_deliveries(job["id"])
+    return received[0], record
+
+
+def test_delivery_is_signed_and_recorded(job_store, pdf_job):
+    request, record = deliver_once(job_store, pdf_job, lambda request: httpx.Response(204))
+
+    assert verify(request.content, request.headers["X-Webhook-Signature"])
+    payload = json.loads(request.content)
+    assert request.headers["X-Webhook-Event"] == payload["event"] == "job.completed"
+    assert payload["summary"]["products_count"] == 1
+    assert record["status"] == "delivered"
+    assert record["attempts"] == 1
+
+
+@pytest.mark.parametrize("status_code, outcome", [(503, "pending"), (429, "pending"), (400, "failed")])
+def test_failed_delivery_retried_only_when_worth_it(job_store, pdf_job, status_code, outcome):
+    _, record = deliver_once(job_store, pdf_job, lambda request: httpx.Response(status_code))
+
+    assert record["status"] == outcome
+    assert record["last_status_code"] == status_code
+    assert (record["next_attempt_at"] is not None) == (outcome == "pending")
@@ -0,0 +1,83 @@
+"""Worker pool recycling and replacement (app/services/worker_pool.py)"""
+import os
+import time
+
+import pytest
+
+from app.services import worker_pool
+
+# Kept alive in the worker so its RSS stays up after the task returns
+_hoard = []
+
+
+def worker_pid() -> int:
+    return os.getpid()
+
+
+def hold_memory(mb: int) -> int:
+    _hoard.append(b"\x01" * (mb * 1048576))
+    return os.getpid()
+
+
+def sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def die():
+    os._exit(1)
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**settings):
+        pool = worker_pool.WorkerPool("test", 1, **settings)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_worker_recycled_after_max_tasks(make_pool):
+    pool = make_pool(max_tasks=2)
+
+    pids = [pool.run(worker_pid, {}) for _ in range(3)]
+
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.stats["recycled_tasks"] == 1
+
+
+def test_worker_recycled_past_rss_ceiling(make_pool):
+    pool = make_pool(max_rss_mb=100000)
+    first = pool.run(worker_pid, {})
+    baseline_mb = pool.snapshot()["workers"][0]["private_mb"]
+    pool.max_rss_bytes = int((baseline_mb + 64) * 1048576)
+
+    assert pool.run(hold_memory, {"mb": 128}) == first
+    assert pool.run(worker_pid, {}) != first
+    assert pool.stats["recycled_rss"] == 1
+
+
+def test_worker_killed_at_deadline_and_replaced(make_pool):
+    pool = make_pool()
+    first = pool.run(worker_pid, {})
+
+    with pytest.raises(worker_pool.WorkerTimeout):
+        pool.run(sleep, {"seconds": 30}, timeout=1)
+
+    assert pool.run(worker_pid, {}) != first
+    assert pool.stats["timeouts"] == pool.stats["replaced"] == 1
+
+
+def test_dead_worker_replaced(make_pool):
+    pool = make_pool()
+
+    with pytest.raises(worker_pool.WorkerCrashed):
+        pool.run(die, {})
+
+    assert pool.run(sleep, {"seconds": 0}) == 0
+    assert pool.stats["crashes"] == 1